@@ -1,6 +1,8 @@
 import streamlit as st
+from instrumentation import begin_rerun, end_rerun
 
 st.set_page_config(page_title="Best Friends Pet Care Center Pricing Portal", layout="wide")
+begin_rerun("Home")
 st.image("bf_logo.png", width=120)
 st.title("Best Friends Pet Care Center Pricing Portal")
 
@@ -74,6 +76,7 @@ At the top of each page, select your **District Manager** and **Center Name** fr
 Use the sidebar to select either **Boarding Pricing** or **Day Camp Pricing** and start entering your center’s information!
 
 """)
+end_rerun()
 #     st.session_state.boarding_products = []
 
 # # --- Mock Data and Constants ---
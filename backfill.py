@@ -0,0 +1,218 @@
+"""
+Batched, resumable data backfills for large tables.
+
+A single table-wide UPDATE locks every row it touches until it commits, which
+stalls the pricing pages on a network-sized table. A backfill here instead
+walks the table in primary-key order, updating at most ``batch_size`` rows per
+short transaction through the backfill_batch() function
+(sql/functions/backfill_batch.sql). The cursor is saved in the same
+transaction as each batch, so an interrupted run picks up where it stopped.
+
+Constraints are only tightened once a verification count shows no rows left
+to fix, and each tightening step runs as its own ledgered migration so no
+step holds a long exclusive lock.
+
+Run from the command line:
+    python run_migration.py --backfill kennel_suites_dog_sizes [--batch-size 500] [--pause 0.2]
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+from supabase_config import get_client_pool
+from migrations import Migration, MigrationError, apply_migration, migration_checksum, split_sql_statements
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_PAUSE_SECONDS = 0.2
+# Consecutive failed batches (e.g. lock timeouts under load) before giving up
+MAX_BATCH_RETRIES = 5
+
+
+@dataclass(frozen=True)
+class Backfill:
+    """A data migration run in batches, followed by optional constraint steps.
+
+    Attributes:
+        name: Progress key in backfill_progress; also prefixes the finalize migrations
+        table: Table to walk in ``id`` order
+        set_sql: SET clause applied to each row needing the backfill
+        where_sql: Condition selecting rows that still need it
+        verify_sql: Condition that must match no rows before finalizing
+        finalize: SQL scripts run in order after verification, each in its own transaction
+        description: Shown by --list-backfills
+    """
+    name: str
+    table: str
+    set_sql: str
+    where_sql: str
+    verify_sql: str
+    finalize: Tuple[str, ...] = ()
+    description: str = ""
+
+    def finalize_migrations(self) -> List[Migration]:
+        """Finalize steps as migrations, so the ledger skips steps that already ran."""
+        migrations = []
+        for index, sql in enumerate(self.finalize, 1):
+            name = f"backfill_{self.name}_finalize_{index}.sql"
+            migrations.append(Migration(name, name, migration_checksum(sql), split_sql_statements(sql)))
+        return migrations
+
+
+BACKFILLS: Dict[str, Backfill] = {
+    backfill.name: backfill for backfill in [
+        Backfill(
+            name="kennel_suites_dog_sizes",
+            table="kennel_suites",
+            set_sql="dog_sizes = jsonb_build_array(dog_size)",
+            where_sql="dog_sizes IS NULL AND dog_size IS NOT NULL",
+            verify_sql="dog_sizes IS NULL",
+            # NOT VALID takes only a brief lock; VALIDATE scans without blocking
+            # writes; SET NOT NULL then trusts the validated check instead of
+            # rescanning under an exclusive lock (PostgreSQL 12+). The lock_timeout
+            # makes the brief exclusive steps fail fast rather than queue live
+            # traffic behind them; rerun to retry.
+            finalize=(
+                "SET LOCAL lock_timeout = '5s';\n"
+                "ALTER TABLE kennel_suites ADD CONSTRAINT kennel_suites_dog_sizes_not_null "
+                "CHECK (dog_sizes IS NOT NULL) NOT VALID",
+                "ALTER TABLE kennel_suites VALIDATE CONSTRAINT kennel_suites_dog_sizes_not_null",
+                "SET LOCAL lock_timeout = '5s';\n"
+                "ALTER TABLE kennel_suites ALTER COLUMN dog_sizes SET NOT NULL;\n"
+                "ALTER TABLE kennel_suites DROP CONSTRAINT kennel_suites_dog_sizes_not_null",
+            ),
+            description="Fill kennel_suites.dog_sizes from dog_size, then make it NOT NULL "
+                        "(follows 2025_05_01_update_kennel_suites_table.sql)",
+        ),
+    ]
+}
+
+
+@dataclass
+class BackfillProgress:
+    """Running totals for one backfill, as reported by backfill_batch()."""
+    batches: int = 0
+    rows_scanned: int = 0
+    rows_updated: int = 0
+    last_id: Optional[str] = None
+    done: bool = False
+    estimated_rows: Optional[int] = None
+    history: List[Dict[str, Any]] = field(default_factory=list)
+
+    def percent(self) -> Optional[float]:
+        if not self.estimated_rows:
+            return None
+        return min(100.0, 100.0 * self.rows_scanned / self.estimated_rows)
+
+
+def _rpc(name: str, params: Dict[str, Any]) -> Any:
+    try:
+        return get_client_pool().run(lambda client: client.rpc(name, params).execute()).data
+    except Exception as e:
+        if getattr(e, "code", None) == "PGRST202":
+            raise MigrationError(f"{name}() is not installed; run sql/functions/backfill_batch.sql "
+                                 "in the SQL editor first") from e
+        raise
+
+
+def run_batch(backfill: Backfill, batch_size: int, restart: bool = False) -> Dict[str, Any]:
+    """Process the next window of ``batch_size`` rows and return the batch result.
+
+    Returns:
+        Dict with scanned, updated, last_id and done for this batch, plus the
+        backfill's running batches, rows_scanned and rows_updated
+    """
+    return _rpc("backfill_batch", {
+        "p_name": backfill.name,
+        "p_table": backfill.table,
+        "p_set": backfill.set_sql,
+        "p_where": backfill.where_sql,
+        "p_batch_size": batch_size,
+        "p_restart": restart,
+    })
+
+
+def remaining_rows(backfill: Backfill) -> int:
+    """Count rows still failing the backfill's verification condition."""
+    return int(_rpc("backfill_remaining", {"p_table": backfill.table, "p_condition": backfill.verify_sql}))
+
+
+def _estimated_rows(table: str) -> Optional[int]:
+    try:
+        return int(_rpc("backfill_estimated_rows", {"p_table": table}) or 0) or None
+    except Exception:
+        return None
+
+
+def run_backfill(backfill: Backfill, batch_size: int = DEFAULT_BATCH_SIZE,
+                 pause: float = DEFAULT_PAUSE_SECONDS, restart: bool = False,
+                 max_batches: Optional[int] = None, finalize: bool = True,
+                 log=print) -> Tuple[bool, BackfillProgress]:
+    """Run (or resume) a backfill, verify it, then apply its finalize steps.
+
+    Args:
+        backfill: What to run
+        batch_size: Rows per batch transaction
+        pause: Seconds to sleep between batches, leaving room for live traffic
+        restart: Start again from the beginning of the table instead of resuming
+        max_batches: Stop after this many batches (the next run resumes)
+        finalize: Verify and tighten constraints once every row has been visited
+        log: Progress callback
+
+    Returns:
+        Tuple of (success, progress)
+    """
+    progress = BackfillProgress(estimated_rows=_estimated_rows(backfill.table))
+    failures = 0
+    started = time.time()
+    while not progress.done:
+        if max_batches is not None and len(progress.history) >= max_batches:
+            log(f"Stopped after {max_batches} batches; run again to resume after id {progress.last_id}.")
+            return True, progress
+        batch_started = time.time()
+        try:
+            result = run_batch(backfill, batch_size, restart=restart and not progress.history)
+        except MigrationError:
+            raise
+        except Exception as e:
+            failures += 1
+            if failures > MAX_BATCH_RETRIES:
+                log(f"Error: {failures} batches in a row failed ({str(e)}); run again to resume.")
+                return False, progress
+            # Lock timeouts mean live traffic holds the rows; back off before retrying
+            delay = min(30.0, pause * 2 ** failures + 1)
+            log(f"  batch failed ({str(e)}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        failures = 0
+        result["seconds"] = round(time.time() - batch_started, 3)
+        progress.history.append(result)
+        progress.batches = result["batches"]
+        progress.rows_scanned = result["rows_scanned"]
+        progress.rows_updated = result["rows_updated"]
+        progress.last_id = result["last_id"]
+        progress.done = result["done"]
+
+        percent = progress.percent()
+        rate = sum(r["scanned"] for r in progress.history) / max(time.time() - started, 1e-6)
+        log(f"  batch {progress.batches}: {result['updated']}/{result['scanned']} rows updated "
+            f"in {result['seconds']:.2f}s; {progress.rows_scanned:,} scanned"
+            f"{f' (~{percent:.0f}%)' if percent is not None else ''}, "
+            f"{progress.rows_updated:,} updated, {rate:,.0f} rows/s")
+        if not progress.done and pause > 0:
+            time.sleep(pause)
+
+    log(f"Backfill {backfill.name} visited every row ({progress.rows_updated:,} updated).")
+    if not finalize or not backfill.finalize:
+        return True, progress
+
+    remaining = remaining_rows(backfill)
+    if remaining:
+        log(f"Error: {remaining:,} rows in {backfill.table} still match '{backfill.verify_sql}'; "
+            "constraints were not tightened. Fix those rows, then run with --restart.")
+        return False, progress
+    log("Verified: no rows left to fix. Tightening constraints...")
+    for migration in backfill.finalize_migrations():
+        result = apply_migration(migration)
+        state = "already applied" if result.get("skipped") else f"done in {result.get('duration_ms')} ms"
+        log(f"  {migration.name}: {state}")
+    return True, progress
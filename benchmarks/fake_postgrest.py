@@ -0,0 +1,433 @@
+"""
+In-memory stand-in for the Supabase REST API (PostgREST), for offline benchmarks.
+
+Implements the subset of PostgREST the app uses: select with projections,
+filters (eq, neq, gt, gte, lt, lte, like, ilike, is, in and their not.
+forms), or=(...)/and(...) trees, order, limit and offset; inserts and
+upserts (merge or ignore duplicates); updates and deletes by filter; and the
+get_center_bundle and bulk_update_records RPCs. Other RPCs answer 404
+PGRST202, as PostgREST does for a function that is not deployed, so the app
+takes its fallback paths.
+
+Every response can be delayed by a configurable latency (plus jitter) to
+model the network, and every request is counted with its bytes in and out.
+
+    server = FakePostgrest(latency_ms=40).seed(centers=40)
+    url = server.start()
+    ...
+    server.stats()   # {"requests": ..., "bytes_in": ..., "bytes_out": ..., "by_route": {...}}
+    server.stop()
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qsl, unquote
+
+# Tables returned by get_center_bundle, and the center-level columns it strips
+BUNDLE_TABLES = ("kennel_suites", "daycamp_daily", "daycamp_packages")
+BUNDLE_STRIPPED = ("center_name", "district_manager", "full_address", "created_at")
+
+SUITE_NAMES = ["Standard", "Large", "Luxury", "Cat", "Cat Luxury"]
+DOG_SIZES = [["small"], ["small", "medium"], ["big", "extra big"], ["medium", "big"]]
+PACKAGE_DAYS = [5, 10, 20, 30, 40]
+
+_OPERATORS = ("eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "is", "in")
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas outside parentheses and double quotes."""
+    parts, depth, quoted, start, i = [], 0, False, 0, 0
+    while i < len(text):
+        ch = text[i]
+        if quoted:
+            if ch == "\\":
+                i += 1
+            elif ch == '"':
+                quoted = False
+        elif ch == '"':
+            quoted = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+        i += 1
+    parts.append(text[start:])
+    return [part for part in parts if part]
+
+
+def _unquote_value(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r"\\(.)", r"\1", value[1:-1])
+    return value
+
+
+def _coerce(value: str, sample: Any) -> Any:
+    """Convert a filter value to the type of the stored value it is compared with."""
+    if isinstance(sample, bool):
+        return value.lower() == "true"
+    if isinstance(sample, (int, float)):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _matches(row: Dict[str, Any], column: str, expression: str) -> bool:
+    """Evaluate one ``op.value`` (or ``not.op.value``) condition against a row."""
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    operator, _, raw = expression.partition(".")
+    if operator not in _OPERATORS:
+        raise ValueError(f"unsupported operator {operator}")
+    actual = row.get(column)
+    if operator == "is":
+        expected = {"null": None, "true": True, "false": False}.get(raw.lower(), raw)
+        result = actual is expected if expected is None else actual == expected
+    elif operator == "in":
+        options = [_unquote_value(v) for v in _split_top_level(raw.strip()[1:-1])]
+        result = actual is not None and any(actual == _coerce(v, actual) or str(actual) == v for v in options)
+    elif actual is None:
+        result = False
+    else:
+        value = _unquote_value(raw)
+        if operator in ("like", "ilike"):
+            pattern = "^" + re.escape(value).replace(r"\*", ".*").replace("%", ".*") + "$"
+            result = re.match(pattern, str(actual), re.IGNORECASE if operator == "ilike" else 0) is not None
+        else:
+            expected = _coerce(value, actual)
+            if isinstance(expected, str) and not isinstance(actual, str):
+                actual = str(actual)
+            result = {
+                "eq": actual == expected, "neq": actual != expected, "gt": actual > expected,
+                "gte": actual >= expected, "lt": actual < expected, "lte": actual <= expected,
+            }[operator]
+    return not result if negate else result
+
+
+def _logic(row: Dict[str, Any], kind: str, body: str) -> bool:
+    """Evaluate an or=(...)/and=(...) condition list."""
+    results = []
+    for term in _split_top_level(body):
+        match = re.match(r"^(not\.)?(and|or)\((.*)\)$", term, re.DOTALL)
+        if match:
+            value = _logic(row, match.group(2), match.group(3))
+            results.append(not value if match.group(1) else value)
+        else:
+            column, _, expression = term.partition(".")
+            results.append(_matches(row, column, expression))
+    return any(results) if kind == "or" else all(results)
+
+
+class _State:
+    """Tables, counters and the latency model shared by the request handlers."""
+
+    def __init__(self, latency_ms: float, jitter_ms: float, seed: int):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        # Reentrant: handlers answer errors (and so record the request) while holding it
+        self.lock = threading.RLock()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.random = random.Random(seed)
+        self.last_timestamp = ""
+        self.requests: List[Tuple[str, str, int, int, float]] = []
+
+    def now(self) -> str:
+        # Strictly increasing, so updated_at works as a version like the real trigger
+        stamp = datetime.now(timezone.utc).isoformat(timespec="microseconds")
+        if stamp <= self.last_timestamp:
+            last = datetime.fromisoformat(self.last_timestamp)
+            stamp = last.replace(microsecond=(last.microsecond + 1) % 1000000).isoformat(timespec="microseconds")
+        self.last_timestamp = stamp
+        return stamp
+
+    def delay(self) -> None:
+        seconds = (self.latency_ms + self.random.uniform(0, self.jitter_ms)) / 1000
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: _State
+
+    def log_message(self, *args):
+        pass
+
+    # --- plumbing ---
+
+    def _route(self) -> Tuple[str, Dict[str, List[str]]]:
+        url = urlparse(self.path)
+        params: Dict[str, List[str]] = {}
+        for key, value in parse_qsl(url.query, keep_blank_values=True):
+            params.setdefault(key, []).append(value)
+        return unquote(url.path.rstrip("/").split("/rest/v1/", 1)[-1]), params
+
+    def _begin(self) -> None:
+        # One handler serves every request on a keep-alive connection; reset per request
+        self._started = time.perf_counter()
+        self._bytes_in = 0
+
+    def _body(self) -> Any:
+        length = int(self.headers.get("Content-Length", 0))
+        self._bytes_in = length
+        return json.loads(self.rfile.read(length) or b"null") if length else None
+
+    def _send(self, code: int, payload: Any) -> None:
+        started = self._started
+        self.state.delay()
+        out = b"" if payload is None else json.dumps(payload, default=str).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+        route, _ = self._route()
+        with self.state.lock:
+            self.state.requests.append((self.command, route, self._bytes_in, len(out),
+                                        time.perf_counter() - started))
+
+    def _error(self, code: int, message: str, error_code: str = "PGRST100", details: Optional[str] = None) -> None:
+        self._send(code, {"code": error_code, "message": message, "details": details, "hint": None})
+
+    def _filtered(self, rows: List[Dict[str, Any]], params: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+        for key, values in params.items():
+            if key in ("select", "order", "limit", "offset", "on_conflict", "columns"):
+                continue
+            for value in values:
+                if key in ("or", "and"):
+                    rows = [row for row in rows if _logic(row, key, value.strip()[1:-1])]
+                else:
+                    rows = [row for row in rows if _matches(row, key, value)]
+        return rows
+
+    def _represent(self, rows: List[Dict[str, Any]], params: Dict[str, List[str]]) -> Optional[List[Dict[str, Any]]]:
+        if "return=minimal" in self.headers.get("Prefer", ""):
+            return None
+        columns = params.get("select", ["*"])[0].split(",")
+        if "*" in columns:
+            return [dict(row) for row in rows]
+        return [{column: row.get(column) for column in columns} for row in rows]
+
+    # --- verbs ---
+
+    def do_GET(self):
+        self._begin()
+        table, params = self._route()
+        with self.state.lock:
+            if table not in self.state.tables:
+                return self._error(404, f'relation "public.{table}" does not exist', "42P01")
+            try:
+                rows = self._filtered(self.state.tables[table], params)
+            except ValueError as e:
+                return self._error(400, str(e))
+            for term in reversed(",".join(params.get("order", [])).split(",") if params.get("order") else []):
+                column, _, direction = term.partition(".")
+                desc = direction.startswith("desc")
+                # PostgREST puts NULLs last ascending and first descending
+                rows = sorted(rows, key=lambda row: (row.get(column) is None,
+                                                     0 if row.get(column) is None else row[column]),
+                              reverse=desc)
+            offset = int(params.get("offset", ["0"])[0])
+            limit = int(params["limit"][0]) if "limit" in params else None
+            rows = rows[offset:None if limit is None else offset + limit]
+            payload = self._represent(rows, params)
+        self._send(200, payload)
+
+    def do_POST(self):
+        self._begin()
+        route, params = self._route()
+        body = self._body()
+        if route.startswith("rpc/"):
+            return self._rpc(route[4:], body or {})
+        prefer = self.headers.get("Prefer", "")
+        records = body if isinstance(body, list) else [body]
+        written = []
+        with self.state.lock:
+            if route not in self.state.tables:
+                return self._error(404, f'relation "public.{route}" does not exist', "42P01")
+            table = self.state.tables[route]
+            by_id = {row["id"]: row for row in table}
+            for record in records:
+                existing = by_id.get(record.get("id"))
+                if existing is not None:
+                    if "ignore-duplicates" in prefer:
+                        continue
+                    if "merge-duplicates" not in prefer:
+                        return self._error(409, "duplicate key value violates unique constraint", "23505")
+                    existing.update(record)
+                    existing["updated_at"] = self.state.now()
+                    written.append(existing)
+                else:
+                    stamp = self.state.now()
+                    row = {"id": str(uuid.uuid4()), "created_at": stamp, "updated_at": stamp, **record}
+                    table.append(row)
+                    by_id[row["id"]] = row
+                    written.append(row)
+            payload = self._represent(written, params)
+        self._send(201, payload)
+
+    def do_PATCH(self):
+        self._begin()
+        table, params = self._route()
+        changes = self._body() or {}
+        with self.state.lock:
+            if table not in self.state.tables:
+                return self._error(404, f'relation "public.{table}" does not exist', "42P01")
+            rows = self._filtered(self.state.tables[table], params)
+            for row in rows:
+                row.update(changes)
+                row["updated_at"] = self.state.now()
+            payload = self._represent(rows, params)
+        self._send(200, payload)
+
+    def do_DELETE(self):
+        self._begin()
+        table, params = self._route()
+        self._body()
+        with self.state.lock:
+            if table not in self.state.tables:
+                return self._error(404, f'relation "public.{table}" does not exist', "42P01")
+            doomed = self._filtered(self.state.tables[table], params)
+            ids = {id(row) for row in doomed}
+            self.state.tables[table] = [row for row in self.state.tables[table] if id(row) not in ids]
+            payload = self._represent(doomed, params)
+        self._send(200, payload)
+
+    def _rpc(self, name: str, args: Dict[str, Any]) -> None:
+        if name == "bulk_update_records":
+            return self._bulk_update(args.get("p_table"), args.get("p_rows") or [])
+        if name != "get_center_bundle":
+            return self._error(404, f"Could not find the function public.{name}", "PGRST202")
+        center = args.get("p_center_name")
+        with self.state.lock:
+            bundle = {}
+            for table in BUNDLE_TABLES:
+                rows = sorted((row for row in self.state.tables.get(table, []) if row.get("center_name") == center),
+                              key=lambda row: (row.get("created_at") or "", row["id"]))
+                bundle[table] = [{k: v for k, v in row.items() if k not in BUNDLE_STRIPPED} for row in rows]
+        self._send(200, bundle)
+
+    def _bulk_update(self, table: str, updates: List[Dict[str, Any]]) -> None:
+        # Same contract as sql/functions/bulk_update.sql: every row or none
+        missing, conflicts, written = table not in self.state.tables, [], []
+        with self.state.lock:
+            by_id = {} if missing else {row["id"]: row for row in self.state.tables[table]}
+            conflicts = [update["id"] for update in updates
+                         if update["id"] not in by_id
+                         or update.get("updated_at") not in (None, by_id[update["id"]].get("updated_at"))]
+            if not (missing or conflicts):
+                for update in updates:
+                    row = by_id[update["id"]]
+                    row.update(update.get("changes") or {})
+                    row["updated_at"] = self.state.now()
+                    written.append(dict(row))
+        # _send() takes the lock itself
+        if missing:
+            return self._error(404, f'relation "{table}" does not exist', "42P01")
+        if conflicts:
+            return self._error(409, "records changed or deleted since they were read", "PT409", json.dumps(conflicts))
+        self._send(200, written)
+
+
+class FakePostgrest:
+    """A threaded fake PostgREST server holding the app's tables in memory."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 1):
+        self._state = _State(latency_ms, jitter_ms, seed)
+        self._state.tables = {table: [] for table in ("centers",) + BUNDLE_TABLES}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def tables(self) -> Dict[str, List[Dict[str, Any]]]:
+        return self._state.tables
+
+    def seed(self, centers: int = 40, managers: int = 4, suites_per_center: int = 4,
+             packages_per_center: int = 3) -> "FakePostgrest":
+        """Fill the tables with synthetic centers and pricing; returns self."""
+        rng = random.Random(7)
+        tables = self._state.tables
+        for i in range(1, centers + 1):
+            name, manager = f"Center {i:03d}", f"Manager {(i - 1) % managers + 1}"
+            address = f"{i} Main St, Springfield"
+            stamp = self._state.now()
+            base = {"center_name": name, "district_manager": manager, "full_address": address,
+                    "created_at": stamp, "updated_at": stamp}
+            tables["centers"].append({"id": str(uuid.uuid4()), "ctr_cd": f"C{i:04d}", "ctr_name": name,
+                                      "district_manager": manager, "full_address": address, "active": True,
+                                      "state": ["TX", "CA", "NY", "FL"][i % 4], "nelson_dma": f"DMA {i % 9}",
+                                      "created_at": stamp, "updated_at": stamp})
+            for s in range(suites_per_center):
+                tables["kennel_suites"].append({
+                    "id": str(uuid.uuid4()), **base, "suite_name": SUITE_NAMES[s % len(SUITE_NAMES)],
+                    "dog_sizes": DOG_SIZES[(i + s) % len(DOG_SIZES)], "price_per_night": float(rng.randint(35, 90)),
+                    "price_additional_dog": float(rng.randint(5, 20)), "num_kennels": rng.randint(2, 30),
+                    "features": ["climate controlled", f"feature {rng.randint(1, 40)}"],
+                })
+            tables["daycamp_daily"].append({"id": str(uuid.uuid4()), **base, "dropin": 28.0,
+                                            "halfday": 14.0, "weekend": 14.0})
+            for p in range(packages_per_center):
+                days = PACKAGE_DAYS[p % len(PACKAGE_DAYS)]
+                tables["daycamp_packages"].append({"id": str(uuid.uuid4()), **base, "days": days,
+                                                   "price": float(days * rng.randint(18, 25)),
+                                                   "expiration": "60-day expiration"})
+        return self
+
+    def start(self) -> str:
+        """Start serving on a free local port; returns the base URL."""
+        handler = type("Handler", (_Handler,), {"state": self._state})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-postgrest", daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def set_latency(self, latency_ms: float, jitter_ms: float = 0.0) -> None:
+        self._state.latency_ms = latency_ms
+        self._state.jitter_ms = jitter_ms
+
+    def request_count(self) -> int:
+        with self._state.lock:
+            return len(self._state.requests)
+
+    def stats(self, since: int = 0) -> Dict[str, Any]:
+        """Totals for requests served after the first ``since`` (see request_count())."""
+        with self._state.lock:
+            requests = self._state.requests[since:]
+        by_route: Dict[str, int] = {}
+        for method, route, _, _, _ in requests:
+            by_route[f"{method} {route}"] = by_route.get(f"{method} {route}", 0) + 1
+        return {
+            "requests": len(requests),
+            "bytes_in": sum(r[2] for r in requests),
+            "bytes_out": sum(r[3] for r in requests),
+            "by_route": by_route,
+        }
+
+    def wait_idle(self, quiet_seconds: float = 0.15, timeout: float = 5.0) -> None:
+        """Block until no request has arrived for ``quiet_seconds`` (background writes have landed)."""
+        deadline = time.time() + timeout
+        count, changed_at = self.request_count(), time.time()
+        while time.time() < deadline:
+            time.sleep(quiet_seconds / 3)
+            current = self.request_count()
+            if current != count:
+                count, changed_at = current, time.time()
+            elif time.time() - changed_at >= quiet_seconds:
+                return
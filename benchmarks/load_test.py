@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Find how many concurrent managers the portal serves before reruns degrade.
+
+Starts the app with ``streamlit run`` against benchmarks/fake_postgrest.py and
+drives simulated sessions over Streamlit's websocket protocol. Each session is
+its own browser tab with its own session state, as in production. Every
+session loops through realistic flows with a pause between interactions:
+picking a district manager and center, adding a suite on Boarding Pricing,
+submitting daily options and adding a package on Day Camp Pricing, and
+editing a suite on Review & Submit.
+
+The number of sessions is stepped up (1, 2, 4, 8, ... by default). Each step
+reports rerun throughput, p50/p95/p99 rerun latency, the server process's
+memory and the queries per second reaching the backend. The knee of the
+curve is the first step where throughput stops growing with the added
+sessions, or p95 latency passes KNEE_P95_FACTOR times the single-session p95.
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --sessions 1,4,16,32,64 --duration 30 --think-ms 1000
+    python benchmarks/load_test.py --latency-ms 80 --json load.json
+
+Needs only the app's own requirements (``websockets`` comes with supabase).
+Memory is read from /proc, so it is reported on Linux only.
+"""
+
+import os
+import sys
+import json
+import socket
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import statistics
+import time
+import urllib.request
+from typing import Dict, Any, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_postgrest import FakePostgrest  # noqa: E402
+from page_benchmark import write_secrets  # noqa: E402
+
+STREAM_PATH = "/_stcore/stream"
+HEALTH_PATH = "/_stcore/health"
+SERVER_START_TIMEOUT_SECONDS = 60.0
+RERUN_TIMEOUT_SECONDS = 60.0
+MEMORY_SAMPLE_SECONDS = 0.5
+
+# Knee of the curve: throughput grew by less than this share of the added
+# sessions, or p95 passed this multiple of the single-session p95
+KNEE_THROUGHPUT_GAIN = 0.25
+KNEE_P95_FACTOR = 2.0
+
+
+class FlowError(Exception):
+    """A simulated session could not carry out an interaction."""
+
+
+class Session:
+    """One simulated browser tab connected to the app's websocket.
+
+    Widget values are sent the way the browser sends them: values the user
+    changed are repeated on every rerun, button clicks only on the next one.
+    Widgets the session never touched keep their server-side state.
+    """
+
+    def __init__(self, url: str, pages: Dict[str, str]):
+        self.url = url
+        self.pages = pages
+        self.page: Optional[str] = None
+        self.widgets: List[Tuple[str, Any]] = []
+        self._ws = None
+        self._values: Dict[str, Any] = {}
+        self._triggers: Dict[str, Any] = {}
+
+    async def open(self) -> None:
+        from websockets import connect
+        self._ws = await connect(self.url, max_size=None)
+
+    async def close(self) -> None:
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def run(self, page: Optional[str] = None) -> float:
+        """Rerun the current page (or open ``page``) and wait for it to finish.
+
+        Returns:
+            Rerun latency in ms, from sending the request until the last run
+            finished (a run ended by st.rerun() is followed by another)
+
+        Raises:
+            FlowError: The script raised an exception
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        if page is not None and page != self.page:
+            # Widgets belong to a page; navigating away drops their values
+            self.page, self._values, self._triggers = page, {}, {}
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = self.pages[self.page]
+        message.rerun_script.widget_states.widgets.extend(list(self._values.values()) + list(self._triggers.values()))
+        self._triggers = {}
+
+        started = time.perf_counter()
+        await self._ws.send(message.SerializeToString())
+        widgets, errors = [], []
+        while True:
+            reply = ForwardMsg()
+            reply.ParseFromString(await asyncio.wait_for(self._ws.recv(), RERUN_TIMEOUT_SECONDS))
+            kind = reply.WhichOneof("type")
+            if kind == "new_session":
+                widgets, errors = [], []
+            elif kind == "delta" and reply.delta.WhichOneof("type") == "new_element":
+                element = reply.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "exception":
+                    errors.append(element.exception.message)
+                elif element_type in ("selectbox", "number_input", "text_input", "button"):
+                    widgets.append((element_type, getattr(element, element_type)))
+            elif kind == "script_finished" and reply.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.widgets = widgets
+        if errors:
+            raise FlowError(errors[0])
+        return elapsed_ms
+
+    def find(self, element_type: str, label: str, form_id: Optional[str] = None) -> Any:
+        for found_type, proto in self.widgets:
+            if found_type == element_type and proto.label.startswith(label) and form_id in (None, proto.form_id):
+                return proto
+        raise FlowError(f"No {element_type} labelled {label!r} on {self.page}")
+
+    def _set(self, proto: Any, field: str, value: Any, trigger: bool = False) -> None:
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        state = WidgetState(id=proto.id)
+        setattr(state, field, value)
+        (self._triggers if trigger else self._values)[proto.id] = state
+
+    def select(self, label: str, choose) -> str:
+        """Pick an option of a selectbox; ``choose`` maps the option list to one option."""
+        proto = self.find("selectbox", label)
+        if not proto.options:
+            raise FlowError(f"Selectbox {label!r} has no options")
+        option = choose(list(proto.options))
+        self._set(proto, "string_value", option)
+        return option
+
+    def number(self, label: str, value: float, form_id: Optional[str] = None) -> None:
+        from streamlit.proto.NumberInput_pb2 import NumberInput
+        proto = self.find("number_input", label, form_id)
+        if proto.data_type == NumberInput.INT:
+            self._set(proto, "int_value", int(value))
+        else:
+            self._set(proto, "double_value", float(value))
+
+    def text(self, label: str, value: str) -> None:
+        self._set(self.find("text_input", label), "string_value", value)
+
+    def click(self, label: str, form_id: Optional[str] = None) -> None:
+        self._set(self.find("button", label, form_id), "trigger_value", True, trigger=True)
+
+
+# --- Flows: what a manager does on each page; every rerun is passed to record(interaction, rerun) ---
+
+async def _pick_center(session: Session, rng: random.Random, record) -> None:
+    session.select("Select your District Manager", rng.choice)
+    await record("select manager", session.run())
+    session.select("Select your Center", rng.choice)
+    await record("select center", session.run())
+
+
+async def boarding_flow(session: Session, rng: random.Random, record) -> None:
+    await record("open Boarding Pricing", session.run("Boarding Pricing"))
+    await _pick_center(session, rng, record)
+    session.number("Price per Dog per Night ($)", rng.randint(35, 80))
+    session.number("Price for Additional Dog", rng.randint(5, 20))
+    session.number("Number of kennels of this type", rng.randint(2, 20))
+    session.click("Add Suite")
+    await record("add suite", session.run())
+    session.click("Refresh Data")
+    await record("refresh records", session.run())
+
+
+async def day_camp_flow(session: Session, rng: random.Random, record) -> None:
+    await record("open Day Camp Pricing", session.run("Day Camp Pricing"))
+    await _pick_center(session, rng, record)
+    session.number("Daily Drop-In Price ($)", rng.randint(20, 40))
+    session.click("Submit Daily Options")
+    await record("submit daily options", session.run())
+    session.number("Number of Days in Package", rng.choice([5, 10, 20]))
+    session.number("Package Price ($)", rng.randint(90, 400))
+    session.text("Expiration Policy", "60-day expiration")
+    session.click("Add Package")
+    await record("add package", session.run())
+
+
+async def review_flow(session: Session, rng: random.Random, record) -> None:
+    await record("open Review & Submit", session.run("Review & Submit"))
+    await _pick_center(session, rng, record)
+    try:
+        price = session.find("number_input", "Price per Night ($)")
+    except FlowError:
+        # A center without suites has nothing to edit
+        return
+    session.number("Price per Night ($)", rng.randint(35, 80), form_id=price.form_id)
+    session.click("Update", form_id=price.form_id)
+    await record("update suite", session.run())
+    session.click("Refresh Data")
+    await record("refresh", session.run())
+
+
+FLOWS = {"boarding": boarding_flow, "day camp": day_camp_flow, "review": review_flow}
+
+
+# --- Server process ---
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(secrets_path: str, port: int, log_path: str) -> subprocess.Popen:
+    """Start ``streamlit run Home.py`` and wait until it answers its health check."""
+    log = open(log_path, "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "Home.py",
+         "--server.headless", "true", "--server.port", str(port), "--server.address", "127.0.0.1",
+         "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false",
+         "--secrets.files", secrets_path],
+        cwd=ROOT, stdout=log, stderr=subprocess.STDOUT,
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"streamlit exited with {process.returncode}; see {log_path}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}{HEALTH_PATH}", timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"streamlit did not start within {SERVER_START_TIMEOUT_SECONDS:.0f}s; see {log_path}")
+
+
+def process_rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of a process in MB, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+async def discover_pages(url: str) -> Dict[str, str]:
+    """Return {page name: page_script_hash} from the app's first run."""
+    from websockets import connect
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    pages = {}
+    async with connect(url, max_size=None) as ws:
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        await ws.send(message.SerializeToString())
+        while True:
+            reply = ForwardMsg()
+            reply.ParseFromString(await asyncio.wait_for(ws.recv(), RERUN_TIMEOUT_SECONDS))
+            kind = reply.WhichOneof("type")
+            # Older Streamlit lists pages in new_session, newer in a navigation message
+            if kind in ("new_session", "navigation"):
+                for page in getattr(reply, kind).app_pages:
+                    if page.page_name:
+                        pages[page.page_name] = page.page_script_hash
+            elif kind == "script_finished":
+                return pages
+
+
+# --- Load levels ---
+
+async def warm_up(url: str, pages: Dict[str, str], seed: int) -> None:
+    """Run every flow once, unmeasured, so the center directory and read replica are filled."""
+    session = Session(url, pages)
+    rng = random.Random(seed)
+
+    async def record(name: str, rerun) -> None:
+        await rerun
+
+    await session.open()
+    try:
+        for flow in FLOWS.values():
+            await flow(session, rng, record)
+    finally:
+        await session.close()
+    # The replica's first copy runs in the background
+    await asyncio.sleep(1.0)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+async def run_level(url: str, pages: Dict[str, str], sessions: int, duration: float, think_ms: float,
+                    server: FakePostgrest, pid: int, seed: int) -> Dict[str, Any]:
+    """Run ``sessions`` concurrent sessions for ``duration`` seconds and summarise the reruns."""
+    samples: List[Tuple[str, float]] = []
+    errors: List[str] = []
+    rss_samples: List[float] = []
+    stop_at = time.monotonic() + duration
+
+    async def session_loop(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        session = Session(url, pages)
+
+        async def record(name: str, rerun) -> None:
+            samples.append((name, await rerun))
+            # Think time, with jitter so sessions do not move in lockstep
+            await asyncio.sleep(think_ms / 1000 * rng.uniform(0.5, 1.5))
+
+        try:
+            await session.open()
+            while time.monotonic() < stop_at:
+                flow = rng.choice(list(FLOWS.values()))
+                try:
+                    await flow(session, rng, record)
+                except (FlowError, asyncio.TimeoutError) as e:
+                    errors.append(str(e) or type(e).__name__)
+        finally:
+            await session.close()
+
+    async def sample_memory() -> None:
+        while time.monotonic() < stop_at:
+            rss = process_rss_mb(pid)
+            if rss is not None:
+                rss_samples.append(rss)
+            await asyncio.sleep(MEMORY_SAMPLE_SECONDS)
+
+    before = server.request_count()
+    started = time.monotonic()
+    await asyncio.gather(sample_memory(), *(session_loop(i) for i in range(sessions)))
+    elapsed = time.monotonic() - started
+    backend_requests = server.request_count() - before
+
+    latencies = sorted(ms for _, ms in samples)
+    by_interaction = {}
+    for name, ms in samples:
+        by_interaction.setdefault(name, []).append(ms)
+    return {
+        "sessions": sessions,
+        "seconds": round(elapsed, 1),
+        "reruns": len(samples),
+        "reruns_per_s": round(len(samples) / elapsed, 2),
+        "p50_ms": round(_percentile(latencies, 50), 1) if latencies else None,
+        "p95_ms": round(_percentile(latencies, 95), 1) if latencies else None,
+        "p99_ms": round(_percentile(latencies, 99), 1) if latencies else None,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "rss_mb": round(rss_samples[-1], 1) if rss_samples else None,
+        "peak_rss_mb": round(max(rss_samples), 1) if rss_samples else None,
+        "backend_qps": round(backend_requests / elapsed, 1),
+        "interactions": {name: {"count": len(values), "p50_ms": round(statistics.median(values), 1)}
+                         for name, values in sorted(by_interaction.items())},
+    }
+
+
+def find_knee(levels: List[Dict[str, Any]]) -> Optional[int]:
+    """Return the session count where adding sessions stopped paying off, if any level reached it."""
+    if not levels or not levels[0]["p95_ms"]:
+        return None
+    base_p95 = levels[0]["p95_ms"]
+    for previous, current in zip(levels, levels[1:]):
+        added = current["sessions"] / previous["sessions"] - 1
+        gain = current["reruns_per_s"] / max(previous["reruns_per_s"], 1e-9) - 1
+        if gain < KNEE_THROUGHPUT_GAIN * added or (current["p95_ms"] or 0) > KNEE_P95_FACTOR * base_p95:
+            return current["sessions"]
+    return None
+
+
+def run_load_test(levels: List[int], duration: float, think_ms: float, latency_ms: float, jitter_ms: float,
+                  centers: int, replica_staleness: float, seed: int) -> Dict[str, Any]:
+    server = FakePostgrest(latency_ms=latency_ms, jitter_ms=jitter_ms, seed=seed).seed(centers=centers)
+    backend_url = server.start()
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    port = _free_port()
+    log_path = os.path.join(workdir, "streamlit.log")
+    process = start_app(write_secrets(backend_url, workdir, replica_staleness), port, log_path)
+    url = f"ws://127.0.0.1:{port}{STREAM_PATH}"
+    results = []
+    try:
+        pages = asyncio.run(discover_pages(url))
+        asyncio.run(warm_up(url, pages, seed))
+        for sessions in levels:
+            print(f"{sessions} sessions for {duration:.0f}s...", flush=True)
+            results.append(asyncio.run(run_level(url, pages, sessions, duration, think_ms, server,
+                                                 process.pid, seed)))
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        server.stop()
+    return {
+        "config": {"duration_s": duration, "think_ms": think_ms, "latency_ms": latency_ms,
+                   "jitter_ms": jitter_ms, "centers": centers, "replica_staleness": replica_staleness},
+        "levels": results,
+        "knee_sessions": find_knee(results),
+        "server_log": log_path,
+    }
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    config = results["config"]
+    print(f"\n{config['duration_s']:.0f}s per level, {config['think_ms']:.0f} ms think time, "
+          f"{config['latency_ms']} ms (+{config['jitter_ms']} ms jitter) backend latency, {config['centers']} centers\n")
+    print(f"{'sessions':>8}  {'reruns':>7}  {'reruns/s':>8}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  "
+          f"{'errors':>6}  {'RSS MB':>7}  {'peak MB':>7}  {'backend QPS':>11}")
+    for level in results["levels"]:
+        def fmt(value, spec):
+            return format(value, spec) if value is not None else "-"
+        print(f"{level['sessions']:>8}  {level['reruns']:>7}  {level['reruns_per_s']:>8.2f}  "
+              f"{fmt(level['p50_ms'], '>8.1f')}  {fmt(level['p95_ms'], '>8.1f')}  {fmt(level['p99_ms'], '>8.1f')}  "
+              f"{level['errors']:>6}  {fmt(level['rss_mb'], '>7.1f')}  {fmt(level['peak_rss_mb'], '>7.1f')}  "
+              f"{level['backend_qps']:>11.1f}")
+    for level in results["levels"]:
+        if level["first_error"]:
+            print(f"\n{level['sessions']} sessions, first error: {level['first_error']}")
+    knee = results["knee_sessions"]
+    if knee:
+        print(f"\nKnee: reruns degrade from about {knee} concurrent sessions.")
+    else:
+        print("\nNo knee within the tested levels; try more sessions.")
+    print(f"Server log: {results['server_log']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the app with concurrent simulated sessions.")
+    parser.add_argument("--sessions", default="1,2,4,8,16,32",
+                        help="Comma-separated concurrency levels to step through")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run each level")
+    parser.add_argument("--think-ms", type=float, default=500.0,
+                        help="Average pause between a session's interactions")
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="Latency added to every backend request")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Random extra latency, up to this much")
+    parser.add_argument("--centers", type=int, default=40, help="Synthetic centers to seed")
+    parser.add_argument("--replica-staleness", type=float, default=30.0,
+                        help="replica_max_staleness_seconds for the app (0 disables the read replica)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the data and the sessions' choices")
+    parser.add_argument("--json", metavar="FILE", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_load_test([int(n) for n in args.sessions.split(",")], args.duration, args.think_ms,
+                            args.latency_ms, args.jitter_ms, args.centers, args.replica_staleness, args.seed)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Measure how long each page takes to rerun and how much backend traffic each interaction costs.
+
+Runs Home.py, Boarding Pricing, Day Camp Pricing and Review & Submit with
+Streamlit's AppTest against benchmarks/fake_postgrest.py, a local stand-in
+for Supabase that adds a configurable network latency. For every interaction
+(first load, switching center, adding a suite, editing on Review, ...) it
+reports rerun latency percentiles, backend round trips and bytes transferred,
+including writes the page hands to background workers.
+
+Results are compared with benchmarks/page_baseline.json and the run fails if
+an interaction got worse:
+    python benchmarks/page_benchmark.py
+    python benchmarks/page_benchmark.py --update-baseline   # after an intended change
+    python benchmarks/page_benchmark.py --latency-ms 80 --runs 10 --json results.json
+
+Needs only the app's own requirements (Streamlit includes AppTest).
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+import tempfile
+import statistics
+import time
+from typing import Dict, Any, List, Callable, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_postgrest import FakePostgrest  # noqa: E402
+
+BASELINE_FILE = os.path.join(ROOT, "benchmarks", "page_baseline.json")
+
+# How far an interaction may drift from the baseline before the run fails.
+# Round trips and bytes are nearly deterministic; latency depends on the
+# machine, so it gets a relative margin plus an absolute one.
+ROUND_TRIP_SLACK = 0.5
+BYTES_TOLERANCE = 0.10
+LATENCY_TOLERANCE = 0.5
+LATENCY_SLACK_MS = 25.0
+
+
+def _noop(at) -> None:
+    pass
+
+
+def _select(label: str, index: int) -> Callable:
+    def action(at) -> None:
+        box = next(s for s in at.selectbox if s.label == label)
+        box.set_value(box.options[index % len(box.options)])
+    return action
+
+
+def _click(label: str) -> Callable:
+    def action(at) -> None:
+        next(b for b in at.button if b.label == label).click()
+    return action
+
+
+def _add_suite(at) -> None:
+    next(n for n in at.number_input if n.label == "Price per Dog per Night ($)").set_value(45.0)
+    next(n for n in at.number_input if n.label.startswith("Price for Additional Dog")).set_value(10.0)
+    next(n for n in at.number_input if n.label == "Number of kennels of this type").set_value(6)
+    _click("Add Suite")(at)
+
+
+def _add_package(at) -> None:
+    next(n for n in at.number_input if n.label == "Number of Days in Package").set_value(10)
+    next(n for n in at.number_input if n.label == "Package Price ($)").set_value(190.0)
+    next(t for t in at.text_input if t.label.startswith("Expiration Policy")).set_value("60-day expiration")
+    _click("Add Package")(at)
+
+
+def _update_suite(at) -> None:
+    price = next(n for n in at.number_input if n.label == "Price per Night ($)")
+    price.set_value(price.value + 1)
+    _click("Update")(at)
+
+
+# Page -> (script, interactions). Each interaction applies an action, then reruns the script.
+SCENARIOS: Dict[str, Tuple[str, List[Tuple[str, Callable]]]] = {
+    "Home": ("Home.py", [("load", _noop)]),
+    "Boarding Pricing": ("pages/Boarding Pricing.py", [
+        ("load", _noop),
+        ("rerun", _noop),
+        ("switch center", _select("Select your Center", 1)),
+        ("add suite", _add_suite),
+        ("refresh records", _click("Refresh Data")),
+    ]),
+    "Day Camp Pricing": ("pages/Day Camp Pricing.py", [
+        ("load", _noop),
+        ("submit daily options", _click("Submit Daily Options")),
+        ("add package", _add_package),
+        ("refresh records", _click("Refresh Data")),
+    ]),
+    "Review & Submit": ("pages/Review & Submit.py", [
+        ("load", _noop),
+        ("switch center", _select("Select your Center", 2)),
+        ("update suite", _update_suite),
+        ("refresh", _click("Refresh Data")),
+    ]),
+}
+
+
+def write_secrets(url: str, workdir: str, replica_staleness: float) -> str:
+    """Write a secrets.toml pointing the app at the fake server, with scratch outbox and replica files.
+
+    Returns:
+        Path of the secrets file
+    """
+    path = os.path.join(workdir, "secrets.toml")
+    with open(path, "w") as f:
+        f.write(f'supabase_url = "{url}"\n')
+        f.write(f'supabase_key = "{"x" * 40}"\n')
+        f.write(f'outbox_path = "{os.path.join(workdir, "outbox.sqlite3")}"\n')
+        f.write(f'replica_path = "{os.path.join(workdir, "replica.sqlite3")}"\n')
+        f.write(f"replica_max_staleness_seconds = {replica_staleness}\n")
+    return path
+
+
+def configure_app(url: str, workdir: str, replica_staleness: float) -> None:
+    """Point the app's secrets at the fake server.
+
+    A secrets file (rather than AppTest.secrets) keeps the settings visible
+    to the app's background threads, which run outside a script run.
+    """
+    from streamlit import config
+    config.set_option("secrets.files", [write_secrets(url, workdir, replica_staleness)])
+    # Background threads touching st.* outside a script run log a harmless warning each time
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+
+
+def run_benchmark(latency_ms: float, jitter_ms: float, runs: int, warmup: int, centers: int,
+                  replica_staleness: float) -> Dict[str, Any]:
+    from streamlit.testing.v1 import AppTest
+
+    server = FakePostgrest(latency_ms=latency_ms, jitter_ms=jitter_ms).seed(centers=centers)
+    url = server.start()
+    workdir = tempfile.mkdtemp(prefix="page-benchmark-")
+    configure_app(url, workdir, replica_staleness)
+    # Pages load bf_logo.png and the Excel fallback by relative path
+    os.chdir(ROOT)
+
+    samples: Dict[str, List[Tuple[float, int, int]]] = {}
+    for run in range(warmup + runs):
+        for page, (script, steps) in SCENARIOS.items():
+            at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=60)
+            for name, action in steps:
+                action(at)
+                before = server.request_count()
+                started = time.perf_counter()
+                at.run()
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if at.exception:
+                    raise RuntimeError(f"{page} / {name} raised: {at.exception[0].value}")
+                # Count writes handed to background workers against this interaction
+                server.wait_idle()
+                traffic = server.stats(since=before)
+                if run >= warmup:
+                    samples.setdefault(f"{page} / {name}", []).append(
+                        (elapsed_ms, traffic["requests"], traffic["bytes_in"] + traffic["bytes_out"]))
+    server.stop()
+
+    interactions = {}
+    for key, values in samples.items():
+        latencies = sorted(v[0] for v in values)
+        interactions[key] = {
+            "p50_ms": round(statistics.median(latencies), 1),
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))], 1),
+            "max_ms": round(latencies[-1], 1),
+            "round_trips": round(statistics.mean(v[1] for v in values), 2),
+            "bytes": int(statistics.mean(v[2] for v in values)),
+        }
+    return {
+        "config": {"latency_ms": latency_ms, "jitter_ms": jitter_ms, "runs": runs, "centers": centers,
+                   "replica_staleness": replica_staleness},
+        "interactions": interactions,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Return a description of every interaction that regressed against ``baseline``."""
+    problems = []
+    same_latency = (results["config"]["latency_ms"] == baseline["config"]["latency_ms"]
+                    and results["config"]["jitter_ms"] == baseline["config"]["jitter_ms"])
+    same_data = (results["config"]["centers"] == baseline["config"]["centers"]
+                 and results["config"]["replica_staleness"] == baseline["config"]["replica_staleness"])
+    for key, current in results["interactions"].items():
+        base = baseline["interactions"].get(key)
+        if base is None:
+            continue
+        if same_data and current["round_trips"] > base["round_trips"] + ROUND_TRIP_SLACK:
+            problems.append(f"{key}: {current['round_trips']} round trips (baseline {base['round_trips']})")
+        if same_data and current["bytes"] > base["bytes"] * (1 + BYTES_TOLERANCE):
+            problems.append(f"{key}: {current['bytes']:,} bytes (baseline {base['bytes']:,})")
+        if same_latency and current["p50_ms"] > base["p50_ms"] * (1 + LATENCY_TOLERANCE) + LATENCY_SLACK_MS:
+            problems.append(f"{key}: p50 {current['p50_ms']} ms (baseline {base['p50_ms']} ms)")
+    return problems
+
+
+def print_report(results: Dict[str, Any], baseline: Dict[str, Any] = None) -> None:
+    config = results["config"]
+    print(f"\n{config['runs']} runs, {config['latency_ms']} ms (+{config['jitter_ms']} ms jitter) backend latency, "
+          f"{config['centers']} centers\n")
+    width = max(len(key) for key in results["interactions"])
+    print(f"{'interaction'.ljust(width)}  {'p50 ms':>8}  {'p95 ms':>8}  {'max ms':>8}  {'trips':>6}  {'bytes':>9}"
+          + ("  baseline p50 / trips" if baseline else ""))
+    for key, r in results["interactions"].items():
+        line = (f"{key.ljust(width)}  {r['p50_ms']:>8.1f}  {r['p95_ms']:>8.1f}  {r['max_ms']:>8.1f}  "
+                f"{r['round_trips']:>6.2f}  {r['bytes']:>9,}")
+        base = (baseline or {}).get("interactions", {}).get(key)
+        if base:
+            line += f"  {base['p50_ms']:>8.1f} / {base['round_trips']:.2f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark page reruns against a local fake Supabase.")
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="Latency added to every backend request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra latency, up to this much")
+    parser.add_argument("--runs", type=int, default=5, help="Measured passes over every interaction")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured passes first (caches, connections)")
+    parser.add_argument("--centers", type=int, default=40, help="Synthetic centers to seed")
+    parser.add_argument("--replica-staleness", type=float, default=30.0,
+                        help="replica_max_staleness_seconds for the app (0 disables the read replica)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline file to compare with")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--json", metavar="FILE", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.latency_ms, args.jitter_ms, args.runs, args.warmup, args.centers,
+                            args.replica_staleness)
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        sys.exit(0)
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one.")
+        sys.exit(0)
+    problems = compare(results, baseline)
+    if problems:
+        print("\nRegressions against the baseline:")
+        for problem in problems:
+            print(f"- {problem}")
+        sys.exit(1)
+    print("\nNo regressions against the baseline.")
@@ -0,0 +1,138 @@
+import threading
+import time
+import math
+import os.path
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+from supabase_config import fetch_from_supabase
+from excel_snapshot import read_excel_snapshot
+from instrumentation import count_cache
+
+EXCEL_FILE = "Best Friends Location Info.xlsx"
+
+# How long a directory is served before it is rebuilt. The Excel fallback is
+# retried sooner so the app returns to the database once it is reachable.
+DIRECTORY_TTL_SECONDS = 300
+FALLBACK_TTL_SECONDS = 60
+
+
+@dataclass
+class CenterDirectory:
+    """Indexed snapshot of the centers table used by the center selector.
+
+    Attributes:
+        source: "database" or "excel"
+        managers: Sorted list of district managers
+        centers_by_manager: District manager -> center names in source order
+        rows_by_center: (district manager, center name) -> first matching row
+        warning: Message explaining why the Excel fallback is in use
+    """
+    source: str
+    managers: List[str] = field(default_factory=list)
+    centers_by_manager: Dict[str, List[str]] = field(default_factory=dict)
+    rows_by_center: Dict[Tuple[str, str], Dict[str, Any]] = field(default_factory=dict)
+    warning: str = ""
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    def centers_for(self, manager: str) -> List[str]:
+        """Return the centers managed by a district manager."""
+        return self.centers_by_manager.get(manager, [])
+
+    def row_for(self, manager: str, center: str) -> Optional[Dict[str, Any]]:
+        """Return the center row for a manager/center pair, if any."""
+        return self.rows_by_center.get((manager, center))
+
+    def is_expired(self) -> bool:
+        ttl = DIRECTORY_TTL_SECONDS if self.source == "database" else FALLBACK_TTL_SECONDS
+        return time.monotonic() - self.loaded_at > ttl
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def build_center_directory(rows: List[Dict[str, Any]], source: str, manager_col: str,
+                           center_col: str, address_col: str, warning: str = "") -> CenterDirectory:
+    """Build the selector indexes from a list of center rows.
+
+    Args:
+        rows: Center records as dictionaries
+        source: "database" or "excel"
+        manager_col: Column holding the district manager
+        center_col: Column holding the center name
+        address_col: Column holding the full address
+
+    Returns:
+        CenterDirectory with managers, manager->centers and center->row indexes
+    """
+    directory = CenterDirectory(source=source, warning=warning)
+    for row in rows:
+        if row.get("active") is False:
+            continue
+        manager = row.get(manager_col)
+        if _is_missing(manager):
+            continue
+        centers = directory.centers_by_manager.setdefault(manager, [])
+        center = row.get(center_col)
+        if _is_missing(center) or (manager, center) in directory.rows_by_center:
+            continue
+        centers.append(center)
+        address = row.get(address_col)
+        directory.rows_by_center[(manager, center)] = {
+            **row,
+            "full_address": "" if _is_missing(address) else address,
+        }
+    directory.managers = sorted(directory.centers_by_manager)
+    return directory
+
+
+def _load_from_excel(warning: str) -> Optional[CenterDirectory]:
+    if not os.path.exists(EXCEL_FILE):
+        return None
+    center_df = read_excel_snapshot(EXCEL_FILE)
+    center_df.columns = [c.strip().lower() for c in center_df.columns]
+    return build_center_directory(center_df.to_dict("records"), "excel",
+                                  "district manager", "ctr name", "full address", warning)
+
+
+def _load_directory() -> Optional[CenterDirectory]:
+    try:
+        centers_data = fetch_from_supabase("centers")
+        if centers_data:
+            return build_center_directory(centers_data, "database",
+                                          "district_manager", "ctr_name", "full_address")
+        warning = "No centers found in database. Falling back to Excel file."
+    except Exception as e:
+        warning = f"Error connecting to database: {str(e)}. Falling back to Excel file."
+    return _load_from_excel(warning)
+
+
+_directory: Optional[CenterDirectory] = None
+_directory_lock = threading.Lock()
+
+
+def get_center_directory() -> Optional[CenterDirectory]:
+    """Return the process-wide center directory, rebuilding it when expired.
+
+    Returns:
+        CenterDirectory, or None when neither the database nor the Excel
+        file has any centers
+    """
+    global _directory
+    directory = _directory
+    if directory is not None and not directory.is_expired():
+        count_cache("center_directory", hit=True)
+        return directory
+    with _directory_lock:
+        hit = _directory is not None and not _directory.is_expired()
+        if not hit:
+            _directory = _load_directory()
+        count_cache("center_directory", hit=hit)
+        return _directory
+
+
+def invalidate_center_directory() -> None:
+    """Drop the cached directory so the next lookup reloads the centers table."""
+    global _directory
+    with _directory_lock:
+        _directory = None
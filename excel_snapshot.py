@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import threading
+import pandas as pd
+from typing import Dict, Tuple
+
+# Snapshots of parsed workbooks live here, one per workbook file name. Each
+# records the workbook's mtime, size and content hash, which decide whether
+# it still matches the file.
+SNAPSHOT_DIR = os.path.join(".cache", "excel_snapshots")
+
+_memory: Dict[str, Tuple[Tuple[int, int], pd.DataFrame]] = {}
+_memory_lock = threading.Lock()
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _snapshot_paths(path: str) -> Tuple[str, str]:
+    name = os.path.basename(path)
+    return (os.path.join(SNAPSHOT_DIR, f"{name}.meta.json"),
+            os.path.join(SNAPSHOT_DIR, f"{name}.pkl"))
+
+
+def _write_snapshot(path: str, df: pd.DataFrame, meta: Dict) -> None:
+    meta_path, data_path = _snapshot_paths(path)
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    # Write to temp files first so a concurrent reader never sees a partial snapshot
+    df.to_pickle(data_path + ".tmp")
+    os.replace(data_path + ".tmp", data_path)
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def _load_snapshot(path: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    meta_path, data_path = _snapshot_paths(path)
+    meta = {}
+    if os.path.exists(meta_path) and os.path.exists(data_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+    # Fast path: the workbook has not been touched since the snapshot was taken
+    if meta.get("mtime_ns") == mtime_ns and meta.get("size") == size:
+        return pd.read_pickle(data_path)
+
+    # The file was touched; only reparse if its contents actually changed
+    sha256 = _file_hash(path)
+    if meta.get("sha256") == sha256:
+        df = pd.read_pickle(data_path)
+    else:
+        df = pd.read_excel(path)
+    _write_snapshot(path, df, {"mtime_ns": mtime_ns, "size": size, "sha256": sha256})
+    return df
+
+
+def read_excel_snapshot(path: str) -> pd.DataFrame:
+    """Read a workbook through a cached columnar snapshot.
+
+    The first read parses the workbook with pandas/openpyxl and stores the
+    resulting DataFrame as a pickle under ``.cache/``. Later reads reuse the
+    in-memory copy, or load the pickle from disk, and only reparse the
+    workbook when its mtime and SHA-256 show the contents changed.
+
+    Args:
+        path: Path to the Excel workbook
+
+    Returns:
+        DataFrame equivalent to ``pd.read_excel(path)``; callers may rename
+        columns but should not modify values in place
+    """
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _memory_lock:
+        cached = _memory.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1].copy(deep=False)
+        try:
+            df = _load_snapshot(path, *key)
+        except Exception:
+            # A corrupt or unreadable snapshot should never block the fallback
+            df = pd.read_excel(path)
+        _memory[path] = (key, df)
+        return df.copy(deep=False)
@@ -6,11 +6,262 @@ Run this once to populate the centers table with location data.
 
 import pandas as pd
 import streamlit as st
-from supabase_config import get_supabase_client, save_to_supabase
+from supabase_config import get_client_pool, save_to_supabase
 import sys
+import time
+import json
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple, Optional
 
-def import_centers_from_excel(excel_file="Best Friends Location Info.xlsx"):
-    """Import center data from Excel to Supabase centers table."""
+# Map Excel columns to database columns (lowercase in Excel)
+COLUMN_MAP = {
+    "ctr_cd": "ctr_cd",                      # Center code
+    "ctr name": "ctr_name",                  # Center name
+    "is_open": "is_open",                    # Is the center open
+    "is_acquisition": "is_acquisition",      # Is this an acquisition
+    "full address": "full_address",          # Full address
+    "state": "state",                        # State
+    "zipcode": "zipcode",                    # Zip code
+    "nelson dma": "nelson_dma",              # Nielsen DMA 
+    "dma code": "dma_code",                  # DMA code
+    "district manager": "district_manager",  # District manager
+    "market manager": "market_manager",      # Market manager
+    "center manager": "center_manager",      # Center manager
+    "crm email": "crm_email",               # CRM email
+    "services": "services",                  # Services offered
+    "system": "system",                      # System
+    "website": "website",                    # Website URL
+    "google ads account": "google_ads_account",        # Google Ads account
+    "google ads reports links": "google_ads_reports_links"  # Google Ads reports links
+}
+
+BOOLEAN_COLUMNS = ["is_open", "is_acquisition"]
+TRUTHY_STRINGS = ["yes", "true", "1", "t", "y"]
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_WORKERS = 4
+
+
+def prepare_center_records(center_df: pd.DataFrame) -> Tuple[List[Dict[str, Any]], int]:
+    """Convert a normalized Excel sheet into centers records using column operations.
+
+    Args:
+        center_df: Sheet with lowercase, stripped column names
+
+    Returns:
+        Tuple of (records, skipped) where skipped counts rows missing a
+        center name or district manager
+    """
+    present = {excel_col: db_col for excel_col, db_col in COLUMN_MAP.items() if excel_col in center_df.columns}
+    records_df = center_df[list(present)].rename(columns=present)
+
+    for col in records_df.columns:
+        values = records_df[col]
+        if col in BOOLEAN_COLUMNS:
+            # Same rules as the row-by-row import: non-zero numbers and
+            # yes/true/1/t/y strings are true, everything else is false
+            if pd.api.types.is_bool_dtype(values):
+                records_df[col] = values.fillna(False).astype(bool)
+            elif pd.api.types.is_numeric_dtype(values):
+                records_df[col] = values.fillna(0).ne(0)
+            else:
+                as_text = values.astype(str).str.strip().str.lower()
+                as_number = pd.to_numeric(values, errors="coerce").fillna(0)
+                records_df[col] = as_text.isin(TRUTHY_STRINGS) | as_number.ne(0)
+        else:
+            # Regular field, convert NaN to empty string
+            records_df[col] = values.astype(object).where(values.notna(), "")
+
+    required = pd.Series(True, index=records_df.index)
+    for col in ["ctr_name", "district_manager"]:
+        required &= records_df[col].astype(str).str.strip().ne("")
+    skipped = int((~required).sum())
+
+    records_df = records_df[required].copy()
+    records_df["active"] = True
+    return records_df.to_dict("records"), skipped
+
+
+def _upsert_chunk(index: int, chunk: List[Dict[str, Any]]) -> Tuple[int, int, float, Optional[str]]:
+    """Upsert one chunk of centers keyed on ctr_cd and time the round trip."""
+    started = time.perf_counter()
+    try:
+        response = get_client_pool().run(
+            lambda client: client.table("centers").upsert(chunk, on_conflict="ctr_cd").execute()
+        )
+        error = None if response.data else "No rows returned"
+    except Exception as e:
+        error = str(e)
+    return index, len(chunk), time.perf_counter() - started, error
+
+
+def bulk_upsert_centers(records: List[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        workers: int = DEFAULT_WORKERS) -> Tuple[int, int]:
+    """Upsert centers in chunks, running up to ``workers`` chunks at once.
+
+    Args:
+        records: Center records; rows without a ctr_cd cannot be keyed and are skipped
+        chunk_size: Number of rows sent per request
+        workers: Maximum number of chunks in flight
+
+    Returns:
+        Tuple of (rows upserted, rows failed)
+    """
+    # ctr_cd is the upsert key, so it must be present and unique within a request
+    keyed = {}
+    missing_code = 0
+    for record in records:
+        code = str(record.get("ctr_cd", "")).strip()
+        if not code:
+            missing_code += 1
+            continue
+        keyed[code] = {**record, "ctr_cd": code}
+    if missing_code:
+        print(f"Skipping {missing_code} rows without a ctr_cd")
+    rows = list(keyed.values())
+    chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+
+    print(f"Upserting {len(rows)} centers in {len(chunks)} chunks of up to {chunk_size} ({workers} workers)...")
+    started = time.perf_counter()
+    success_count = 0
+    error_count = missing_code
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(_upsert_chunk, i, chunk) for i, chunk in enumerate(chunks, 1)]
+        for future in futures:
+            index, size, seconds, error = future.result()
+            if error:
+                print(f"Chunk {index}/{len(chunks)}: {size} rows failed in {seconds:.2f}s: {error}")
+                error_count += size
+            else:
+                print(f"Chunk {index}/{len(chunks)}: {size} rows in {seconds:.2f}s")
+                success_count += size
+    elapsed = time.perf_counter() - started
+    rate = success_count / elapsed if elapsed > 0 else 0.0
+    print(f"Bulk upsert finished in {elapsed:.2f}s ({rate:.0f} rows/s).")
+    return success_count, error_count
+
+
+SYNC_PAGE_SIZE = 1000
+
+
+def _row_hash(record: Dict[str, Any], columns: List[str]) -> str:
+    """Hash the synced columns of a center so Excel and database rows compare equal."""
+    normalized = []
+    for col in columns:
+        value = record.get(col)
+        if isinstance(value, bool):
+            normalized.append("true" if value else "false")
+        elif value is None:
+            normalized.append("")
+        else:
+            normalized.append(str(value).strip())
+    return hashlib.sha1(json.dumps(normalized).encode("utf-8")).hexdigest()
+
+
+def _fetch_existing_centers(columns: List[str]) -> List[Dict[str, Any]]:
+    """Fetch the synced columns of every stored center, paging past the PostgREST row cap."""
+    select = ",".join(dict.fromkeys(["ctr_cd", "active", *columns]))
+    rows = []
+    while True:
+        start = len(rows)
+        response = get_client_pool().run(
+            lambda client: client.table("centers").select(select)
+            .order("ctr_cd").range(start, start + SYNC_PAGE_SIZE - 1).execute(),
+            retry=True,
+        )
+        rows.extend(response.data)
+        if len(response.data) < SYNC_PAGE_SIZE:
+            return rows
+
+
+def _deactivate_centers(codes: List[str], chunk_size: int) -> Tuple[int, int]:
+    """Set active = false for the given center codes, one request per chunk."""
+    success_count = error_count = 0
+    for i in range(0, len(codes), chunk_size):
+        chunk = codes[i:i + chunk_size]
+        try:
+            get_client_pool().run(
+                lambda client: client.table("centers").update({"active": False}).in_("ctr_cd", chunk).execute()
+            )
+            success_count += len(chunk)
+        except Exception as e:
+            print(f"Error deactivating {len(chunk)} centers: {str(e)}")
+            error_count += len(chunk)
+    return success_count, error_count
+
+
+def sync_centers(records: List[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 workers: int = DEFAULT_WORKERS, dry_run: bool = False) -> Dict[str, Any]:
+    """Bring the centers table in line with ``records`` by writing only what changed.
+
+    Incoming and stored rows are hashed over the synced columns and matched
+    on ctr_cd. New codes are inserted, changed rows are updated, and stored
+    centers missing from the sheet are deactivated rather than deleted, so
+    the selector never sees an empty table.
+
+    Args:
+        records: Center records from prepare_center_records()
+        chunk_size: Rows per request
+        workers: Maximum concurrent upsert requests
+        dry_run: Compute and print the changeset without writing
+
+    Returns:
+        Changeset summary with counts of inserts, updates, deactivations,
+        unchanged rows and errors
+    """
+    incoming = {}
+    for record in records:
+        code = str(record.get("ctr_cd", "")).strip()
+        if code:
+            incoming[code] = {**record, "ctr_cd": code}
+    columns = sorted({col for record in incoming.values() for col in record})
+
+    stored = {row["ctr_cd"]: row for row in _fetch_existing_centers(columns) if row.get("ctr_cd")}
+
+    inserts = [record for code, record in incoming.items() if code not in stored]
+    updates = [record for code, record in incoming.items()
+               if code in stored and _row_hash(record, columns) != _row_hash(stored[code], columns)]
+    deactivations = sorted(code for code, row in stored.items() if code not in incoming and row.get("active") is not False)
+    summary = {
+        "inserts": len(inserts),
+        "updates": len(updates),
+        "deactivations": len(deactivations),
+        "unchanged": len(incoming) - len(inserts) - len(updates),
+        "skipped": len(records) - len(incoming),
+        "errors": 0,
+    }
+    print(f"Changeset: {summary['inserts']} inserts, {summary['updates']} updates, "
+          f"{summary['deactivations']} deactivations, {summary['unchanged']} unchanged, "
+          f"{summary['skipped']} without ctr_cd.")
+    if dry_run:
+        return summary
+
+    if inserts or updates:
+        _, upsert_errors = bulk_upsert_centers(inserts + updates, chunk_size, workers)
+        summary["errors"] += upsert_errors
+    if deactivations:
+        _, deactivate_errors = _deactivate_centers(deactivations, chunk_size)
+        summary["errors"] += deactivate_errors
+    if not (inserts or updates or deactivations):
+        print("Centers are already up to date; nothing to write.")
+    return summary
+
+
+def import_centers_from_excel(excel_file="Best Friends Location Info.xlsx", clear=False, bulk=False,
+                              chunk_size=DEFAULT_CHUNK_SIZE, workers=DEFAULT_WORKERS, sync=False, dry_run=False):
+    """Import center data from Excel to Supabase centers table.
+
+    Args:
+        excel_file: Path to the location info workbook
+        clear: Delete the existing centers before importing
+        bulk: Upsert in concurrent chunks keyed on ctr_cd instead of one insert per row
+        chunk_size: Rows per request in bulk mode
+        workers: Maximum concurrent requests in bulk mode
+        sync: Write only inserts, updates and deactivations for rows that changed
+        dry_run: In sync mode, report the changeset without writing
+    """
     print(f"Reading data from {excel_file}...")
     
     try:
@@ -19,28 +270,6 @@ def import_centers_from_excel(excel_file="Best Friends Location Info.xlsx"):
         # Normalize column names
         center_df.columns = [c.strip().lower() for c in center_df.columns]
         
-        # Map Excel columns to database columns (lowercase in Excel)
-        col_map = {
-            "ctr_cd": "ctr_cd",                      # Center code
-            "ctr name": "ctr_name",                  # Center name
-            "is_open": "is_open",                    # Is the center open
-            "is_acquisition": "is_acquisition",      # Is this an acquisition
-            "full address": "full_address",          # Full address
-            "state": "state",                        # State
-            "zipcode": "zipcode",                    # Zip code
-            "nelson dma": "nelson_dma",              # Nielsen DMA 
-            "dma code": "dma_code",                  # DMA code
-            "district manager": "district_manager",  # District manager
-            "market manager": "market_manager",      # Market manager
-            "center manager": "center_manager",      # Center manager
-            "crm email": "crm_email",               # CRM email
-            "services": "services",                  # Services offered
-            "system": "system",                      # System
-            "website": "website",                    # Website URL
-            "google ads account": "google_ads_account",        # Google Ads account
-            "google ads reports links": "google_ads_reports_links"  # Google Ads reports links
-        }
-        
         # Required columns check
         required_cols = ["district manager", "ctr name"]
         missing_cols = [col for col in required_cols if col not in center_df.columns]
@@ -48,15 +277,30 @@ def import_centers_from_excel(excel_file="Best Friends Location Info.xlsx"):
             print(f"Error: Missing required columns in Excel: {missing_cols}")
             return False
         
-        # Get Supabase client
-        client = get_supabase_client()
+        if sync:
+            records, skipped = prepare_center_records(center_df)
+            print(f"Found {len(center_df)} centers to sync ({skipped} missing required data).")
+            summary = sync_centers(records, chunk_size, workers, dry_run=dry_run)
+            print(f"Sync completed: {summary}")
+            return summary["errors"] == 0
+        
+        # Each request checks a client out of the shared pool and returns it
+        pool = get_client_pool()
         
         # Optional: Clear existing data
-        if len(sys.argv) > 1 and sys.argv[1] == "--clear":
+        if clear:
             print("Clearing existing centers table...")
-            client.table("centers").delete().execute()
+            pool.run(lambda client: client.table("centers").delete().execute())
             print("Existing data cleared.")
         
+        if bulk:
+            records, skipped = prepare_center_records(center_df)
+            print(f"Found {len(center_df)} centers to import ({skipped} missing required data).")
+            success_count, error_count = bulk_upsert_centers(records, chunk_size, workers)
+            error_count += skipped
+            print(f"Import completed: {success_count} centers imported successfully, {error_count} errors.")
+            return success_count > 0
+        
         # Insert each row into Supabase
         success_count = 0
         error_count = 0
@@ -67,7 +311,7 @@ def import_centers_from_excel(excel_file="Best Friends Location Info.xlsx"):
             center_data = {}
             
             # Map all available columns from Excel to DB fields
-            for excel_col, db_col in col_map.items():
+            for excel_col, db_col in COLUMN_MAP.items():
                 if excel_col in row.index:
                     # Handle special case for boolean fields
                     if db_col in ["is_open", "is_acquisition"]:
@@ -97,14 +341,14 @@ def import_centers_from_excel(excel_file="Best Friends Location Info.xlsx"):
             
             # Save to Supabase
             try:
-                response = client.table("centers").insert(center_data).execute()
+                response = pool.run(lambda client: client.table("centers").insert(center_data).execute())
                 if response.data:
                     success_count += 1
                 else:
                     print(f"Error importing: {center_data}")
                     error_count += 1
             except Exception as e:
-                print(f"Exception importing {center_data['center_name']}: {str(e)}")
+                print(f"Exception importing {center_data['ctr_name']}: {str(e)}")
                 error_count += 1
         
         print(f"Import completed: {success_count} centers imported successfully, {error_count} errors.")
@@ -115,5 +359,19 @@ def import_centers_from_excel(excel_file="Best Friends Location Info.xlsx"):
         return False
 
 if __name__ == "__main__":
-    # This allows the script to be run from command line: python import_centers.py [--clear]
-    import_centers_from_excel()
+    # This allows the script to be run from command line:
+    # python import_centers.py [--clear | --sync [--dry-run]] [--bulk] [--chunk-size N] [--workers N] [excel_file]
+    parser = argparse.ArgumentParser(description="Import Best Friends centers from Excel into Supabase.")
+    parser.add_argument("excel_file", nargs="?", default="Best Friends Location Info.xlsx")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--clear", action="store_true", help="Delete existing centers before importing")
+    mode.add_argument("--sync", action="store_true", help="Only write inserts, updates and deactivations that changed")
+    parser.add_argument("--dry-run", action="store_true", help="With --sync, print the changeset without writing")
+    parser.add_argument("--bulk", action="store_true", help="Upsert in concurrent chunks keyed on ctr_cd")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per request in bulk mode")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent requests in bulk mode")
+    args = parser.parse_args()
+    success = import_centers_from_excel(args.excel_file, clear=args.clear, bulk=args.bulk,
+                                        chunk_size=args.chunk_size, workers=args.workers,
+                                        sync=args.sync, dry_run=args.dry_run)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,380 @@
+import bisect
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Callable, Iterator, Tuple, Deque, TypeVar
+import streamlit as st
+
+T = TypeVar("T")
+
+# Spans kept in memory; older ones are dropped (dump them first to keep them)
+DEFAULT_SPAN_CAPACITY = 5000
+DEFAULT_SPAN_LOG_PATH = os.path.join(".cache", "spans.jsonl")
+
+# Upper bounds of the latency histogram buckets, in ms; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# A rerun left open by st.rerun() is closed by the next run of the session if
+# that starts within this many seconds; otherwise (st.stop(), an exception,
+# the session going away) its end time is unknown
+INTERRUPTED_RERUN_GAP_SECONDS = 1.0
+
+_SESSION_KEY = "_diagnostics_open_rerun"
+# Sidebar links (pages/Diagnostics.py) that are reachable by URL but not listed
+HIDDEN_PAGES = ("Diagnostics",)
+
+
+@dataclass
+class Span:
+    """One timed unit of work: a supabase_config call or a page script run.
+
+    Attributes:
+        kind: "call" or "rerun"
+        name: Function name for calls, page name for reruns
+        operation: "read", "write", "delete", "sync" or "replay" for calls; "rerun" for reruns
+        table: Table the call touched, if it touched one
+        rows: Rows read or written
+        bytes: JSON payload bytes sent to or received from the database
+        duration_ms: Wall time; None for a rerun whose end was not seen
+        status: "ok", "error" or, for reruns, "interrupted"
+        error: Error message when status is "error"
+        rerun_id: span_id of the rerun the call ran in, if any
+        calls: For reruns, number of calls made while it ran
+        last_activity_at: For reruns, when it started or its latest call ended
+    """
+    kind: str
+    name: str
+    operation: str
+    table: Optional[str] = None
+    rows: Optional[int] = None
+    bytes: int = 0
+    duration_ms: Optional[float] = None
+    status: str = "ok"
+    error: Optional[str] = None
+    rerun_id: Optional[str] = None
+    calls: int = 0
+    started_at: float = 0.0
+    last_activity_at: float = 0.0
+    span_id: str = ""
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram covering everything since the process started."""
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, duration_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th percentile (0-100), or None if empty.
+
+        The open-ended last bucket reports the largest duration seen.
+        """
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[index] if index < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def buckets(self) -> List[Tuple[str, int]]:
+        """Return (label, count) per bucket, e.g. ("≤ 50 ms", 12)."""
+        labels = [f"≤ {bound} ms" for bound in self.bounds] + [f"> {self.bounds[-1]} ms"]
+        return list(zip(labels, self.counts))
+
+
+class SpanRecorder:
+    """Bounded, thread-safe store of recent spans plus cumulative histograms and cache counters."""
+
+    def __init__(self, capacity: int = DEFAULT_SPAN_CAPACITY):
+        self._lock = threading.Lock()
+        self._spans: Deque[Span] = deque(maxlen=capacity)
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._cache: Dict[str, Dict[str, int]] = {}
+        self.recorded = 0
+
+    def record(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+            self.recorded += 1
+            if span.duration_ms is not None:
+                self._histograms.setdefault((span.kind, span.name), LatencyHistogram()).observe(span.duration_ms)
+
+    def count_cache(self, cache: str, hit: bool) -> None:
+        with self._lock:
+            counters = self._cache.setdefault(cache, {"hits": 0, "misses": 0})
+            counters["hits" if hit else "misses"] += 1
+
+    def spans(self, kind: Optional[str] = None) -> List[Span]:
+        """Return buffered spans, oldest first, optionally only one kind."""
+        with self._lock:
+            return [item for item in self._spans if kind is None or item.kind == kind]
+
+    def histograms(self, kind: Optional[str] = None) -> Dict[str, LatencyHistogram]:
+        """Return histograms by span name, optionally only one kind."""
+        with self._lock:
+            return {name: histogram for (span_kind, name), histogram in self._histograms.items()
+                    if kind is None or span_kind == kind}
+
+    def cache_stats(self) -> Dict[str, Dict[str, float]]:
+        """Return hits, misses and hit_rate per cache."""
+        with self._lock:
+            return {
+                cache: {**counters, "hit_rate": counters["hits"] / max(1, counters["hits"] + counters["misses"])}
+                for cache, counters in self._cache.items()
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+            self._histograms.clear()
+            self._cache.clear()
+            self.recorded = 0
+
+
+_recorder = SpanRecorder()
+# Outermost call span of the current context; nested instrumented calls report into it
+_current_call: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_call", default=None)
+# Rerun span of the current script run
+_current_rerun: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_rerun", default=None)
+# Guards span counters updated from fetch_many/update_many_records worker threads
+_span_lock = threading.Lock()
+
+
+def get_recorder() -> SpanRecorder:
+    """Return the process-wide span recorder."""
+    return _recorder
+
+
+def _new_span(kind: str, name: str, operation: str, table: Optional[str] = None) -> Span:
+    now = time.time()
+    return Span(kind=kind, name=name, operation=operation, table=table,
+                started_at=now, last_activity_at=now, span_id=uuid.uuid4().hex[:12])
+
+
+def active() -> bool:
+    """Whether a call span is open in this context, i.e. whether add_bytes/add_rows are counted."""
+    return _current_call.get() is not None
+
+
+def add_bytes(size: int) -> None:
+    """Attribute payload bytes to the open call span, if any."""
+    current = _current_call.get()
+    if current is not None:
+        with _span_lock:
+            current.bytes += size
+
+
+def add_rows(count: int) -> None:
+    """Attribute rows read or written to the open call span, if any."""
+    current = _current_call.get()
+    if current is not None:
+        with _span_lock:
+            current.rows = (current.rows or 0) + count
+
+
+def count_cache(cache: str, hit: bool) -> None:
+    """Count a lookup in a named cache (e.g. "replica", "center_directory")."""
+    _recorder.count_cache(cache, hit)
+
+
+@contextmanager
+def span(name: str, operation: str, table: Optional[str] = None) -> Iterator[Span]:
+    """Time a call and record it, unless it runs inside another instrumented call.
+
+    Only the outermost call is recorded so "calls per rerun" counts what the
+    page asked for; bytes and rows of nested calls are added to it.
+
+    Args:
+        name: Function name
+        operation: "read", "write", "delete", "sync" or "replay"
+        table: Table the call touches, if known
+
+    Yields:
+        The span; nested calls get a throwaway span that is not recorded
+    """
+    current = _new_span("call", name, operation, table)
+    if _current_call.get() is not None:
+        yield current
+        return
+    rerun = _current_rerun.get()
+    current.rerun_id = rerun.span_id if rerun is not None else None
+    token = _current_call.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except Exception as e:
+        current.status, current.error = "error", str(e)
+        raise
+    finally:
+        current.duration_ms = (time.perf_counter() - started) * 1000
+        _current_call.reset(token)
+        if rerun is not None:
+            with _span_lock:
+                rerun.calls += 1
+                rerun.bytes += current.bytes
+                rerun.last_activity_at = time.time()
+        _recorder.record(current)
+
+
+def _result_rows(result: Any) -> Optional[int]:
+    """Rows carried by a supabase_config return value, when it carries any."""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, int) and not isinstance(result, bool):
+        # sync_replica_table / replay_outbox report rows changed or entries sent
+        return result
+    if isinstance(result, dict):
+        # fetch_many -> {query: FetchResult}; fetch_center_bundle -> {table: rows}
+        values = [getattr(value, "data", value) for value in result.values()]
+        return sum(len(value) for value in values if isinstance(value, list))
+    return None
+
+
+def _result_error(result: Any) -> Optional[str]:
+    """Error message for the (success, message) tuples and result objects supabase_config returns."""
+    if isinstance(result, tuple) and len(result) == 2 and result[0] is False:
+        return str(result[1])
+    if getattr(result, "success", True) is False:
+        return result.message
+    if type(result).__name__ == "UpdateResult" and not result.ok and not result.conflict:
+        return result.message
+    return None
+
+
+def traced(operation: str, table: Optional[str] = None) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator recording each call of a supabase_config function as a span.
+
+    Args:
+        operation: See span()
+        table: Fixed table name; by default it is taken from the first
+            argument (a table name or a TableQuery)
+    """
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            name = table
+            if name is None and args:
+                name = args[0] if isinstance(args[0], str) else getattr(args[0], "table", None)
+            with span(func.__name__, operation, name) as current:
+                result = func(*args, **kwargs)
+                if current.rows is None:
+                    current.rows = _result_rows(result)
+                error = _result_error(result)
+                if error is not None:
+                    current.status, current.error = "error", error
+                return result
+        return wrapper
+    return decorator
+
+
+def _hide_pages() -> None:
+    selectors = ", ".join(f'[data-testid="stSidebarNav"] li:has(a[href$="/{page}"])' for page in HIDDEN_PAGES)
+    st.html(f"<style>{selectors} {{ display: none; }}</style>")
+
+
+def begin_rerun(page: str) -> None:
+    """Start timing a page script run; call right after st.set_page_config().
+
+    A run that did not reach end_rerun() (st.rerun(), st.stop() or an
+    exception) is recorded here as interrupted. Its duration is only known
+    when this run starts straight after it, as it does after st.rerun().
+
+    Args:
+        page: Page name shown on the Diagnostics page
+    """
+    now = time.time()
+    previous: Optional[Span] = st.session_state.get(_SESSION_KEY)
+    if previous is not None:
+        previous.status = "interrupted"
+        if now - previous.last_activity_at <= INTERRUPTED_RERUN_GAP_SECONDS:
+            previous.duration_ms = (now - previous.started_at) * 1000
+        _recorder.record(previous)
+    current = _new_span("rerun", page, "rerun")
+    st.session_state[_SESSION_KEY] = current
+    _current_rerun.set(current)
+    _hide_pages()
+
+
+def end_rerun() -> None:
+    """Finish timing the page script run started by begin_rerun(); call at the end of the page."""
+    current = st.session_state.pop(_SESSION_KEY, None)
+    _current_rerun.set(None)
+    if current is None:
+        return
+    current.duration_ms = (time.time() - current.started_at) * 1000
+    _recorder.record(current)
+
+
+def rerun_summary(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Buffered reruns with their calls, slowest first.
+
+    Returns:
+        One dict per rerun: page, started_at, duration_ms, status, calls,
+        call_ms (time spent in calls) and bytes
+    """
+    reruns = _recorder.spans("rerun")
+    call_ms: Dict[str, float] = {}
+    for call in _recorder.spans("call"):
+        if call.rerun_id is not None and call.duration_ms is not None:
+            call_ms[call.rerun_id] = call_ms.get(call.rerun_id, 0.0) + call.duration_ms
+    rows = [{
+        "page": rerun.name,
+        "started_at": rerun.started_at,
+        "duration_ms": rerun.duration_ms,
+        "status": rerun.status,
+        "calls": rerun.calls,
+        "call_ms": round(call_ms.get(rerun.span_id, 0.0), 1),
+        "bytes": rerun.bytes,
+    } for rerun in reruns]
+    rows.sort(key=lambda row: -(row["duration_ms"] if row["duration_ms"] is not None else -1))
+    return rows[:limit] if limit else rows
+
+
+def span_log_path() -> str:
+    """Where dump_spans() writes; override with span_log_path in .streamlit/secrets.toml."""
+    return st.secrets.get("span_log_path", DEFAULT_SPAN_LOG_PATH)
+
+
+def dump_spans(path: Optional[str] = None) -> Tuple[str, int]:
+    """Append every buffered span to a JSONL file, one object per line.
+
+    Args:
+        path: File to append to; defaults to span_log_path()
+
+    Returns:
+        Tuple of (path written, number of spans written)
+    """
+    path = path or span_log_path()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    spans = _recorder.spans()
+    with open(path, "a", encoding="utf-8") as f:
+        for item in spans:
+            f.write(json.dumps(asdict(item), default=str) + "\n")
+    return path, len(spans)
+
+
+def spans_as_jsonl() -> str:
+    """Return the buffered spans as JSONL text, for a download button."""
+    return "".join(json.dumps(asdict(item), default=str) + "\n" for item in _recorder.spans())
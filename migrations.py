@@ -0,0 +1,244 @@
+import os
+import re
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Any, List, Tuple
+from supabase_config import get_client_pool
+
+DEFAULT_MIGRATIONS_DIR = os.path.join("sql", "migrations")
+
+# Migration files are named YYYY_MM_DD_description.sql; names decide the order they run in
+_MIGRATION_NAME = re.compile(r"^\d{4}_\d{2}_\d{2}_\w+\.sql$")
+
+# $tag$ ... $tag$ opener (the tag is optional: $$ ... $$)
+_DOLLAR_TAG = re.compile(r"\$([A-Za-z_][A-Za-z0-9_]*)?\$")
+# Statements PostgreSQL refuses to run inside a transaction block
+_NON_TRANSACTIONAL = re.compile(
+    r"^\s*(CREATE\s+(UNIQUE\s+)?INDEX\s+CONCURRENTLY|DROP\s+INDEX\s+CONCURRENTLY|REINDEX\b.*\bCONCURRENTLY"
+    r"|VACUUM\b|CREATE\s+DATABASE|DROP\s+DATABASE|ALTER\s+SYSTEM|ALTER\s+TYPE\s+\S+\s+ADD\s+VALUE)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+class MigrationError(Exception):
+    """A migration could not be parsed or applied."""
+
+
+def split_sql_statements(sql: str) -> List[str]:
+    """Split a SQL script into statements on top-level semicolons.
+
+    Semicolons inside string literals ('...', E'...'), quoted identifiers,
+    dollar-quoted bodies ($$ ... $$, $fn$ ... $fn$) and comments do not end a
+    statement. Comment-only fragments are dropped.
+
+    Args:
+        sql: Script text
+
+    Returns:
+        Statements without their trailing semicolon
+
+    Raises:
+        MigrationError: A quote, dollar quote or block comment is never closed
+    """
+    statements = []
+    start = 0
+    i = 0
+    n = len(sql)
+    has_code = False
+    while i < n:
+        ch = sql[i]
+        if ch == "-" and sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = n if end == -1 else end + 1
+            continue
+        if ch == "/" and sql.startswith("/*", i):
+            # Block comments nest in PostgreSQL
+            depth, i = 1, i + 2
+            while depth and i < n:
+                if sql.startswith("/*", i):
+                    depth, i = depth + 1, i + 2
+                elif sql.startswith("*/", i):
+                    depth, i = depth - 1, i + 2
+                else:
+                    i += 1
+            if depth:
+                raise MigrationError("Unterminated block comment")
+            continue
+        if ch == "'":
+            # E'...' strings allow backslash escapes; '' is an escaped quote in both forms
+            backslash = i > 0 and sql[i - 1] in "eE" and (i < 2 or not (sql[i - 2].isalnum() or sql[i - 2] == "_"))
+            i += 1
+            while True:
+                if i >= n:
+                    raise MigrationError("Unterminated string literal")
+                if backslash and sql[i] == "\\":
+                    i += 2
+                elif sql[i] == "'":
+                    if sql.startswith("''", i):
+                        i += 2
+                    else:
+                        i += 1
+                        break
+                else:
+                    i += 1
+            has_code = True
+            continue
+        if ch == '"':
+            end = i + 1
+            while True:
+                end = sql.find('"', end)
+                if end == -1:
+                    raise MigrationError("Unterminated quoted identifier")
+                if sql.startswith('""', end):
+                    end += 2
+                    continue
+                break
+            i, has_code = end + 1, True
+            continue
+        if ch == "$":
+            match = _DOLLAR_TAG.match(sql, i)
+            # A $ that follows an identifier character is part of a name or a $1 parameter
+            if match and not (i > 0 and (sql[i - 1].isalnum() or sql[i - 1] == "_")):
+                tag = match.group(0)
+                end = sql.find(tag, match.end())
+                if end == -1:
+                    raise MigrationError(f"Unterminated dollar-quoted string {tag}")
+                i, has_code = end + len(tag), True
+                continue
+        if ch == ";":
+            if has_code:
+                statements.append(sql[start:i].strip())
+            start, has_code = i + 1, False
+            i += 1
+            continue
+        if not ch.isspace():
+            has_code = True
+        i += 1
+    if has_code:
+        statements.append(sql[start:].strip())
+    return statements
+
+
+def migration_checksum(sql: str) -> str:
+    """SHA-256 of the file text with line endings normalised, so checkouts on any OS agree."""
+    return hashlib.sha256(sql.replace("\r\n", "\n").encode("utf-8")).hexdigest()
+
+
+@dataclass
+class Migration:
+    """One migration file, parsed and checksummed."""
+    name: str
+    path: str
+    checksum: str
+    statements: List[str]
+
+    @classmethod
+    def from_file(cls, path: str) -> "Migration":
+        with open(path, "r", encoding="utf-8") as f:
+            sql = f.read()
+        statements = split_sql_statements(sql)
+        for index, statement in enumerate(statements, 1):
+            if _NON_TRANSACTIONAL.match(statement):
+                raise MigrationError(
+                    f"{os.path.basename(path)}: statement {index} cannot run inside a transaction "
+                    f"({statement.split(chr(10))[0][:60]}...); run it separately from the SQL editor"
+                )
+        return cls(os.path.basename(path), path, migration_checksum(sql), statements)
+
+
+def discover_migrations(directory: str = DEFAULT_MIGRATIONS_DIR) -> List[Migration]:
+    """Parse every .sql file in ``directory``, in file name order.
+
+    Files must carry a date prefix (``2025_06_01_add_x.sql``) so a migration
+    always runs after the ones it depends on.
+
+    Raises:
+        MigrationError: A file is not named YYYY_MM_DD_description.sql
+    """
+    names = sorted(name for name in os.listdir(directory) if name.endswith(".sql"))
+    misnamed = [name for name in names if not _MIGRATION_NAME.match(name)]
+    if misnamed:
+        raise MigrationError(f"Migration files must be named YYYY_MM_DD_description.sql: {', '.join(misnamed)}")
+    return [Migration.from_file(os.path.join(directory, name)) for name in names]
+
+
+def applied_migrations() -> Dict[str, str]:
+    """Return {name: checksum} from the schema_migrations ledger in one read."""
+    response = get_client_pool().run(
+        lambda client: client.table("schema_migrations").select("name,checksum").execute(),
+        retry=True,
+    )
+    return {row["name"]: row["checksum"] for row in response.data}
+
+
+def apply_migration(migration: Migration, record_only: bool = False) -> Dict[str, Any]:
+    """Apply one migration as a single transactional RPC call.
+
+    Args:
+        migration: Parsed migration
+        record_only: Record it in the ledger without running it
+
+    Returns:
+        The apply_migration() result: name, applied, skipped, statements, duration_ms
+
+    Raises:
+        MigrationError: A statement failed; the whole migration was rolled back
+    """
+    try:
+        return get_client_pool().run(
+            lambda client: client.rpc("apply_migration", {
+                "p_name": migration.name,
+                "p_checksum": migration.checksum,
+                "p_statements": migration.statements,
+                "p_record_only": record_only,
+            }).execute()
+        ).data
+    except Exception as e:
+        if getattr(e, "code", None) == "PGRST202":
+            raise MigrationError("apply_migration() is not installed; run sql/functions/apply_migration.sql "
+                                 "in the SQL editor first") from e
+        raise MigrationError(f"{migration.name}: {getattr(e, 'message', None) or str(e)}") from e
+
+
+def pending_migrations(migrations: List[Migration]) -> Tuple[List[Migration], List[str]]:
+    """Split ``migrations`` against the ledger.
+
+    Returns:
+        Tuple of (migrations not yet applied, names of applied migrations whose file changed)
+    """
+    applied = applied_migrations()
+    pending = [m for m in migrations if m.name not in applied]
+    changed = [m.name for m in migrations if m.name in applied and applied[m.name] != m.checksum]
+    return pending, changed
+
+
+def run_migrations(migrations: List[Migration], record_only: bool = False,
+                   log=print) -> Tuple[bool, List[Dict[str, Any]]]:
+    """Apply pending migrations in order, stopping at the first failure.
+
+    Returns:
+        Tuple of (success, per-migration results)
+    """
+    pending, changed = pending_migrations(migrations)
+    if changed:
+        log(f"Error: applied migrations were edited since they ran: {', '.join(changed)}")
+        return False, []
+    if not pending:
+        log("No pending migrations.")
+        return True, []
+
+    results = []
+    for migration in pending:
+        log(f"{'Recording' if record_only else 'Applying'} {migration.name} ({len(migration.statements)} statements)...")
+        try:
+            result = apply_migration(migration, record_only=record_only)
+        except MigrationError as e:
+            log(f"Error: {e}")
+            log("The migration was rolled back; later migrations were not run.")
+            return False, results
+        results.append(result)
+        if result.get("skipped"):
+            log("  already applied by another run")
+        else:
+            log(f"  done in {result.get('duration_ms')} ms" if result.get("applied") else "  recorded")
+    return True, results
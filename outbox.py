@@ -0,0 +1,198 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+
+DEFAULT_OUTBOX_PATH = os.path.join(".cache", "outbox.sqlite3")
+
+# Entry states. Finished entries are deleted; rejected ones stay as "failed"
+PENDING = "pending"
+SENDING = "sending"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    payload TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_status_seq ON outbox (status, seq);
+CREATE INDEX IF NOT EXISTS outbox_record ON outbox (table_name, record_id, seq);
+"""
+
+# An entry may be sent only when no older unfinished entry touches the same record
+_NO_OLDER_FOR_RECORD = """
+NOT EXISTS (
+    SELECT 1 FROM outbox older
+    WHERE older.table_name = outbox.table_name
+      AND older.record_id = outbox.record_id
+      AND older.seq < outbox.seq
+      AND older.status IN ('pending', 'sending')
+)
+"""
+
+
+@dataclass
+class OutboxEntry:
+    """One recorded write. ``record_id`` doubles as the idempotency key on replay."""
+    seq: int
+    op: str
+    table_name: str
+    record_id: str
+    payload: Optional[Dict[str, Any]]
+    attempts: int = 0
+    last_error: Optional[str] = None
+    created_at: Optional[float] = None
+
+
+class Outbox:
+    """Durable, ordered log of database writes kept in a local SQLite file.
+
+    Every insert, update and delete is appended here before it is sent, so
+    a write survives a reload or a database outage. The file runs in WAL
+    mode, which keeps appends at local-disk speed while the replayer reads.
+    """
+
+    def __init__(self, path: str = DEFAULT_OUTBOX_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # Entries that were mid-send when the process stopped are retried
+        self._conn.execute("UPDATE outbox SET status = ? WHERE status = ?", (PENDING, SENDING))
+
+    def append(self, op: str, table_name: str, record_id: str,
+               payload: Optional[Dict[str, Any]] = None, claim: bool = False) -> Tuple[int, bool]:
+        """Record a write.
+
+        Args:
+            op: "insert", "update" or "delete"
+            table_name: Target table
+            record_id: The record's id, used as the idempotency key
+            payload: Row data for inserts and updates
+            claim: Also claim the entry for an immediate send if nothing older
+                is queued for the same record
+
+        Returns:
+            Tuple of (sequence number, whether the entry was claimed)
+        """
+        return self.append_many(op, table_name, [(record_id, payload)], claim)[0]
+
+    def append_many(self, op: str, table_name: str, records: List[Tuple[str, Optional[Dict[str, Any]]]],
+                    claim: bool = False) -> List[Tuple[int, bool]]:
+        """Record several writes of the same kind in one transaction; see append()."""
+        results = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for record_id, payload in records:
+                    cursor = self._conn.execute(
+                        "INSERT INTO outbox (op, table_name, record_id, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                        (op, table_name, str(record_id),
+                         None if payload is None else json.dumps(payload, default=str), time.time()),
+                    )
+                    seq = cursor.lastrowid
+                    claimed = False
+                    if claim:
+                        claimed = self._conn.execute(
+                            f"UPDATE outbox SET status = ? WHERE seq = ? AND {_NO_OLDER_FOR_RECORD}",
+                            (SENDING, seq),
+                        ).rowcount == 1
+                    results.append((seq, claimed))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return results
+
+    def claim_batch(self, limit: int) -> List[OutboxEntry]:
+        """Claim the oldest sendable pending entries, in sequence order."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    f"SELECT seq, op, table_name, record_id, payload, attempts, last_error FROM outbox "
+                    f"WHERE status = ? AND {_NO_OLDER_FOR_RECORD} ORDER BY seq LIMIT ?",
+                    (PENDING, limit),
+                ).fetchall()
+                self._conn.executemany("UPDATE outbox SET status = ? WHERE seq = ?",
+                                       [(SENDING, row[0]) for row in rows])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [OutboxEntry(seq, op, table_name, record_id,
+                            None if payload is None else json.loads(payload), attempts, last_error)
+                for seq, op, table_name, record_id, payload, attempts, last_error in rows]
+
+    def mark_done(self, seqs: List[int]) -> None:
+        """Remove entries that reached the database."""
+        with self._lock:
+            self._conn.executemany("DELETE FROM outbox WHERE seq = ?", [(seq,) for seq in seqs])
+
+    def release(self, seqs: List[int], error: str) -> None:
+        """Return claimed entries to the queue after a connection failure."""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, last_error = ? WHERE seq = ?",
+                [(PENDING, error, seq) for seq in seqs],
+            )
+
+    def mark_failed(self, seqs: List[int], error: str) -> None:
+        """Park entries the database rejected so they stop blocking later writes."""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, last_error = ? WHERE seq = ?",
+                [(FAILED, error, seq) for seq in seqs],
+            )
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of entries in each state."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return {PENDING: 0, SENDING: 0, FAILED: 0, **dict(rows)}
+
+    def failed_entries(self) -> List[OutboxEntry]:
+        """Return writes the database rejected, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, op, table_name, record_id, payload, attempts, last_error, created_at FROM outbox "
+                "WHERE status = ? ORDER BY seq",
+                (FAILED,),
+            ).fetchall()
+        return [OutboxEntry(seq, op, table_name, record_id,
+                            None if payload is None else json.loads(payload), attempts, last_error, created_at)
+                for seq, op, table_name, record_id, payload, attempts, last_error, created_at in rows]
+
+    def discard_failed(self, seqs: Optional[List[int]] = None, older_than: Optional[float] = None) -> int:
+        """Delete writes the database rejected.
+
+        Args:
+            seqs: Only these entries; None for every failed entry
+            older_than: Only entries recorded before this time.time() value
+
+        Returns:
+            Number of entries deleted
+        """
+        sql, params = "DELETE FROM outbox WHERE status = ?", [FAILED]
+        if older_than is not None:
+            sql += " AND created_at < ?"
+            params.append(older_than)
+        with self._lock:
+            if seqs is None:
+                return self._conn.execute(sql, params).rowcount
+            return sum(self._conn.execute(sql + " AND seq = ?", params + [seq]).rowcount for seq in seqs)
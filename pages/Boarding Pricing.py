@@ -1,10 +1,13 @@
 import streamlit as st
 import uuid
 from datetime import datetime
-from supabase_config import save_to_supabase, fetch_from_supabase, delete_from_supabase
+from supabase_config import delete_from_supabase, fetch_many
 from _shared_center_select_hidden import center_manager_selector
+from write_queue import submit_write, render_with_save_status, status_badge
+from instrumentation import begin_rerun, end_rerun
 
 st.set_page_config(page_title="Best Friends Pet Care Center Pricing", layout="wide")
+begin_rerun("Boarding Pricing")
 
 # Use the shared center selector (reads from Supabase with Excel fallback)
 dm_selected, center_selected, full_address = center_manager_selector()
@@ -92,23 +95,19 @@ with st.form("add_kennel_suite_form"):
                 "features": feature_list  # Supabase will convert this to JSONB
             }
             
-            # Save to Supabase
-            success, message = save_to_supabase("kennel_suites", supabase_data)
-            if success:
-                st.success(f"Added suite: {final_suite_name} - ✅ Saved to database!")
-            else:
-                st.error(f"Suite added locally but failed to save to database: {message}")
+            # Queue the insert; the suite card shows its save status
+            suite_data["write_ticket"] = submit_write("kennel_suites", supabase_data)
+            st.success(f"Added suite: {final_suite_name} - saving to database…")
     if error_msg:
         st.error(error_msg)
 
 # --- Display Suites as Cards ---
-if st.session_state.kennel_suites:
-    st.subheader("Current Suites")
+def render_suite_cards():
     for suite in st.session_state.kennel_suites:
         # Single dog card - updated to show all dog sizes
         st.markdown(f"""
         <div style='background-color:#eaf0fb; border-radius:18px; padding:24px; margin-bottom:18px; box-shadow: 0 2px 8px #00000010;'>
-            <h2 style='margin-bottom:4px; color:#2a3e5c;'><span style='font-size:1.3em;'>🏠</span> {suite['suite_name']}</h2>
+            <h2 style='margin-bottom:4px; color:#2a3e5c;'><span style='font-size:1.3em;'>🏠</span> {suite['suite_name']}{status_badge(suite)}</h2>
             <span style='font-size:2em; color:#fcbf49; font-weight:bold;'>${int(suite['price_per_night'])}</span><span style='color:#fcbf49;'>/night</span>
             {f'<span style="margin-left:15px; color:#6c757d;"><i>(+${int(suite.get("price_additional_dog", 0))} for additional dog)</i></span>' if suite.get('price_additional_dog', 0) > 0 else ''}<br>
             <ul style='margin:10px 0 6px 0; padding-left:18px; color:#000;'>
@@ -128,6 +127,10 @@ if st.session_state.kennel_suites:
         """, unsafe_allow_html=True)
         # We no longer need a separate card for 2 dogs
 
+if st.session_state.kennel_suites:
+    st.subheader("Current Suites")
+    render_with_save_status(st.session_state.kennel_suites, render_suite_cards)
+
 # Add a section for managing existing Supabase records
 st.divider()
 st.subheader("Data Management")
@@ -135,7 +138,11 @@ st.subheader("Data Management")
 with st.expander("View Records in Supabase"):
     if st.button("Refresh Data", key="refresh_kennel_data"):
         st.subheader("Kennel Suites in Database")
-        suite_records = fetch_from_supabase("kennel_suites", center_selected)
+        # Read the database itself: the user asked for the latest records
+        suite_result = fetch_many([("kennel_suites", center_selected)], max_staleness=0)[("kennel_suites", center_selected)]
+        if not suite_result.ok:
+            st.error(f"Error fetching data: {suite_result.error}")
+        suite_records = suite_result.data
         if suite_records:
             for record in suite_records:
                 col1, col2 = st.columns([3, 1])
@@ -156,3 +163,5 @@ st.markdown("""
 <div style='text-align: center; color: gray; font-size: small;'>
 Best Friends Pet Care - Kennel Suite Builder © 2025
 </div>""", unsafe_allow_html=True)
+
+end_rerun()
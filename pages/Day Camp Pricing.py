@@ -2,9 +2,12 @@ import streamlit as st
 import uuid
 from datetime import datetime
 from _shared_center_select_hidden import center_manager_selector
-from supabase_config import save_to_supabase, fetch_from_supabase
+from supabase_config import fetch_many
+from write_queue import submit_write, render_with_save_status, status_badge
+from instrumentation import begin_rerun, end_rerun
 
 st.set_page_config(page_title="Day Camp Pricing", layout="wide")
+begin_rerun("Day Camp Pricing")
 dm_selected, center_selected, full_address = center_manager_selector()
 st.image("bf_logo.png", width=120)
 st.title("Best Friends Day Camp Pricing")
@@ -49,12 +52,9 @@ with st.form("submit_daily_options"):
             "full_address": full_address
         }
         
-        # Save to Supabase
-        success, message = save_to_supabase("daycamp_daily", supabase_data)
-        if success:
-            st.success(f"✅ {message}")
-        else:
-            st.error(message)
+        # Queue the insert; the summary card shows its save status
+        daily_data["write_ticket"] = submit_write("daycamp_daily", supabase_data)
+        st.success("Daily options submitted - saving to database…")
 
 # --- Daycamp Packages ---
 st.header("Daycamp Packages")
@@ -89,32 +89,30 @@ with st.form("add_daycamp_package_form"):
             "full_address": full_address
         }
         
-        # Save to Supabase
-        success, message = save_to_supabase("daycamp_packages", supabase_data)
-        if success:
-            st.success(f"✅ {message}")
-        else:
-            st.error(message)
-        st.success(f"Added {package_days}-Day Package")
+        # Queue the insert; the package card shows its save status
+        package_data["write_ticket"] = submit_write("daycamp_packages", supabase_data)
+        st.success(f"Added {package_days}-Day Package - saving to database…")
 
-if st.session_state.daycamp_packages:
-    st.subheader("Current Packages")
+def render_package_cards():
     for pkg in st.session_state.daycamp_packages:
         st.markdown(f"""
         <div style='background-color:#eaf0fb; border-radius:18px; padding:18px; margin-bottom:10px; box-shadow: 0 2px 8px #00000010;'>
-            <h3 style='color:#2a3e5c;'>{pkg['days']}-Day Package</h3>
+            <h3 style='color:#2a3e5c;'>{pkg['days']}-Day Package{status_badge(pkg)}</h3>
             <span style='font-size:1.6em; color:#fcbf49; font-weight:bold;'>${int(pkg['price'])}</span><br>
             <span style='color:gray;'>Expiration: {pkg['expiration']}</span>
         </div>
         """, unsafe_allow_html=True)
 
+if st.session_state.daycamp_packages:
+    st.subheader("Current Packages")
+    render_with_save_status(st.session_state.daycamp_packages, render_package_cards)
+
 # --- Daily Options Summary ---
-if st.session_state.get("daycamp_daily"):
-    st.subheader("Current Daily Options")
+def render_daily_card():
     daily = st.session_state.daycamp_daily
     st.markdown(f"""
     <div style='background-color:#eaf0fb; border-radius:18px; padding:18px; margin-bottom:10px; box-shadow: 0 2px 8px #00000010;'>
-        <h3 style='color:#2a3e5c;'>Daily Drop-In</h3>
+        <h3 style='color:#2a3e5c;'>Daily Drop-In{status_badge(daily)}</h3>
         <span style='font-size:1.6em; color:#fcbf49; font-weight:bold;'>${daily['dropin']:.2f}</span> <span style='color:gray;'>/day</span><br>
         <ul><li>Full Day of Play</li><li>Group Activities</li><li>Regular Exercise</li><li>Daily Updates</li></ul>
         <h3 style='color:#2a3e5c;'>Half-Day</h3>
@@ -126,17 +124,26 @@ if st.session_state.get("daycamp_daily"):
     </div>
     """, unsafe_allow_html=True)
 
+if st.session_state.get("daycamp_daily"):
+    st.subheader("Current Daily Options")
+    render_with_save_status([st.session_state.daycamp_daily], render_daily_card)
+
 # Add a section for managing existing Supabase records
 st.divider()
 st.subheader("Data Management")
 
 with st.expander("View Records in Supabase"):
     if st.button("Refresh Data"):
+        # Load both tabs' records concurrently, from the database itself since the user asked for the latest
+        results = fetch_many([("daycamp_daily", center_selected), ("daycamp_packages", center_selected)], max_staleness=0)
         tab1, tab2 = st.tabs(["Daily Options", "Packages"])
         
         with tab1:
             st.subheader("Daily Options in Database")
-            daily_records = fetch_from_supabase("daycamp_daily", center_selected)
+            daily_result = results[("daycamp_daily", center_selected)]
+            if not daily_result.ok:
+                st.error(f"Error fetching data: {daily_result.error}")
+            daily_records = daily_result.data
             if daily_records:
                 for record in daily_records:
                     st.json(record)
@@ -145,7 +152,10 @@ with st.expander("View Records in Supabase"):
                 
         with tab2:
             st.subheader("Packages in Database")
-            package_records = fetch_from_supabase("daycamp_packages", center_selected)
+            package_result = results[("daycamp_packages", center_selected)]
+            if not package_result.ok:
+                st.error(f"Error fetching data: {package_result.error}")
+            package_records = package_result.data
             if package_records:
                 for record in package_records:
                     st.json(record)
@@ -157,3 +167,5 @@ st.markdown("""
 <div style='text-align: center; color: gray; font-size: small;'>
 Best Friends Pet Care - Day Camp Pricing © 2025
 </div>""", unsafe_allow_html=True)
+
+end_rerun()
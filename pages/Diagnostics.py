@@ -0,0 +1,191 @@
+import streamlit as st
+import json
+import pandas as pd
+from dataclasses import asdict
+from datetime import datetime
+from instrumentation import begin_rerun, end_rerun, get_recorder, rerun_summary, dump_spans, spans_as_jsonl, span_log_path
+from supabase_config import get_pool_stats, get_read_cache_stats, get_outbox, DEFAULT_FAILED_RETENTION_DAYS
+
+st.set_page_config(page_title="Diagnostics", layout="wide")
+begin_rerun("Diagnostics")
+st.title("Diagnostics")
+st.caption("Timings of page reruns and database calls made by this server process since it started. "
+           "This page is not listed in the sidebar; open it at /Diagnostics.")
+
+recorder = get_recorder()
+reruns = rerun_summary()
+calls = recorder.spans("call")
+cache_stats = recorder.cache_stats()
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Spans recorded", f"{recorder.recorded:,}", help="Only the most recent ones are kept in memory")
+col2.metric("Reruns in buffer", len(reruns))
+col3.metric("Calls in buffer", len(calls))
+lookups = sum(c["hits"] + c["misses"] for c in cache_stats.values())
+col4.metric("Cache hit rate", f"{sum(c['hits'] for c in cache_stats.values()) / lookups:.0%}" if lookups else "-")
+
+
+def _timestamp(value: float) -> str:
+    return datetime.fromtimestamp(value).strftime("%H:%M:%S")
+
+
+def _ms(value) -> str:
+    return "-" if value is None else f"{value:,.1f}"
+
+
+# --- Slowest reruns ---
+st.subheader("Slowest reruns")
+if reruns:
+    st.dataframe(pd.DataFrame([{
+        "Page": r["page"],
+        "Started": _timestamp(r["started_at"]),
+        "Duration (ms)": r["duration_ms"],
+        "Calls": r["calls"],
+        "Time in calls (ms)": r["call_ms"],
+        "Bytes": r["bytes"],
+        "Status": r["status"],
+    } for r in reruns[:25]]), use_container_width=True, hide_index=True)
+    st.caption("Interrupted reruns ended in st.rerun() or st.stop(); their duration is blank when the next "
+               "run did not follow straight away.")
+else:
+    st.info("No page reruns recorded yet.")
+
+# --- Per page: calls per rerun and latency ---
+st.subheader("Calls per rerun")
+rerun_histograms = recorder.histograms("rerun")
+by_page = {}
+for r in reruns:
+    by_page.setdefault(r["page"], []).append(r)
+if by_page:
+    st.dataframe(pd.DataFrame([{
+        "Page": page,
+        "Reruns": len(items),
+        "Calls per rerun (mean)": round(sum(r["calls"] for r in items) / len(items), 2),
+        "Calls per rerun (max)": max(r["calls"] for r in items),
+        "Bytes per rerun (mean)": int(sum(r["bytes"] for r in items) / len(items)),
+        "p50 ms": rerun_histograms[page].percentile(50) if page in rerun_histograms else None,
+        "p95 ms": rerun_histograms[page].percentile(95) if page in rerun_histograms else None,
+    } for page, items in sorted(by_page.items())]), use_container_width=True, hide_index=True)
+
+# --- Latency histograms ---
+st.subheader("Latency histograms")
+st.caption("Percentiles are bucket upper bounds, counted over every span since the process started.")
+histograms = {f"{kind}: {name}": histogram
+              for kind in ("rerun", "call")
+              for name, histogram in sorted(recorder.histograms(kind).items())}
+if histograms:
+    st.dataframe(pd.DataFrame([{
+        "Span": label,
+        "Count": h.count,
+        "Mean ms": round(h.total_ms / h.count, 1),
+        "p50 ms": h.percentile(50),
+        "p95 ms": h.percentile(95),
+        "p99 ms": h.percentile(99),
+        "Max ms": round(h.max_ms, 1),
+    } for label, h in histograms.items()]), use_container_width=True, hide_index=True)
+    selected = st.selectbox("Show distribution for", list(histograms))
+    buckets = pd.DataFrame(histograms[selected].buckets(), columns=["Bucket", "Count"])
+    st.bar_chart(buckets.set_index("Bucket"), sort=False)
+else:
+    st.info("No spans recorded yet.")
+
+# --- Slowest calls ---
+st.subheader("Slowest calls")
+if calls:
+    slowest = sorted(calls, key=lambda c: -(c.duration_ms or 0))[:25]
+    st.dataframe(pd.DataFrame([{
+        "Call": c.name,
+        "Table": c.table,
+        "Operation": c.operation,
+        "Rows": c.rows,
+        "Bytes": c.bytes,
+        "Duration (ms)": _ms(c.duration_ms),
+        "Started": _timestamp(c.started_at),
+        "In a rerun": c.rerun_id is not None,
+        "Status": c.status,
+        "Error": c.error,
+    } for c in slowest]), use_container_width=True, hide_index=True)
+
+# --- Caches and connections ---
+col1, col2 = st.columns(2)
+with col1:
+    st.subheader("Cache hit rates")
+    if cache_stats:
+        st.dataframe(pd.DataFrame([{
+            "Cache": cache,
+            "Hits": c["hits"],
+            "Misses": c["misses"],
+            "Hit rate": f"{c['hit_rate']:.0%}",
+        } for cache, c in sorted(cache_stats.items())]), use_container_width=True, hide_index=True)
+    else:
+        st.info("No cache lookups recorded yet.")
+    read_cache = get_read_cache_stats()
+    if read_cache:
+        st.caption(f"Read cache: {read_cache['entries']} entries, {read_cache['bytes']:,} of "
+                   f"{read_cache['max_bytes']:,} bytes, {read_cache['evictions']} evicted, "
+                   f"{read_cache['invalidations']} invalidated by writes")
+with col2:
+    st.subheader("Connection pool")
+    try:
+        st.json(get_pool_stats())
+    except Exception as e:
+        st.error(f"Error reading pool stats: {str(e)}")
+
+# --- Outbox ---
+st.subheader("Outbox")
+try:
+    outbox = get_outbox()
+    outbox_counts = outbox.counts()
+    failed = outbox.failed_entries()
+except Exception as e:
+    st.error(f"Error reading the outbox: {str(e)}")
+    outbox, outbox_counts, failed = None, {}, []
+if outbox_counts:
+    st.caption(f"{outbox_counts['pending']} writes waiting, {outbox_counts['sending']} being sent, "
+               f"{outbox_counts['failed']} rejected by the database")
+if failed:
+    st.dataframe(pd.DataFrame([{
+        "Seq": entry.seq,
+        "Written": datetime.fromtimestamp(entry.created_at).strftime("%Y-%m-%d %H:%M:%S") if entry.created_at else None,
+        "Operation": entry.op,
+        "Table": entry.table_name,
+        "Record": entry.record_id,
+        "Attempts": entry.attempts,
+        "Error": entry.last_error,
+    } for entry in failed]), use_container_width=True, hide_index=True)
+    st.caption(f"Rejected writes are not retried. They are deleted after outbox_failed_retention_days "
+               f"({DEFAULT_FAILED_RETENTION_DAYS:g} by default); download them first to re-enter anything still needed.")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Download rejected writes (JSON)",
+                           json.dumps([asdict(entry) for entry in failed], indent=2, default=str),
+                           file_name=f"rejected_writes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                           mime="application/json", use_container_width=True)
+    with col2:
+        if st.button(f"Discard {len(failed)} rejected writes", use_container_width=True):
+            removed = outbox.discard_failed([entry.seq for entry in failed])
+            st.success(f"Discarded {removed} rejected writes.")
+elif outbox is not None:
+    st.caption("No rejected writes.")
+
+# --- Export ---
+st.subheader("Export")
+col1, col2, col3 = st.columns(3)
+with col1:
+    if st.button("Write spans to file", use_container_width=True):
+        try:
+            path, count = dump_spans()
+            st.success(f"Appended {count} spans to {path}")
+        except Exception as e:
+            st.error(f"Error writing spans: {str(e)}")
+    st.caption(f"Appends JSONL to {span_log_path()} on the server")
+with col2:
+    st.download_button("Download spans (JSONL)", spans_as_jsonl(),
+                       file_name=f"spans_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl",
+                       mime="application/x-ndjson", use_container_width=True)
+with col3:
+    if st.button("Clear recorded spans", use_container_width=True):
+        recorder.clear()
+        st.success("Cleared.")
+
+end_rerun()
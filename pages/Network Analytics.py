@@ -0,0 +1,85 @@
+import streamlit as st
+import time
+from pricing_analytics import get_pricing_cube, METRICS, DIMENSIONS
+from pricing_rollups import ROLLUP_VIEWS, refresh_pricing_rollups, rollup_summary
+from instrumentation import begin_rerun, end_rerun
+
+st.set_page_config(page_title="Network Pricing Analytics", layout="wide")
+begin_rerun("Network Analytics")
+st.image("bf_logo.png", width=120)
+st.title("Network Pricing Analytics")
+
+st.write("""
+Compare pricing across every center in the network. Pick a price and a way to group centers to see
+how many centers report it and how the prices spread (minimum, percentiles, median and maximum).
+""")
+
+col1, col2, col3 = st.columns([2, 2, 1])
+with col1:
+    metric = st.selectbox("Price", list(METRICS))
+with col2:
+    dimension = st.selectbox("Group by", list(DIMENSIONS), index=1, format_func=DIMENSIONS.get)
+with col3:
+    st.write("")
+    refresh_clicked = st.button("Refresh Data")
+
+started = time.perf_counter()
+summary, cube, rollup_error = None, None, None
+if dimension in ROLLUP_VIEWS:
+    # District, state and DMA summaries are precomputed in the database (sql/views/pricing_rollups.sql)
+    if refresh_clicked:
+        success, message = refresh_pricing_rollups()
+        (st.success if success else st.error)(message)
+    try:
+        summary = rollup_summary(metric, dimension, max_staleness=0 if refresh_clicked else None)
+    except Exception as e:
+        rollup_error = getattr(e, "message", None) or str(e)
+
+if summary is None:
+    # The whole network, or any grouping while the rollups are not installed, comes from the shared
+    # analytics cube, loaded on first use and refreshed incrementally when stale
+    try:
+        with st.spinner("Loading network pricing..."):
+            cube = get_pricing_cube()
+    except Exception as e:
+        st.error(f"Error loading pricing data: {str(e)}")
+        end_rerun()
+        st.stop()
+    if refresh_clicked:
+        try:
+            changed = cube.refresh()
+            st.success(f"{changed} changes applied.")
+        except Exception as e:
+            st.error(f"Error refreshing pricing data: {str(e)}")
+    started = time.perf_counter()
+    summary = cube.summary(metric, dimension)
+elapsed_ms = (time.perf_counter() - started) * 1000
+
+if summary.empty:
+    st.info("No pricing has been entered for this price yet.")
+else:
+    label = DIMENSIONS[dimension]
+    money = {column: st.column_config.NumberColumn(format="$%.2f")
+             for column in ["min", "p25", "median", "p75", "p90", "max", "mean"]}
+    st.dataframe(summary, hide_index=True, use_container_width=True, column_config=money)
+    if len(summary) > 1:
+        st.subheader(f"Median {metric.lower()} by {label.lower()}")
+        st.bar_chart(summary.set_index(label)["median"])
+
+if cube is None:
+    st.caption(f"{len(summary):,} precomputed rows · answered in {elapsed_ms:.1f} ms")
+else:
+    if rollup_error:
+        st.caption(f"Precomputed rollups are unavailable ({rollup_error}); summarized every pricing row instead.")
+    st.caption(
+        f"{cube.row_count():,} pricing rows from {len(cube.centers):,} centers · "
+        f"answered in {elapsed_ms:.1f} ms · last refreshed {time.strftime('%H:%M:%S', time.localtime(cube.refreshed_at))}"
+    )
+
+st.divider()
+st.markdown("""
+<div style='text-align: center; color: gray; font-size: small;'>
+Best Friends Pet Care - Pricing Portal © 2025
+</div>""", unsafe_allow_html=True)
+
+end_rerun()
@@ -4,9 +4,13 @@ import json
 import pandas as pd
 from datetime import datetime
 from _shared_center_select_hidden import center_manager_selector
-from supabase_config import save_to_supabase, fetch_from_supabase, delete_from_supabase
+from supabase_config import save_to_supabase, delete_from_supabase, update_record_if_unchanged, update_many_records, fetch_center_bundle, fetch_many, CENTER_BUNDLE_TABLES
+from table_query import DEFAULT_COLUMNS
+from pricing_grid import records_to_frame, grid_changes, grid_column_config, invalid_changes
+from instrumentation import begin_rerun, end_rerun
 
 st.set_page_config(page_title="Review & Submit", layout="wide")
+begin_rerun("Review & Submit")
 
 # Use the shared center selector
 dm_selected, center_selected, full_address = center_manager_selector()
@@ -27,46 +31,222 @@ def format_json(json_data):
     return json.dumps(json_data, indent=2)
 
 # Function to refresh data for a specific center
-def fetch_all_center_data(center_name):
-    """Fetch all data for a specific center from all tables"""
-    kennel_suites = fetch_from_supabase("kennel_suites", center_name)
-    daycamp_daily = fetch_from_supabase("daycamp_daily", center_name)
-    daycamp_packages = fetch_from_supabase("daycamp_packages", center_name)
+def fetch_all_center_data(center_name, max_staleness=None):
+    """Fetch all data for a specific center from all tables (max_staleness=0 skips the local replica)"""
+    bundle = fetch_center_bundle(center_name, max_staleness=max_staleness)
+    if bundle is not None:
+        return bundle
     
-    return {
-        "kennel_suites": kennel_suites,
-        "daycamp_daily": daycamp_daily,
-        "daycamp_packages": daycamp_packages
-    }
+    # Fall back to concurrent per-table reads if the bundle RPC is unavailable
+    results = fetch_many([(table, center_name) for table in CENTER_BUNDLE_TABLES], max_staleness=max_staleness)
+    center_data = {}
+    for table in CENTER_BUNDLE_TABLES:
+        result = results[(table, center_name)]
+        if not result.ok:
+            st.error(f"Error fetching {table}: {result.error}")
+        center_data[table] = result.data
+    
+    return center_data
+
+# Function to patch one record in the loaded data instead of refetching everything
+def patch_record(table_name, record_id, values):
+    for record in st.session_state.center_data[table_name]:
+        if record["id"] == record_id:
+            record.update(values)
+
+# Function to drop one record from the loaded data
+def remove_record(table_name, record_id):
+    st.session_state.center_data[table_name] = [
+        record for record in st.session_state.center_data[table_name] if record["id"] != record_id
+    ]
+
+# Function to look up one loaded record by id
+def find_record(table_name, record_id):
+    for record in st.session_state.center_data[table_name]:
+        if record["id"] == record_id:
+            return record
+    return None
+
+# Function to name a record in the staged changes list
+def record_label(table_name, record):
+    if table_name == "kennel_suites":
+        return record["suite_name"]
+    if table_name == "daycamp_packages":
+        return f"{record['days']}-Day Package"
+    return "Daily options"
+
+TABLE_LABELS = {"kennel_suites": "Kennel suites", "daycamp_daily": "Daily options", "daycamp_packages": "Packages"}
+
+# Function to get the edits staged for the selected center, by table and record id
+def center_staged_edits():
+    return st.session_state.staged_edits.setdefault(center_selected, {})
+
+# Function to stage an edit instead of saving it right away
+def stage_edit(table_name, record, updated_data):
+    changes = {k: v for k, v in updated_data.items() if k != "updated_at" and record.get(k) != v}
+    edits = center_staged_edits().setdefault(table_name, {})
+    if changes:
+        edits[record["id"]] = changes
+    else:
+        edits.pop(record["id"], None)
+
+# Function to save every staged edit, one all-or-nothing request per table
+def commit_staged_edits():
+    staged = {table_name: edits for table_name, edits in center_staged_edits().items() if edits}
+    
+    report = []
+    conflicted = False
+    all_saved = True
+    for table_name, edits in staged.items():
+        # Only the changed columns are sent, so every record keeps its own center fields;
+        # each record is matched on the version it was staged against
+        versions = {record_id: find_record(table_name, record_id).get("updated_at") for record_id in edits}
+        labels = {record_id: record_label(table_name, find_record(table_name, record_id)) for record_id in edits}
+        result = update_many_records(table_name, edits, versions)
+        if result.conflicts:
+            conflicted = True
+            for record_id in result.conflicts:
+                edits.pop(record_id, None)
+            changed = ", ".join(labels.get(record_id, record_id) for record_id in result.conflicts)
+            report.append(f"⚠️ {TABLE_LABELS[table_name]}: nothing saved because {changed} changed elsewhere. Those edits were dropped; the other {len(edits)} are still staged.")
+            continue
+        if not result.success:
+            all_saved = False
+            report.append(f"❌ {TABLE_LABELS[table_name]}: nothing saved, the edits are still staged. {result.message}")
+            continue
+        for row in result.rows:
+            patch_record(table_name, row["id"], {k: v for k, v in row.items() if k in DEFAULT_COLUMNS[table_name]})
+        if result.queued:
+            for record_id, changes in edits.items():
+                patch_record(table_name, record_id, changes)
+                find_record(table_name, record_id).pop("updated_at", None)
+        center_staged_edits()[table_name] = {}
+        report.append(f"✅ {TABLE_LABELS[table_name]}: {len(labels)} saved." + (f" {result.message}" if result.queued else ""))
+    
+    if conflicted:
+        st.session_state.center_data = fetch_all_center_data(center_selected, max_staleness=0)
+        report.append("The latest data was loaded.")
+    st.session_state.review_notice = ("error" if not all_saved else "warning" if conflicted else "success", "  \n".join(report))
+    st.rerun()
+
+# Function to edit a whole table in one grid and save only the changed cells, all in one request
+def render_pricing_grid(table_name):
+    records = st.session_state.center_data[table_name]
+    if not records:
+        st.info(f"No {TABLE_LABELS[table_name].lower()} found for this center.")
+        return
+    
+    grid_key = f"grid_{table_name}"
+    snapshot = records_to_frame(table_name, records)
+    edited = st.data_editor(snapshot, key=grid_key, hide_index=True, num_rows="fixed",
+                            column_config=grid_column_config(table_name), use_container_width=True)
+    changes = grid_changes(table_name, snapshot, edited)
+    if not changes:
+        return
+    
+    st.caption(f"{len(changes)} rows changed.")
+    problems = invalid_changes(changes)
+    for problem in problems:
+        st.error(problem)
+    col_a, col_b = st.columns(2)
+    with col_a:
+        save = st.button(f"Save {len(changes)} changed rows", key=f"save_{grid_key}", type="primary",
+                         disabled=bool(problems))
+    with col_b:
+        discard = st.button("Discard grid edits", key=f"discard_{grid_key}")
+    if discard:
+        del st.session_state[grid_key]
+        st.rerun()
+    if not save or problems:
+        return
+    
+    versions = {record_id: find_record(table_name, record_id).get("updated_at") for record_id in changes}
+    result = update_many_records(table_name, changes, versions)
+    if result.conflicts:
+        # Nothing was saved; start the grid over from the latest data
+        del st.session_state[grid_key]
+        st.session_state.center_data = fetch_all_center_data(center_selected, max_staleness=0)
+        st.session_state.review_notice = ("warning", f"Nothing was saved because {len(result.conflicts)} of the changed rows were changed elsewhere. The latest data was loaded; please make your edits again.")
+        st.rerun()
+    if not result.success:
+        st.error(f"Error saving {TABLE_LABELS[table_name].lower()}: {result.message}")
+        return
+    for row in result.rows:
+        patch_record(table_name, row["id"], {k: v for k, v in row.items() if k in DEFAULT_COLUMNS[table_name]})
+    if result.queued:
+        for record_id, record_changes in changes.items():
+            patch_record(table_name, record_id, record_changes)
+            find_record(table_name, record_id).pop("updated_at", None)
+    
+    # Start the grid over from the patched data
+    del st.session_state[grid_key]
+    if result.queued:
+        st.session_state.review_notice = ("success", f"✅ {TABLE_LABELS[table_name]} updated. {result.message}")
+    else:
+        st.session_state.review_notice = ("success", f"✅ {TABLE_LABELS[table_name]}: {result.message}")
+    st.rerun()
+
+# Function to handle an edit, guarded by the record's updated_at version
+def handle_update(table_name, record, updated_data, label):
+    if staged_mode:
+        stage_edit(table_name, record, updated_data)
+        return
+    
+    result = update_record_if_unchanged(table_name, record["id"], updated_data, record.get("updated_at"))
+    if result.conflict:
+        # Someone else changed this center's data; only now reload everything
+        st.session_state.center_data = fetch_all_center_data(center_selected, max_staleness=0)
+        st.session_state.review_notice = ("warning", f"{label} was changed elsewhere, so the latest data was loaded. Please check it and make your edit again.")
+        st.rerun()
+    elif result.queued:
+        # Show the edit now; drop the version so a follow-up edit is not checked against a stale one
+        patch_record(table_name, record["id"], {k: v for k, v in updated_data.items() if k != "updated_at"})
+        record.pop("updated_at", None)
+        st.session_state.review_notice = ("success", f"✅ {label} updated. {result.message}")
+        st.rerun()
+    elif result.ok:
+        patch_record(table_name, record["id"], result.row)
+        st.session_state.review_notice = ("success", f"✅ {label} updated successfully!")
+        st.rerun()
+    else:
+        st.error(f"Error updating {label.lower()}: {result.message}")
 
 # Function to handle data deletion
 def handle_delete(table_name, record_id):
     success, message = delete_from_supabase(table_name, record_id)
     if success:
-        st.success(f"✅ Record deleted successfully.")
+        remove_record(table_name, record_id)
+        st.session_state.review_notice = ("success", f"✅ Record deleted successfully.")
         return True
     else:
         st.error(f"Error deleting record: {message}")
         return False
 
-# Function to update record in Supabase
-def update_record(table_name, record_id, updated_data):
-    """Updates a record in Supabase"""
-    try:
-        client = get_supabase_client()
-        response = client.table(table_name).update(updated_data).eq("id", record_id).execute()
-        if response.data:
-            return True, "Record updated successfully!"
-        else:
-            return False, f"Error: {response.error.message if hasattr(response, 'error') else 'Unknown error'}"
-    except Exception as e:
-        return False, f"Error: {str(e)}"
-
-# Fetch all data for this center
-if "center_data" not in st.session_state or st.button("Refresh Data"):
-    st.session_state.center_data = fetch_all_center_data(center_selected)
+# Fetch all data for this center, again whenever another center is selected
+center_changed = st.session_state.get("center_data_center") != center_selected
+refresh_clicked = "center_data" in st.session_state and not center_changed and st.button("Refresh Data")
+if "center_data" not in st.session_state or center_changed or refresh_clicked:
+    # A refresh the user asks for reads the database, not the read cache or replica
+    st.session_state.center_data = fetch_all_center_data(center_selected, max_staleness=0 if refresh_clicked else None)
+    st.session_state.center_data_center = center_selected
+    # Grid edits refer to rows by position, so they must not carry over to another center's rows
+    for table_name in CENTER_BUNDLE_TABLES:
+        st.session_state.pop(f"grid_{table_name}", None)
     st.success("Data refreshed!")
 
+# Show the outcome of an edit made before the last rerun
+if "review_notice" in st.session_state:
+    kind, text = st.session_state.pop("review_notice")
+    getattr(st, kind)(text)
+
+# Staged edits collect Update clicks locally until they are committed together, kept per center
+if "staged_edits" not in st.session_state:
+    st.session_state.staged_edits = {}
+grid_mode = st.toggle("Grid editor", key="grid_mode",
+                      help="Edit kennel suites and packages in a spreadsheet-style grid; only changed cells are saved")
+staged_mode = st.toggle("Stage edits and commit them together", key="staged_mode",
+                        help="Update buttons collect changes instead of saving them; review the list at the bottom and save everything in one step")
+
 # Create tabs for different data types
 boarding_tab, daycamp_tab = st.tabs(["Boarding Pricing", "Day Camp Pricing"])
 
@@ -75,7 +255,9 @@ with boarding_tab:
     st.header("Boarding Kennel Suites")
     kennel_data = st.session_state.center_data["kennel_suites"]
     
-    if not kennel_data:
+    if grid_mode:
+        render_pricing_grid("kennel_suites")
+    elif not kennel_data:
         st.info("No kennel suite data found for this center. Please add kennel suites in the Boarding Pricing page.")
     else:
         st.write(f"Found {len(kennel_data)} kennel suite entries.")
@@ -139,7 +321,7 @@ with boarding_tab:
                         # Update and Delete buttons
                         col_a, col_b = st.columns(2)
                         with col_a:
-                            update_submitted = st.form_submit_button("Update")
+                            update_submitted = st.form_submit_button("Stage" if staged_mode else "Update")
                         with col_b:
                             delete_submitted = st.form_submit_button("Delete", type="secondary")
                         
@@ -155,20 +337,11 @@ with boarding_tab:
                                 "updated_at": datetime.utcnow().isoformat()
                             }
                             
-                            success, message = update_record("kennel_suites", suite["id"], updated_data)
-                            if success:
-                                st.success("✅ Suite updated successfully!")
-                                # Refresh data to show changes
-                                st.session_state.center_data = fetch_all_center_data(center_selected)
-                                st.rerun()
-                            else:
-                                st.error(f"Error updating suite: {message}")
+                            handle_update("kennel_suites", suite, updated_data, "Suite")
                         
                         # Handle delete
                         if delete_submitted:
                             if handle_delete("kennel_suites", suite["id"]):
-                                # Refresh data to reflect deletion
-                                st.session_state.center_data = fetch_all_center_data(center_selected)
                                 st.rerun()
 
 # --- Day Camp Pricing Tab ---
@@ -216,7 +389,7 @@ with daycamp_tab:
                 # Update and Delete buttons
                 col_a, col_b = st.columns(2)
                 with col_a:
-                    update_daily = st.form_submit_button("Update")
+                    update_daily = st.form_submit_button("Stage" if staged_mode else "Update")
                 with col_b:
                     delete_daily = st.form_submit_button("Delete", type="secondary")
                 
@@ -229,20 +402,11 @@ with daycamp_tab:
                         "updated_at": datetime.utcnow().isoformat()
                     }
                     
-                    success, message = update_record("daycamp_daily", daily["id"], updated_data)
-                    if success:
-                        st.success("✅ Daily options updated successfully!")
-                        # Refresh data to show changes
-                        st.session_state.center_data = fetch_all_center_data(center_selected)
-                        st.rerun()
-                    else:
-                        st.error(f"Error updating daily options: {message}")
+                    handle_update("daycamp_daily", daily, updated_data, "Daily options")
                 
                 # Handle delete
                 if delete_daily:
                     if handle_delete("daycamp_daily", daily["id"]):
-                        # Refresh data to reflect deletion
-                        st.session_state.center_data = fetch_all_center_data(center_selected)
                         st.rerun()
     
     # Packages Section
@@ -250,7 +414,9 @@ with daycamp_tab:
         st.subheader("Day Camp Packages")
         packages_data = st.session_state.center_data["daycamp_packages"]
         
-        if not packages_data:
+        if grid_mode:
+            render_pricing_grid("daycamp_packages")
+        elif not packages_data:
             st.info("No packages found. Please add them in the Day Camp Pricing page.")
         else:
             st.write(f"Found {len(packages_data)} day camp packages.")
@@ -282,7 +448,7 @@ with daycamp_tab:
                         # Update and Delete buttons
                         col_a, col_b = st.columns(2)
                         with col_a:
-                            update_package = st.form_submit_button("Update")
+                            update_package = st.form_submit_button("Stage" if staged_mode else "Update")
                         with col_b:
                             delete_package = st.form_submit_button("Delete", type="secondary")
                         
@@ -295,22 +461,46 @@ with daycamp_tab:
                                 "updated_at": datetime.utcnow().isoformat()
                             }
                             
-                            success, message = update_record("daycamp_packages", package["id"], updated_data)
-                            if success:
-                                st.success("✅ Package updated successfully!")
-                                # Refresh data to show changes
-                                st.session_state.center_data = fetch_all_center_data(center_selected)
-                                st.rerun()
-                            else:
-                                st.error(f"Error updating package: {message}")
+                            handle_update("daycamp_packages", package, updated_data, "Package")
                         
                         # Handle delete
                         if delete_package:
                             if handle_delete("daycamp_packages", package["id"]):
-                                # Refresh data to reflect deletion
-                                st.session_state.center_data = fetch_all_center_data(center_selected)
                                 st.rerun()
 
+# --- Staged Changes ---
+staged_rows = []
+for table_name, edits in center_staged_edits().items():
+    for record_id, changes in list(edits.items()):
+        record = find_record(table_name, record_id)
+        if record is None:
+            # The record was deleted after its edit was staged
+            edits.pop(record_id)
+            continue
+        for field_name, value in changes.items():
+            staged_rows.append({
+                "Type": TABLE_LABELS[table_name],
+                "Record": record_label(table_name, record),
+                "Field": field_name,
+                "Current": str(record.get(field_name)),
+                "Staged": str(value),
+            })
+
+if staged_rows:
+    st.divider()
+    st.header("Staged Changes")
+    staged_count = sum(len(edits) for edits in center_staged_edits().values())
+    st.write(f"{staged_count} records have unsaved changes.")
+    st.dataframe(pd.DataFrame(staged_rows), hide_index=True, use_container_width=True)
+    col_a, col_b = st.columns(2)
+    with col_a:
+        if st.button(f"Commit {staged_count} staged records", type="primary"):
+            commit_staged_edits()
+    with col_b:
+        if st.button("Discard staged changes"):
+            st.session_state.staged_edits[center_selected] = {}
+            st.rerun()
+
 # Add a "Final Submit" button that confirms all data is correct
 st.divider()
 st.header("Final Submission")
@@ -376,3 +566,5 @@ st.markdown("""
 <div style='text-align: center; color: gray; font-size: small;'>
 Best Friends Pet Care - Pricing Portal © 2025
 </div>""", unsafe_allow_html=True)
+
+end_rerun()
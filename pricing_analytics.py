@@ -0,0 +1,315 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterator, Optional, Tuple, Set
+import numpy as np
+import pandas as pd
+from supabase_config import iter_table, MIN_UUID
+from table_query import TableQuery
+
+# Metric name -> (table, value column). "per day" divides price by days.
+METRICS: Dict[str, Tuple[str, str]] = {
+    "Suite price / night": ("kennel_suites", "price_per_night"),
+    "Additional dog / night": ("kennel_suites", "price_additional_dog"),
+    "Day camp drop-in": ("daycamp_daily", "dropin"),
+    "Day camp half-day": ("daycamp_daily", "halfday"),
+    "Day camp weekend": ("daycamp_daily", "weekend"),
+    "Package price": ("daycamp_packages", "price"),
+    "Package price / day": ("daycamp_packages", "price_per_day"),
+}
+
+# Columns read from each pricing table
+SOURCE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "kennel_suites": ("id", "center_name", "price_per_night", "price_additional_dog", "updated_at"),
+    "daycamp_daily": ("id", "center_name", "dropin", "halfday", "weekend", "updated_at"),
+    "daycamp_packages": ("id", "center_name", "days", "price", "updated_at"),
+}
+
+# Ways to slice the network; "network" puts every center in one group
+DIMENSIONS: Dict[str, str] = {
+    "network": "Whole network",
+    "district_manager": "District Manager",
+    "state": "State",
+    "nelson_dma": "Nielsen DMA",
+}
+UNKNOWN = "Unknown"
+
+PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+# Refreshes re-read this much before the watermark so rows committed late by
+# long transactions (whose updated_at is their start time) are not missed
+WATERMARK_OVERLAP_SECONDS = 5
+# Deletes leave no updated_at behind, so ids are re-listed on this interval
+DELETE_SCAN_SECONDS = 300
+ANALYTICS_REFRESH_SECONDS = 60
+
+
+class SortedValues:
+    """Sorted NumPy array of one group's values, kept sorted as rows change.
+
+    Inserts and removals are a binary search plus one array shift, and every
+    order statistic is read straight off the sorted array, so a group's
+    percentiles never need recomputing from scratch.
+    """
+
+    __slots__ = ("values", "total")
+
+    def __init__(self, values: Optional[np.ndarray] = None, presorted: bool = False):
+        values = np.empty(0) if values is None else np.asarray(values, dtype=float)
+        self.values = values if presorted else np.sort(values)
+        self.total = float(self.values.sum())
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, value: float) -> None:
+        self.values = np.insert(self.values, np.searchsorted(self.values, value), value)
+        self.total += value
+
+    def remove(self, value: float) -> None:
+        index = np.searchsorted(self.values, value)
+        if index < len(self.values) and self.values[index] == value:
+            self.values = np.delete(self.values, index)
+            self.total -= value
+
+    def quantile(self, q: float) -> float:
+        # Linear interpolation, matching numpy.percentile's default
+        position = q * (len(self.values) - 1)
+        lower = int(position)
+        upper = min(lower + 1, len(self.values) - 1)
+        return float(self.values[lower] + (self.values[upper] - self.values[lower]) * (position - lower))
+
+    def describe(self) -> Dict[str, float]:
+        summary = {"count": len(self.values), "min": float(self.values[0]), "max": float(self.values[-1]),
+                   "mean": self.total / len(self.values)}
+        for q in PERCENTILES:
+            summary["median" if q == 0.5 else f"p{int(q * 100)}"] = self.quantile(q)
+        return summary
+
+
+def _metric_values(table_name: str, row: Dict[str, Any]) -> Dict[str, float]:
+    """Metric values one pricing row contributes; missing prices contribute nothing."""
+    values = {}
+    for metric, (table, column) in METRICS.items():
+        if table != table_name:
+            continue
+        if column == "price_per_day":
+            value = row["price"] / row["days"] if row.get("price") is not None and row.get("days") else None
+        else:
+            value = row.get(column)
+        if value is not None and not pd.isna(value):
+            values[metric] = float(value)
+    return values
+
+
+def _shift_watermark(watermark: Tuple[str, str]) -> Tuple[str, str]:
+    moved = datetime.fromisoformat(watermark[0]) - timedelta(seconds=WATERMARK_OVERLAP_SECONDS)
+    return moved.isoformat(), MIN_UUID
+
+
+class PricingCube:
+    """Network-wide pricing aggregates, maintained incrementally.
+
+    Groups are keyed by (metric, dimension, dimension value) and hold a
+    SortedValues each. A full load builds them column-wise with pandas; after
+    that, refresh() pulls only rows whose ``updated_at`` is past the last
+    watermark and moves just those values between groups.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.groups: Dict[Tuple[str, str, str], SortedValues] = {}
+        # center name -> dimension values; (table, id) -> (center name, metric values)
+        self.centers: Dict[str, Dict[str, str]] = {}
+        self.rows: Dict[Tuple[str, str], Tuple[str, Dict[str, float]]] = {}
+        self.rows_by_center: Dict[str, Set[Tuple[str, str]]] = {}
+        self.watermarks: Dict[str, Tuple[str, str]] = {}
+        self.loaded_at = 0.0
+        self.refreshed_at = 0.0
+        self.deletes_scanned_at = 0.0
+
+    # --- loading ---
+
+    def _scan_pages(self, table_name: str, columns: Tuple[str, ...],
+                    after: Optional[Tuple[str, str]] = None) -> Iterator[pd.DataFrame]:
+        """Yield the table's rows one keyset page at a time, in (updated_at, id) order."""
+        query = TableQuery(table_name, columns=columns)
+        for page in iter_table(query, as_dataframe=True, keyset=("updated_at", "id"), after=after):
+            if not page.empty:
+                yield page
+
+    def _scan(self, table_name: str, columns: Tuple[str, ...], after: Optional[Tuple[str, str]] = None) -> pd.DataFrame:
+        # Whole result as one frame: only for the centers table and for refresh deltas, which stay small
+        pages = list(self._scan_pages(table_name, columns, after))
+        if not pages:
+            return pd.DataFrame(columns=list(columns))
+        frame = pd.concat(pages, ignore_index=True)
+        last = frame.iloc[-1]
+        self.watermarks[table_name] = (last["updated_at"], last["id"])
+        return frame
+
+    def load(self) -> "PricingCube":
+        """Read every center and pricing row and build all groups from scratch.
+
+        Pricing tables are consumed a page at a time: each page's values are
+        split into their groups and the page is dropped, so only the values
+        themselves are held until each group is sorted once at the end.
+        """
+        centers = self._scan("centers", ("id", "ctr_name", "district_manager", "state", "nelson_dma", "updated_at"))
+        dimension_columns = [d for d in DIMENSIONS if d != "network"]
+        centers = centers.drop_duplicates("ctr_name", keep="last").set_index("ctr_name")[dimension_columns]
+        centers = centers.fillna(UNKNOWN).assign(network=DIMENSIONS["network"])
+
+        chunks: Dict[Tuple[str, str, str], list] = {}
+        rows: Dict[Tuple[str, str], Tuple[str, Dict[str, float]]] = {}
+        rows_by_center: Dict[str, Set[Tuple[str, str]]] = {}
+        watermarks: Dict[str, Tuple[str, str]] = {}
+        for table_name, columns in SOURCE_COLUMNS.items():
+            for frame in self._scan_pages(table_name, columns):
+                last = frame.iloc[-1]
+                watermarks[table_name] = (last["updated_at"], last["id"])
+                if table_name == "daycamp_packages":
+                    days = pd.to_numeric(frame["days"]).where(lambda d: d > 0)
+                    frame["price_per_day"] = pd.to_numeric(frame["price"]) / days
+                frame = frame.join(centers, on="center_name")
+                frame[list(DIMENSIONS)] = frame[list(DIMENSIONS)].fillna(UNKNOWN).assign(network=DIMENSIONS["network"])
+
+                for metric, (table, column) in METRICS.items():
+                    if table != table_name:
+                        continue
+                    values = pd.to_numeric(frame[column], errors="coerce").dropna()
+                    for dimension in DIMENSIONS:
+                        for key, group in values.groupby(frame[dimension]):
+                            chunks.setdefault((metric, dimension, key), []).append(group.to_numpy())
+
+                for record in frame[list(columns)].to_dict("records"):
+                    rows[(table_name, record["id"])] = (record["center_name"], _metric_values(table_name, record))
+                    rows_by_center.setdefault(record["center_name"], set()).add((table_name, record["id"]))
+
+        # One sort per group, done on all of its values at once
+        groups = {key: SortedValues(np.sort(np.concatenate(parts)), presorted=True) for key, parts in chunks.items()}
+        with self._lock:
+            self.groups = groups
+            self.rows = rows
+            self.rows_by_center = rows_by_center
+            self.centers = centers.to_dict("index")
+            self.watermarks.update(watermarks)
+            self.loaded_at = self.refreshed_at = self.deletes_scanned_at = time.time()
+        return self
+
+    # --- incremental maintenance ---
+
+    def _dimensions_of(self, center_name: str) -> Dict[str, str]:
+        return self.centers.get(center_name) or {d: DIMENSIONS["network"] if d == "network" else UNKNOWN
+                                                 for d in DIMENSIONS}
+
+    def _apply(self, center_name: str, values: Dict[str, float], sign: int) -> None:
+        for dimension, key in self._dimensions_of(center_name).items():
+            for metric, value in values.items():
+                group = self.groups.setdefault((metric, dimension, key), SortedValues())
+                group.add(value) if sign > 0 else group.remove(value)
+
+    def _upsert_row(self, table_name: str, row: Dict[str, Any]) -> bool:
+        key = (table_name, row["id"])
+        values = _metric_values(table_name, row)
+        if self.rows.get(key) == (row["center_name"], values):
+            # Re-read inside the watermark overlap without changing
+            return False
+        self._remove_row(key)
+        self.rows[key] = (row["center_name"], values)
+        self.rows_by_center.setdefault(row["center_name"], set()).add(key)
+        self._apply(row["center_name"], values, +1)
+        return True
+
+    def _remove_row(self, key: Tuple[str, str]) -> None:
+        if key not in self.rows:
+            return
+        center_name, values = self.rows.pop(key)
+        self.rows_by_center.get(center_name, set()).discard(key)
+        self._apply(center_name, values, -1)
+
+    def _move_center(self, center_name: str, dimensions: Dict[str, str]) -> None:
+        keys = list(self.rows_by_center.get(center_name, ()))
+        for key in keys:
+            self._apply(center_name, self.rows[key][1], -1)
+        self.centers[center_name] = dimensions
+        for key in keys:
+            self._apply(center_name, self.rows[key][1], +1)
+
+    def refresh(self, detect_deletes: Optional[bool] = None) -> int:
+        """Apply rows changed since the last watermark.
+
+        Args:
+            detect_deletes: Also re-list ids to drop deleted rows; by default
+                this happens every DELETE_SCAN_SECONDS
+
+        Returns:
+            Number of changed rows applied
+        """
+        if detect_deletes is None:
+            detect_deletes = time.time() - self.deletes_scanned_at >= DELETE_SCAN_SECONDS
+        changed = 0
+
+        center_after = self.watermarks.get("centers")
+        centers = self._scan("centers", ("id", "ctr_name", "district_manager", "state", "nelson_dma", "updated_at"),
+                             after=center_after and _shift_watermark(center_after))
+        updates = {}
+        for record in centers.to_dict("records"):
+            updates[record["ctr_name"]] = {
+                d: DIMENSIONS["network"] if d == "network" else (UNKNOWN if pd.isna(record.get(d)) else record[d])
+                for d in DIMENSIONS
+            }
+        table_rows = {}
+        for table_name, columns in SOURCE_COLUMNS.items():
+            after = self.watermarks.get(table_name)
+            table_rows[table_name] = self._scan(table_name, columns, after=after and _shift_watermark(after))
+        live_ids = {}
+        if detect_deletes:
+            for table_name in SOURCE_COLUMNS:
+                live_ids[table_name] = {row["id"] for row in iter_table(TableQuery(table_name, columns=("id",)),
+                                                                         keyset=("updated_at", "id"))}
+
+        with self._lock:
+            for center_name, dimensions in updates.items():
+                if self.centers.get(center_name) != dimensions:
+                    self._move_center(center_name, dimensions)
+                    changed += 1
+            for table_name, frame in table_rows.items():
+                for record in frame.to_dict("records"):
+                    changed += self._upsert_row(table_name, record)
+            for table_name, ids in live_ids.items():
+                for key in [key for key in self.rows if key[0] == table_name and key[1] not in ids]:
+                    self._remove_row(key)
+                    changed += 1
+            if detect_deletes:
+                self.deletes_scanned_at = time.time()
+            self.refreshed_at = time.time()
+        return changed
+
+    # --- reading ---
+
+    def summary(self, metric: str, dimension: str) -> pd.DataFrame:
+        """Return count, min, percentiles, mean and max of ``metric`` per group of ``dimension``."""
+        with self._lock:
+            rows = [{DIMENSIONS[dimension]: key, **group.describe()}
+                    for (m, d, key), group in self.groups.items()
+                    if m == metric and d == dimension and len(group)]
+        columns = [DIMENSIONS[dimension], "count", "min", "p25", "median", "p75", "p90", "max", "mean"]
+        return pd.DataFrame(rows, columns=columns).sort_values(DIMENSIONS[dimension], ignore_index=True)
+
+    def row_count(self) -> int:
+        return len(self.rows)
+
+
+_cube: Optional[PricingCube] = None
+_cube_lock = threading.Lock()
+
+
+def get_pricing_cube(max_age_seconds: float = ANALYTICS_REFRESH_SECONDS) -> PricingCube:
+    """Return the process-wide cube, loading it once and refreshing it incrementally when stale."""
+    global _cube
+    with _cube_lock:
+        if _cube is None:
+            _cube = PricingCube().load()
+        elif time.time() - _cube.refreshed_at >= max_age_seconds:
+            _cube.refresh()
+        return _cube
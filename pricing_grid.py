@@ -0,0 +1,111 @@
+import math
+import streamlit as st
+import pandas as pd
+from typing import Dict, Any, List
+
+# Columns shown in the grid editor for each table, in display order
+GRID_COLUMNS: Dict[str, tuple] = {
+    "kennel_suites": ("suite_name", "dog_sizes", "price_per_night", "price_additional_dog",
+                      "num_kennels", "features"),
+    "daycamp_packages": ("days", "price", "expiration"),
+}
+
+# List-valued (JSONB array) columns are edited as text joined with these separators
+LIST_SEPARATORS: Dict[str, str] = {"dog_sizes": ",", "features": ";"}
+
+# Items a list column may hold; the pricing forms offer the same choices
+DOG_SIZES = ("small", "medium", "big", "extra big")
+LIST_CHOICES: Dict[str, tuple] = {"dog_sizes": DOG_SIZES}
+
+
+def grid_column_config(table_name: str) -> Dict[str, Any]:
+    """Column settings for st.data_editor; list columns explain their separator."""
+    labels = {
+        "suite_name": st.column_config.TextColumn("Suite Name", required=True),
+        "dog_sizes": st.column_config.TextColumn("Dog Sizes", help=f"Comma-separated, from: {', '.join(DOG_SIZES)}"),
+        "price_per_night": st.column_config.NumberColumn("Price per Night ($)", min_value=0.0, format="$%.2f"),
+        "price_additional_dog": st.column_config.NumberColumn("Additional Dog ($)", min_value=0.0, format="$%.2f"),
+        "num_kennels": st.column_config.NumberColumn("Kennels", min_value=0, step=1),
+        "features": st.column_config.TextColumn("Features", help="Separate features with a semicolon"),
+        "days": st.column_config.NumberColumn("Days", min_value=1, step=1),
+        "price": st.column_config.NumberColumn("Price ($)", min_value=0.0, format="$%.2f"),
+        "expiration": st.column_config.TextColumn("Expiration Policy"),
+    }
+    return {column: labels[column] for column in GRID_COLUMNS[table_name]}
+
+
+def records_to_frame(table_name: str, records: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Build the grid's snapshot frame, indexed by record id.
+
+    Args:
+        table_name: Table the records come from
+        records: Records as loaded for the page
+
+    Returns:
+        DataFrame with one row per record and GRID_COLUMNS as columns
+    """
+    columns = GRID_COLUMNS[table_name]
+    rows = []
+    for record in records:
+        row = {}
+        for column in columns:
+            value = record.get(column)
+            if column in LIST_SEPARATORS:
+                value = f"{LIST_SEPARATORS[column]} ".join(value or [])
+            row[column] = value
+        rows.append(row)
+    return pd.DataFrame(rows, columns=list(columns), index=pd.Index([r["id"] for r in records], name="id"))
+
+
+def _from_cell(column: str, value: Any) -> Any:
+    # Turn a grid cell back into the value stored in the database
+    if hasattr(value, "item"):
+        value = value.item()
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return [] if column in LIST_SEPARATORS else None
+    if column in LIST_SEPARATORS:
+        return [part.strip() for part in str(value).split(LIST_SEPARATORS[column]) if part.strip()]
+    return value
+
+
+def grid_changes(table_name: str, snapshot: pd.DataFrame, edited: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """Diff an edited grid against its snapshot, cell by cell.
+
+    Args:
+        table_name: Table the grid edits
+        snapshot: Frame from records_to_frame()
+        edited: Frame returned by st.data_editor for the same snapshot
+
+    Returns:
+        Mapping of record id to only the columns whose values changed
+    """
+    if snapshot.empty:
+        return {}
+    edited = edited.reindex(index=snapshot.index, columns=snapshot.columns)
+    unchanged = (snapshot == edited) | (snapshot.isna() & edited.isna())
+    changes: Dict[str, Dict[str, Any]] = {}
+    for row, col in zip(*(~unchanged.to_numpy()).nonzero()):
+        record_id, column = snapshot.index[row], snapshot.columns[col]
+        new_value = _from_cell(column, edited.at[record_id, column])
+        if new_value != _from_cell(column, snapshot.at[record_id, column]):
+            changes.setdefault(record_id, {})[column] = new_value
+    return changes
+
+
+def invalid_changes(changes: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Check changed list cells against LIST_CHOICES, as the pricing forms do.
+
+    Args:
+        changes: Result of grid_changes()
+
+    Returns:
+        One message per value no form would accept; empty if the changes can be saved
+    """
+    problems = []
+    for record_changes in changes.values():
+        for column, choices in LIST_CHOICES.items():
+            for value in record_changes.get(column) or []:
+                if value not in choices:
+                    problems.append(f"{value!r} is not one of the allowed {column.replace('_', ' ')}: "
+                                    f"{', '.join(choices)}")
+    return list(dict.fromkeys(problems))
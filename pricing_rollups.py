@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Refresh and read the pricing rollup views defined in sql/views/pricing_rollups.sql.
+
+Run once, or keep running on a schedule:
+    python pricing_rollups.py [--force] [--every SECONDS]
+"""
+
+import sys
+import time
+import argparse
+import pandas as pd
+from typing import Dict, Any, List, Optional, Tuple
+from supabase_config import get_client_pool, read_query
+from table_query import TableQuery
+from pricing_analytics import DIMENSIONS
+
+# Dimension -> (materialized view, grouping column)
+ROLLUP_VIEWS: Dict[str, Tuple[str, str]] = {
+    "district_manager": ("pricing_rollup_by_district", "district_manager"),
+    "state": ("pricing_rollup_by_state", "state"),
+    "nelson_dma": ("pricing_rollup_by_dma", "nelson_dma"),
+}
+
+# Rollup view column -> column of PricingCube.summary()
+SUMMARY_COLUMNS: Dict[str, str] = {
+    "price_count": "count",
+    "min_price": "min",
+    "p25_price": "p25",
+    "median_price": "median",
+    "p75_price": "p75",
+    "p90_price": "p90",
+    "max_price": "max",
+    "mean_price": "mean",
+}
+
+DEFAULT_REFRESH_SECONDS = 300
+
+
+def refresh_pricing_rollups(force: bool = False) -> Tuple[bool, str]:
+    """Ask the database to rebuild the rollups if any source table changed.
+
+    Args:
+        force: Rebuild even if nothing changed since the last refresh; needs
+            the service role key
+
+    Returns:
+        Tuple of (success, message)
+    """
+    # The app's key may only call the change-only wrapper
+    function, params = ("refresh_pricing_rollups", {"p_force": True}) if force else ("refresh_pricing_rollups_if_changed", {})
+    try:
+        result = get_client_pool().run(
+            lambda client: client.rpc(function, params).execute(),
+            retry=True,
+        ).data
+    except Exception as e:
+        return False, f"Error: {str(e)}"
+
+    if result.get("busy"):
+        return True, "Another refresh is already running."
+    if result.get("refreshed"):
+        return True, f"Rollups refreshed in {result.get('duration_ms')} ms."
+    return True, f"No changes since the last refresh at {result.get('refreshed_at')}."
+
+
+def fetch_pricing_rollups(dimension: str, metric: Optional[str] = None,
+                          max_staleness: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Read precomputed pricing summaries for one way of grouping centers.
+
+    Args:
+        dimension: "district_manager", "state" or "nelson_dma"
+        metric: Optional metric name (see METRICS in pricing_analytics.py) to read only that price
+        max_staleness: See read_query(); 0 reads the database
+
+    Returns:
+        One row per (group, metric) with counts, min/max, percentiles and mean
+
+    Raises:
+        Exception: The read failed
+    """
+    view, column = ROLLUP_VIEWS[dimension]
+    query = TableQuery(view, columns=("*",)).order_by(column)
+    if metric:
+        query = query.eq("metric", metric)
+    return read_query(query, max_staleness)
+
+
+def rollup_summary(metric: str, dimension: str, max_staleness: Optional[float] = None) -> pd.DataFrame:
+    """Return the precomputed summary of ``metric`` per group, shaped like PricingCube.summary().
+
+    Raises:
+        Exception: The read failed (e.g. the rollup views are not installed)
+    """
+    label = DIMENSIONS[dimension]
+    rows = fetch_pricing_rollups(dimension, metric, max_staleness)
+    frame = pd.DataFrame(rows).rename(columns={ROLLUP_VIEWS[dimension][1]: label, **SUMMARY_COLUMNS})
+    return frame.reindex(columns=[label, *SUMMARY_COLUMNS.values()])
+
+
+def run_scheduler(every_seconds: float, force: bool = False) -> None:
+    """Refresh the rollups every ``every_seconds`` until interrupted."""
+    while True:
+        started = time.time()
+        success, message = refresh_pricing_rollups(force)
+        print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {message}")
+        # Only the first run honours --force; later runs refresh on change
+        force = False
+        time.sleep(max(0.0, every_seconds - (time.time() - started)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the pricing rollup materialized views.")
+    parser.add_argument("--force", action="store_true", help="Refresh even if no pricing data changed (needs the service role key)")
+    parser.add_argument("--every", type=float, metavar="SECONDS",
+                        help=f"Keep running and refresh on this interval (e.g. {DEFAULT_REFRESH_SECONDS})")
+    args = parser.parse_args()
+    if args.every:
+        try:
+            run_scheduler(args.every, force=args.force)
+        except KeyboardInterrupt:
+            sys.exit(0)
+    success, message = refresh_pricing_rollups(force=args.force)
+    print(message)
+    sys.exit(0 if success else 1)
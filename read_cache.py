@@ -0,0 +1,103 @@
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# (table, center or None for the whole table, projection)
+CacheKey = Tuple[str, Optional[str], str]
+
+
+@dataclass
+class _Entry:
+    rows: List[Dict[str, Any]]
+    size: int
+    ids: Set[str]
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+class ReadCache:
+    """Process-wide LRU cache of per-center table reads, bounded by payload size.
+
+    Entries are whole results of ``select <projection> from <table> where
+    <center column> = <center>`` (or of the unfiltered table when the center
+    is None). Rows are copied on the way in and out, so callers may modify
+    what they get. Keeping entries consistent with writes is done by
+    supabase_config, which calls invalidate() for every write it applies.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: CacheKey, max_age: float) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of the cached rows if they were loaded within ``max_age`` seconds."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.loaded_at > max_age:
+                return None
+            self._entries.move_to_end(key)
+            rows = entry.rows
+        return copy.deepcopy(rows)
+
+    def put(self, key: CacheKey, rows: List[Dict[str, Any]], loaded_at: Optional[float] = None) -> bool:
+        """Store a result, evicting the least recently used entries to stay under max_bytes.
+
+        Returns:
+            False if the result alone is larger than the cache
+        """
+        size = len(json.dumps(rows, default=str))
+        if size > self.max_bytes:
+            return False
+        entry = _Entry(copy.deepcopy(rows), size, {str(row["id"]) for row in rows if row.get("id") is not None},
+                       loaded_at if loaded_at is not None else time.monotonic())
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+        return True
+
+    def invalidate(self, table_name: str, centers: Iterable[Optional[str]] = (), ids: Iterable[str] = ()) -> int:
+        """Drop the entries a write to ``table_name`` may have changed.
+
+        That is every entry of the table for one of ``centers``, every entry
+        holding one of ``ids`` (e.g. a row that moved to another center) and
+        the table's unfiltered entries.
+
+        Returns:
+            Number of entries dropped
+        """
+        centers = set(centers)
+        ids = {str(record_id) for record_id in ids}
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if key[0] == table_name and (key[1] is None or key[1] in centers or entry.ids & ids)]
+            for key in stale:
+                self._bytes -= self._entries.pop(key).size
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return entries, bytes, max_bytes, evictions and invalidations."""
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "evictions": self.evictions, "invalidations": self.invalidations}
@@ -0,0 +1,197 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from table_query import TableQuery, CENTER_COLUMNS
+
+DEFAULT_REPLICA_PATH = os.path.join(".cache", "replica.sqlite3")
+
+# Tables mirrored locally; reads of any other table always go to the database
+REPLICA_TABLES = ("centers", "kennel_suites", "daycamp_daily", "daycamp_packages")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS replica_rows (
+    table_name TEXT NOT NULL,
+    id TEXT NOT NULL,
+    center TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (table_name, id)
+);
+CREATE INDEX IF NOT EXISTS replica_rows_center ON replica_rows (table_name, center);
+CREATE TABLE IF NOT EXISTS replica_sync (
+    table_name TEXT PRIMARY KEY,
+    watermark_at TEXT,
+    watermark_id TEXT,
+    synced_at REAL NOT NULL DEFAULT 0,
+    deletes_scanned_at REAL NOT NULL DEFAULT 0
+);
+"""
+
+# TableQuery operator -> SQLite comparison; like/ilike use PostgREST wildcards and are not mirrored
+_COMPARISONS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+def _json_path(column: str) -> str:
+    return '$."' + column.replace('"', '""') + '"'
+
+
+class ReadReplica:
+    """Local SQLite copy of the pricing tables, answering reads without a round trip.
+
+    Rows are stored whole as JSON with their id and center pulled out into
+    indexed columns, so any projection of a center's rows is one index
+    lookup. The replica only stores and queries rows; keeping it in sync
+    with the database (watermarks, deletes, write-through) is done by
+    supabase_config.
+    """
+
+    def __init__(self, path: str = DEFAULT_REPLICA_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    # --- writing ---
+
+    def apply_rows(self, table_name: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace complete rows (as returned by select("*")); returns the count."""
+        center_column = CENTER_COLUMNS.get(table_name, "center_name")
+        values = [(table_name, str(row["id"]), row.get(center_column), json.dumps(row, default=str))
+                  for row in rows if row.get("id") is not None]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO replica_rows (table_name, id, center, data) VALUES (?, ?, ?, ?)",
+                    values,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(values)
+
+    def remove_ids(self, table_name: str, ids: Iterable[str]) -> int:
+        """Drop rows by id; returns how many were present."""
+        with self._lock:
+            cursor = self._conn.executemany("DELETE FROM replica_rows WHERE table_name = ? AND id = ?",
+                                            [(table_name, str(record_id)) for record_id in ids])
+        return cursor.rowcount
+
+    def retain_ids(self, table_name: str, live_ids: Set[str]) -> int:
+        """Drop every row whose id is not in ``live_ids``; returns how many were dropped."""
+        with self._lock:
+            local = {row[0] for row in self._conn.execute(
+                "SELECT id FROM replica_rows WHERE table_name = ?", (table_name,))}
+        return self.remove_ids(table_name, local - {str(record_id) for record_id in live_ids})
+
+    # --- sync bookkeeping ---
+
+    def sync_state(self, table_name: str) -> Tuple[Optional[Tuple[str, str]], float, float]:
+        """Return ((updated_at, id) watermark or None, synced_at, deletes_scanned_at)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark_at, watermark_id, synced_at, deletes_scanned_at FROM replica_sync "
+                "WHERE table_name = ?", (table_name,)).fetchone()
+        if row is None:
+            return None, 0.0, 0.0
+        watermark = (row[0], row[1]) if row[0] is not None else None
+        return watermark, row[2], row[3]
+
+    def mark_synced(self, table_name: str, watermark: Optional[Tuple[str, str]],
+                    synced_at: float, deletes_scanned: bool = False) -> None:
+        """Record a successful sync that started at ``synced_at`` and saw rows up to ``watermark``."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO replica_sync (table_name, watermark_at, watermark_id, synced_at, deletes_scanned_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (table_name) DO UPDATE SET "
+                "watermark_at = coalesce(excluded.watermark_at, watermark_at), "
+                "watermark_id = coalesce(excluded.watermark_id, watermark_id), "
+                "synced_at = excluded.synced_at, "
+                "deletes_scanned_at = CASE WHEN ? THEN excluded.synced_at ELSE deletes_scanned_at END",
+                (table_name, watermark and watermark[0], watermark and watermark[1], synced_at,
+                 synced_at if deletes_scanned else 0.0, deletes_scanned),
+            )
+
+    def invalidate(self, table_name: str) -> None:
+        """Mark a table as needing a sync before its next read; its rows and watermark are kept."""
+        with self._lock:
+            self._conn.execute("UPDATE replica_sync SET synced_at = 0 WHERE table_name = ?", (table_name,))
+
+    def age(self, table_name: str) -> float:
+        """Seconds since the table was last synced (infinite if never)."""
+        _, synced_at, _ = self.sync_state(table_name)
+        return time.time() - synced_at if synced_at else float("inf")
+
+    # --- reading ---
+
+    def query(self, query: TableQuery) -> Optional[List[Dict[str, Any]]]:
+        """Answer a TableQuery from the local rows.
+
+        Filters, ordering and limit follow PostgREST semantics (ascending
+        sorts put NULLs last). Without an explicit order rows come back in
+        (created_at, id) order, as the center bundle returns them.
+
+        Returns:
+            The matching rows, projected like the database would, or None if
+            the query uses something the replica cannot evaluate (e.g. like/ilike)
+        """
+        if query.table not in REPLICA_TABLES:
+            return None
+        center_column = CENTER_COLUMNS.get(query.table, "center_name")
+        where = ["table_name = ?"]
+        params: List[Any] = [query.table]
+        for column, operator, value in query.filters:
+            if column == center_column:
+                target = "center"
+            elif column == "id":
+                target = "id"
+            else:
+                target = "json_extract(data, ?)"
+                params.append(_json_path(column))
+            if operator in _COMPARISONS:
+                where.append(f"{target} {_COMPARISONS[operator]} ?")
+                params.append(str(value) if target == "id" else value)
+            elif operator == "in":
+                where.append(f"{target} IN ({', '.join('?' * len(value))})")
+                params.extend(str(v) if target == "id" else v for v in value)
+            elif operator == "is" and str(value).lower() in ("null", "none"):
+                where.append(f"{target} IS NULL")
+            elif operator == "is" and str(value).lower() in ("true", "false"):
+                where.append(f"{target} = ?")
+                params.append(1 if str(value).lower() == "true" else 0)
+            else:
+                return None
+
+        order_sql = []
+        for column, desc in query.order or (("created_at", False), ("id", False)):
+            params.append(_json_path(column))
+            expression = "json_extract(data, ?)"
+            order_sql.append(f"({expression} IS NULL) {'DESC' if desc else 'ASC'}")
+            params.append(_json_path(column))
+            order_sql.append(f"{expression} {'DESC' if desc else 'ASC'}")
+        sql = f"SELECT data FROM replica_rows WHERE {' AND '.join(where)} ORDER BY {', '.join(order_sql)}"
+        if query.limit is not None:
+            sql += " LIMIT ?"
+            params.append(query.limit)
+
+        with self._lock:
+            rows = [json.loads(row[0]) for row in self._conn.execute(sql, params)]
+        columns = query.projection.split(",")
+        if "*" in columns:
+            return rows
+        return [{column: row.get(column) for column in columns} for row in rows]
+
+    def row_counts(self) -> Dict[str, int]:
+        """Return the number of local rows per table."""
+        with self._lock:
+            rows = self._conn.execute("SELECT table_name, COUNT(*) FROM replica_rows GROUP BY table_name").fetchall()
+        return {table: 0 for table in REPLICA_TABLES} | dict(rows)
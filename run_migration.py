@@ -1,58 +1,110 @@
 import streamlit as st
 import os
-from supabase_config import get_supabase_client
 import sys
+import argparse
+from migrations import (Migration, MigrationError, DEFAULT_MIGRATIONS_DIR, discover_migrations,
+                        pending_migrations, run_migrations)
+from backfill import BACKFILLS, DEFAULT_BATCH_SIZE, DEFAULT_PAUSE_SECONDS, run_backfill
 
-def run_migration(migration_file):
-    """Run a SQL migration file against the Supabase database"""
-    print(f"Running migration from file: {migration_file}")
+def run_migration(migration_file, record_only=False):
+    """Run a SQL migration file (or every pending file in a directory) against the Supabase database.
     
+    Each file is applied in one transactional call to the apply_migration()
+    function (sql/functions/apply_migration.sql) and recorded in the
+    schema_migrations ledger, so re-running skips files that already ran.
+    
+    Files written before the ledger existed are idempotent, so a database
+    that already ran some of them just records them on the first run. A
+    database built from sql/tables has every migration's changes already:
+    run once with --record-only to seed the ledger instead.
+    """
     # Check if file exists
     if not os.path.exists(migration_file):
         print(f"Error: Migration file {migration_file} not found.")
         return False
     
     try:
-        # Read the migration SQL
-        with open(migration_file, 'r') as f:
-            migration_sql = f.read()
-        
-        # Split the migration into individual statements
-        # This simple split won't work for all SQL, but should be ok for our basic migration
-        sql_statements = [stmt.strip() for stmt in migration_sql.split(';') if stmt.strip()]
-        
-        # Get Supabase client
-        client = get_supabase_client()
-        
-        # Execute each statement
-        for i, stmt in enumerate(sql_statements, 1):
-            if not stmt:
-                continue
-                
-            print(f"Executing statement {i}/{len(sql_statements)}...")
-            
-            # Use the rpc function to execute raw SQL
-            response = client.rpc('execute_sql', {'query': stmt}).execute()
-            
-            if hasattr(response, 'error') and response.error:
-                print(f"Error executing statement {i}: {response.error}")
-                return False
-                
-            print(f"Statement {i} executed successfully.")
+        if os.path.isdir(migration_file):
+            print(f"Running pending migrations in: {migration_file}")
+            migrations = discover_migrations(migration_file)
+        else:
+            print(f"Running migration from file: {migration_file}")
+            migrations = [Migration.from_file(migration_file)]
         
-        print("Migration completed successfully!")
-        return True
+        success, _ = run_migrations(migrations, record_only=record_only)
+        if success:
+            print("Migration completed successfully!")
+        return success
         
+    except MigrationError as e:
+        print(f"Error: {e}")
+        return False
     except Exception as e:
         print(f"Error during migration: {str(e)}")
         return False
 
+def show_status(migration_path):
+    """Print which migrations are applied and which are pending"""
+    migrations = discover_migrations(migration_path) if os.path.isdir(migration_path) else [Migration.from_file(migration_path)]
+    pending, changed = pending_migrations(migrations)
+    pending_names = {m.name for m in pending}
+    for m in migrations:
+        state = "CHANGED" if m.name in changed else "pending" if m.name in pending_names else "applied"
+        print(f"{state:>8}  {m.name}  ({len(m.statements)} statements)")
+    return not changed
+
+def backfill(name, batch_size=DEFAULT_BATCH_SIZE, pause=DEFAULT_PAUSE_SECONDS, restart=False, max_batches=None):
+    """Run or resume a batched backfill from backfill.py, then verify it and tighten its constraints"""
+    if name not in BACKFILLS:
+        print(f"Error: unknown backfill {name}. Known backfills: {', '.join(BACKFILLS)}")
+        return False
+    
+    print(f"{'Restarting' if restart else 'Running'} backfill {name} in batches of {batch_size}...")
+    try:
+        success, _ = run_backfill(BACKFILLS[name], batch_size=batch_size, pause=pause,
+                                  restart=restart, max_batches=max_batches)
+        return success
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume.")
+        return False
+    except MigrationError as e:
+        print(f"Error: {e}")
+        return False
+    except Exception as e:
+        print(f"Error during backfill: {str(e)}")
+        return False
+
 if __name__ == "__main__":
-    # Get migration file from command line argument or use default
-    migration_file = sys.argv[1] if len(sys.argv) > 1 else "sql/migrations/update_kennel_suites_table.sql"
+    # python run_migration.py [--status | --record-only] [file_or_directory]
+    #        run_migration.py --backfill NAME [--batch-size N] [--pause SECONDS] [--max-batches N] [--restart]
+    parser = argparse.ArgumentParser(description="Apply SQL migrations transactionally and record them in schema_migrations.")
+    parser.add_argument("path", nargs="?", default=DEFAULT_MIGRATIONS_DIR,
+                        help="Migration file, or a directory whose pending .sql files run in name order")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--status", action="store_true", help="List applied and pending migrations without running them")
+    mode.add_argument("--record-only", action="store_true",
+                      help="Mark pending migrations as applied without running them; run once on a database built from sql/tables to seed the ledger")
+    mode.add_argument("--backfill", metavar="NAME", help="Run or resume a batched data backfill (see --list-backfills)")
+    mode.add_argument("--list-backfills", action="store_true", help="List the backfills defined in backfill.py")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per backfill batch")
+    parser.add_argument("--pause", type=float, default=DEFAULT_PAUSE_SECONDS,
+                        help="Seconds to wait between backfill batches")
+    parser.add_argument("--max-batches", type=int, help="Stop the backfill after this many batches")
+    parser.add_argument("--restart", action="store_true", help="Start the backfill over instead of resuming")
+    args = parser.parse_args()
     
     # Run the migration
-    success = run_migration(migration_file)
+    if args.list_backfills:
+        for b in BACKFILLS.values():
+            print(f"{b.name}  ({b.table}): {b.description}")
+        success = True
+    elif args.backfill:
+        success = backfill(args.backfill, batch_size=args.batch_size, pause=args.pause,
+                           restart=args.restart, max_batches=args.max_batches)
+    elif args.status:
+        success = show_status(args.path)
+    else:
+        success = run_migration(args.path, record_only=args.record_only)
     
     # Exit with appropriate code
     sys.exit(0 if success else 1)
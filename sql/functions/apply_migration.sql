@@ -0,0 +1,76 @@
+-- Ledger of applied migrations and the function run_migration.py calls to
+-- apply one migration file in a single round trip.
+-- Install once from the SQL editor before using run_migration.py.
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    name TEXT PRIMARY KEY,
+    checksum TEXT NOT NULL,
+    statement_count INTEGER NOT NULL,
+    duration_ms NUMERIC,
+    applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+);
+
+ALTER TABLE schema_migrations ENABLE ROW LEVEL SECURITY;
+
+-- Run every statement of a migration and record it, all in the caller's
+-- transaction: if any statement fails, nothing (including the ledger row) is
+-- kept. Re-running an applied migration is a no-op; running a different file
+-- under an applied name is an error.
+-- Statements are split client-side (see migrations.py) so errors can name
+-- the failing statement. With p_record_only the migration is recorded
+-- without running it (for databases built straight from sql/tables).
+CREATE OR REPLACE FUNCTION apply_migration(
+    p_name TEXT,
+    p_checksum TEXT,
+    p_statements TEXT[],
+    p_record_only BOOLEAN DEFAULT false
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_existing TEXT;
+    v_started TIMESTAMP WITH TIME ZONE := clock_timestamp();
+    v_duration NUMERIC;
+    v_index INTEGER := 0;
+    v_statement TEXT;
+BEGIN
+    -- Serialize migration runs so two deploys cannot apply the same file at once
+    PERFORM pg_advisory_xact_lock(hashtext('apply_migration'));
+
+    SELECT checksum INTO v_existing FROM schema_migrations WHERE name = p_name;
+    IF v_existing = p_checksum THEN
+        RETURN jsonb_build_object('name', p_name, 'applied', false, 'skipped', true);
+    ELSIF v_existing IS NOT NULL THEN
+        RAISE EXCEPTION 'Migration % was already applied with checksum %, but the file now has checksum %',
+            p_name, v_existing, p_checksum
+            USING HINT = 'Applied migrations must not be edited; add a new migration instead.';
+    END IF;
+
+    IF NOT p_record_only THEN
+        FOREACH v_statement IN ARRAY p_statements LOOP
+            v_index := v_index + 1;
+            BEGIN
+                EXECUTE v_statement;
+            EXCEPTION WHEN OTHERS THEN
+                RAISE EXCEPTION 'Statement % of migration % failed: %', v_index, p_name, SQLERRM
+                    USING ERRCODE = SQLSTATE;
+            END;
+        END LOOP;
+    END IF;
+
+    v_duration := round(extract(epoch FROM clock_timestamp() - v_started) * 1000, 1);
+    INSERT INTO schema_migrations (name, checksum, statement_count, duration_ms)
+    VALUES (p_name, p_checksum, coalesce(array_length(p_statements, 1), 0), v_duration);
+
+    RETURN jsonb_build_object('name', p_name, 'applied', NOT p_record_only, 'skipped', false,
+                              'statements', coalesce(array_length(p_statements, 1), 0), 'duration_ms', v_duration);
+END;
+$$;
+
+-- Migrations run arbitrary DDL: only the service role may call this or read the ledger
+REVOKE ALL ON FUNCTION apply_migration(TEXT, TEXT, TEXT[], BOOLEAN) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION apply_migration(TEXT, TEXT, TEXT[], BOOLEAN) TO service_role;
+GRANT SELECT ON schema_migrations TO service_role;
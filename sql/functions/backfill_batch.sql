@@ -0,0 +1,133 @@
+-- Batched, resumable data backfills driven by run_migration.py --backfill.
+-- Install once from the SQL editor (after apply_migration.sql).
+
+-- Cursor and counters per backfill; updated in the same transaction as each
+-- batch, so an interrupted run resumes exactly after the last committed batch
+CREATE TABLE IF NOT EXISTS backfill_progress (
+    name TEXT PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    last_id UUID,
+    batches INTEGER NOT NULL DEFAULT 0,
+    rows_scanned BIGINT NOT NULL DEFAULT 0,
+    rows_updated BIGINT NOT NULL DEFAULT 0,
+    started_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
+ALTER TABLE backfill_progress ENABLE ROW LEVEL SECURITY;
+
+-- Process the next p_batch_size rows of p_table in primary-key order: rows in
+-- that window matching p_where get SET p_set. Each call is one short
+-- transaction that locks at most p_batch_size rows, and gives up quickly
+-- instead of queueing behind live traffic.
+-- p_set and p_where are SQL fragments from backfill.py, not user input.
+CREATE OR REPLACE FUNCTION backfill_batch(
+    p_name TEXT,
+    p_table TEXT,
+    p_set TEXT,
+    p_where TEXT,
+    p_batch_size INTEGER,
+    p_restart BOOLEAN DEFAULT false
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_after UUID;
+    v_last UUID;
+    v_scanned INTEGER;
+    v_updated INTEGER;
+    v_progress backfill_progress%ROWTYPE;
+BEGIN
+    PERFORM set_config('lock_timeout', '2s', true);
+
+    INSERT INTO backfill_progress (name, table_name) VALUES (p_name, p_table)
+    ON CONFLICT (name) DO NOTHING;
+    IF p_restart THEN
+        UPDATE backfill_progress
+        SET last_id = NULL, batches = 0, rows_scanned = 0, rows_updated = 0,
+            started_at = now(), finished_at = NULL
+        WHERE name = p_name;
+    END IF;
+    -- Row lock doubles as a guard against two runners working the same backfill
+    SELECT last_id INTO v_after FROM backfill_progress WHERE name = p_name FOR UPDATE NOWAIT;
+
+    EXECUTE format($sql$
+        WITH batch_window AS MATERIALIZED (
+            SELECT id FROM %1$I
+            WHERE $1 IS NULL OR id > $1
+            ORDER BY id
+            LIMIT $2
+        ), changed AS (
+            UPDATE %1$I AS target SET %2$s
+            FROM batch_window
+            WHERE target.id = batch_window.id AND (%3$s)
+            RETURNING 1
+        )
+        SELECT (SELECT count(*) FROM batch_window),
+               (SELECT count(*) FROM changed),
+               (SELECT id FROM batch_window ORDER BY id DESC LIMIT 1)
+    $sql$, p_table, p_set, p_where)
+    INTO v_scanned, v_updated, v_last
+    USING v_after, p_batch_size;
+
+    UPDATE backfill_progress
+    SET last_id = coalesce(v_last, last_id),
+        batches = batches + 1,
+        rows_scanned = rows_scanned + v_scanned,
+        rows_updated = rows_updated + v_updated,
+        updated_at = now(),
+        finished_at = CASE WHEN v_scanned < p_batch_size THEN now() END
+    WHERE name = p_name
+    RETURNING * INTO v_progress;
+
+    RETURN jsonb_build_object(
+        'scanned', v_scanned,
+        'updated', v_updated,
+        'last_id', v_progress.last_id,
+        'done', v_scanned < p_batch_size,
+        'batches', v_progress.batches,
+        'rows_scanned', v_progress.rows_scanned,
+        'rows_updated', v_progress.rows_updated
+    );
+END;
+$$;
+
+-- Count rows still matching p_condition; used to verify a backfill before
+-- constraints are tightened. Reads only, so it never blocks writers.
+CREATE OR REPLACE FUNCTION backfill_remaining(p_table TEXT, p_condition TEXT)
+RETURNS BIGINT
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_count BIGINT;
+BEGIN
+    EXECUTE format('SELECT count(*) FROM %I WHERE %s', p_table, p_condition) INTO v_count;
+    RETURN v_count;
+END;
+$$;
+
+-- Approximate table size from planner statistics, for progress estimates
+CREATE OR REPLACE FUNCTION backfill_estimated_rows(p_table TEXT)
+RETURNS BIGINT
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT greatest(reltuples, 0)::BIGINT FROM pg_class WHERE oid = to_regclass(p_table);
+$$;
+
+REVOKE ALL ON FUNCTION backfill_batch(TEXT, TEXT, TEXT, TEXT, INTEGER, BOOLEAN) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION backfill_remaining(TEXT, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION backfill_estimated_rows(TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION backfill_batch(TEXT, TEXT, TEXT, TEXT, INTEGER, BOOLEAN) TO service_role;
+GRANT EXECUTE ON FUNCTION backfill_remaining(TEXT, TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION backfill_estimated_rows(TEXT) TO service_role;
+GRANT SELECT ON backfill_progress TO service_role;
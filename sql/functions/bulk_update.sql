@@ -0,0 +1,73 @@
+-- Apply per-record column changes to many rows of one table in a single
+-- version-checked UPDATE (update_many_records() in supabase_config.py).
+-- p_rows is a JSON array of {"id": ..., "updated_at": ..., "changes": {...}}:
+-- each record gets only the columns in its "changes" object, and only if its
+-- updated_at still equals the value it was read with (null skips the check).
+-- Returns the updated rows. If any record changed or disappeared since it was
+-- read, nothing is written: the call fails with SQLSTATE PT409 (HTTP 409) and
+-- the error details hold the conflicting ids as a JSON array.
+-- Runs as the caller, so privileges and row level security apply as they do
+-- for a PATCH. Ids in p_rows must be unique.
+CREATE OR REPLACE FUNCTION bulk_update_records(p_table TEXT, p_rows JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+    v_columns TEXT[];
+    v_invalid TEXT;
+    v_assignments TEXT;
+    v_updated JSONB;
+    v_conflicts JSONB;
+BEGIN
+    IF to_regclass(p_table) IS NULL THEN
+        RAISE EXCEPTION 'relation "%" does not exist', p_table USING ERRCODE = '42P01';
+    END IF;
+
+    SELECT array_agg(DISTINCT k) INTO v_columns
+    FROM jsonb_array_elements(p_rows) AS r, jsonb_object_keys(r -> 'changes') AS k;
+    IF v_columns IS NULL THEN
+        RETURN '[]'::jsonb;
+    END IF;
+
+    SELECT c INTO v_invalid FROM unnest(v_columns) AS c
+    WHERE c = 'id' OR NOT EXISTS (
+        SELECT 1 FROM pg_attribute
+        WHERE attrelid = to_regclass(p_table) AND attname = c AND attnum > 0 AND NOT attisdropped
+    )
+    LIMIT 1;
+    IF v_invalid IS NOT NULL THEN
+        RAISE EXCEPTION 'column "%" of relation "%" cannot be updated', v_invalid, p_table USING ERRCODE = '42703';
+    END IF;
+
+    -- A column a record does not change keeps its current value
+    SELECT string_agg(format('%1$I = CASE WHEN v.changes ? %2$L THEN r.%1$I ELSE t.%1$I END', c, c), ', ')
+    INTO v_assignments
+    FROM unnest(v_columns) AS c;
+
+    EXECUTE format($sql$
+        WITH updated AS (
+            UPDATE %1$I AS t SET %2$s
+            FROM jsonb_to_recordset($1) AS v(id UUID, updated_at TIMESTAMP WITH TIME ZONE, changes JSONB)
+            CROSS JOIN LATERAL jsonb_populate_record(NULL::%1$I, v.changes) AS r
+            WHERE t.id = v.id AND (v.updated_at IS NULL OR t.updated_at = v.updated_at)
+            RETURNING t.*
+        )
+        SELECT coalesce(jsonb_agg(to_jsonb(updated)), '[]'::jsonb) FROM updated
+    $sql$, p_table, v_assignments)
+    INTO v_updated
+    USING p_rows;
+
+    SELECT coalesce(jsonb_agg(v.id), '[]'::jsonb) INTO v_conflicts
+    FROM jsonb_to_recordset(p_rows) AS v(id TEXT)
+    WHERE NOT EXISTS (SELECT 1 FROM jsonb_array_elements(v_updated) AS u WHERE u ->> 'id' = v.id);
+    IF jsonb_array_length(v_conflicts) > 0 THEN
+        -- Aborts the call, undoing the UPDATE above
+        RAISE EXCEPTION 'records changed or deleted since they were read'
+            USING ERRCODE = 'PT409', DETAIL = v_conflicts::text;
+    END IF;
+    RETURN v_updated;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION bulk_update_records(TEXT, JSONB) TO anon, authenticated;
@@ -0,0 +1,31 @@
+-- Return all pricing data for a center as one JSON document:
+-- {"kennel_suites": [...], "daycamp_daily": [...], "daycamp_packages": [...]}
+-- Runs as the caller, so row level security applies as it does for table reads.
+-- Center-level columns and created_at are stripped because the Review page does
+-- not render them; updated_at is kept as the version for edits (see
+-- DEFAULT_COLUMNS in table_query.py).
+CREATE OR REPLACE FUNCTION get_center_bundle(p_center_name TEXT)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'kennel_suites', COALESCE(
+            (SELECT jsonb_agg(to_jsonb(k) - ARRAY['center_name', 'district_manager', 'full_address', 'created_at'] ORDER BY k.created_at, k.id)
+             FROM kennel_suites k
+             WHERE k.center_name = p_center_name),
+            '[]'::jsonb),
+        'daycamp_daily', COALESCE(
+            (SELECT jsonb_agg(to_jsonb(d) - ARRAY['center_name', 'district_manager', 'full_address', 'created_at'] ORDER BY d.created_at, d.id)
+             FROM daycamp_daily d
+             WHERE d.center_name = p_center_name),
+            '[]'::jsonb),
+        'daycamp_packages', COALESCE(
+            (SELECT jsonb_agg(to_jsonb(p) - ARRAY['center_name', 'district_manager', 'full_address', 'created_at'] ORDER BY p.created_at, p.id)
+             FROM daycamp_packages p
+             WHERE p.center_name = p_center_name),
+            '[]'::jsonb)
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION get_center_bundle(TEXT) TO anon, authenticated;
@@ -0,0 +1,25 @@
+-- Rename price_two_dogs_same_kennel column to price_additional_dog
+-- (guarded: databases that ran this file before the schema_migrations ledger
+-- existed have no record of it, so run_migration.py runs it again)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_schema = 'public' AND table_name = 'kennel_suites'
+                 AND column_name = 'price_two_dogs_same_kennel') THEN
+        ALTER TABLE kennel_suites
+        RENAME COLUMN price_two_dogs_same_kennel TO price_additional_dog;
+    END IF;
+END
+$$;
+
+-- Add dog_sizes column as JSONB
+ALTER TABLE kennel_suites 
+ADD COLUMN IF NOT EXISTS dog_sizes JSONB;
+
+-- dog_sizes is filled from dog_size in small batches and only then made NOT NULL,
+-- so the pricing pages keep working while it runs:
+--   python run_migration.py --backfill kennel_suites_dog_sizes
+-- (see backfill.py and sql/functions/backfill_batch.sql)
+
+-- Optional: Drop the old dog_size column (only if you're sure the migration worked properly)
+-- ALTER TABLE kennel_suites DROP COLUMN dog_size;
@@ -0,0 +1,13 @@
+-- Make the center code unique so bulk imports can upsert on ctr_cd
+-- (NULL codes are still allowed and never conflict). Guarded, since databases
+-- built from sql/tables or migrated before the schema_migrations ledger
+-- existed already have the constraint.
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint
+                   WHERE conrelid = 'centers'::regclass AND conname = 'centers_ctr_cd_key') THEN
+        ALTER TABLE centers
+        ADD CONSTRAINT centers_ctr_cd_key UNIQUE (ctr_cd);
+    END IF;
+END
+$$;
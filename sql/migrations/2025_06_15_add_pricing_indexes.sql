@@ -0,0 +1,41 @@
+-- Secondary indexes for center-scoped reads, keyset paging and watermark scans.
+-- Lookups by id already use each table's primary key.
+--
+-- (center_name, created_at) also serves plain center_name lookups (it is the
+-- leading column), so no separate center_name index is created; it matches
+-- the Review page's center filter ordered by creation time.
+-- (updated_at, id) serves the incremental analytics refresh in
+-- pricing_analytics.py, which pages through rows past an updated_at watermark.
+--
+-- Plain CREATE INDEX (not CONCURRENTLY) because run_migration.py executes
+-- statements inside a transaction. On a busy production table, run these
+-- one at a time with CONCURRENTLY from the SQL editor instead.
+
+-- kennel_suites
+CREATE INDEX IF NOT EXISTS kennel_suites_center_created_idx ON kennel_suites (center_name, created_at);
+CREATE INDEX IF NOT EXISTS kennel_suites_district_manager_idx ON kennel_suites (district_manager);
+CREATE INDEX IF NOT EXISTS kennel_suites_updated_idx ON kennel_suites (updated_at, id);
+-- jsonb_path_ops: smaller and faster for the @> containment queries used on these arrays
+CREATE INDEX IF NOT EXISTS kennel_suites_dog_sizes_idx ON kennel_suites USING GIN (dog_sizes jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS kennel_suites_features_idx ON kennel_suites USING GIN (features jsonb_path_ops);
+
+-- daycamp_daily
+CREATE INDEX IF NOT EXISTS daycamp_daily_center_created_idx ON daycamp_daily (center_name, created_at);
+CREATE INDEX IF NOT EXISTS daycamp_daily_district_manager_idx ON daycamp_daily (district_manager);
+CREATE INDEX IF NOT EXISTS daycamp_daily_updated_idx ON daycamp_daily (updated_at, id);
+
+-- daycamp_packages
+CREATE INDEX IF NOT EXISTS daycamp_packages_center_created_idx ON daycamp_packages (center_name, created_at);
+CREATE INDEX IF NOT EXISTS daycamp_packages_district_manager_idx ON daycamp_packages (district_manager);
+CREATE INDEX IF NOT EXISTS daycamp_packages_updated_idx ON daycamp_packages (updated_at, id);
+
+-- centers: the center selector and rollup views look centers up by name and manager
+CREATE INDEX IF NOT EXISTS centers_ctr_name_idx ON centers (ctr_name);
+CREATE INDEX IF NOT EXISTS centers_district_manager_idx ON centers (district_manager);
+CREATE INDEX IF NOT EXISTS centers_updated_idx ON centers (updated_at, id);
+
+-- Refresh planner statistics so the new indexes are used right away
+ANALYZE kennel_suites;
+ANALYZE daycamp_daily;
+ANALYZE daycamp_packages;
+ANALYZE centers;
@@ -1,7 +1,7 @@
 -- Centers/Locations Table
 CREATE TABLE centers (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-    ctr_cd TEXT,
+    ctr_cd TEXT UNIQUE,
     ctr_name TEXT NOT NULL,
     is_open BOOLEAN DEFAULT true,
     is_acquisition BOOLEAN DEFAULT false,
@@ -25,6 +25,11 @@ CREATE TABLE centers (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
 );
 
+-- Indexes (see sql/migrations/2025_06_15_add_pricing_indexes.sql)
+CREATE INDEX centers_ctr_name_idx ON centers (ctr_name);
+CREATE INDEX centers_district_manager_idx ON centers (district_manager);
+CREATE INDEX centers_updated_idx ON centers (updated_at, id);
+
 -- Enable Row Level Security
 ALTER TABLE centers ENABLE ROW LEVEL SECURITY;
 
@@ -11,6 +11,11 @@ CREATE TABLE daycamp_daily (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
 );
 
+-- Indexes (see sql/migrations/2025_06_15_add_pricing_indexes.sql)
+CREATE INDEX daycamp_daily_center_created_idx ON daycamp_daily (center_name, created_at);
+CREATE INDEX daycamp_daily_district_manager_idx ON daycamp_daily (district_manager);
+CREATE INDEX daycamp_daily_updated_idx ON daycamp_daily (updated_at, id);
+
 -- Enable Row Level Security
 ALTER TABLE daycamp_daily ENABLE ROW LEVEL SECURITY;
 
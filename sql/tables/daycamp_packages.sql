@@ -11,6 +11,11 @@ CREATE TABLE daycamp_packages (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
 );
 
+-- Indexes (see sql/migrations/2025_06_15_add_pricing_indexes.sql)
+CREATE INDEX daycamp_packages_center_created_idx ON daycamp_packages (center_name, created_at);
+CREATE INDEX daycamp_packages_district_manager_idx ON daycamp_packages (district_manager);
+CREATE INDEX daycamp_packages_updated_idx ON daycamp_packages (updated_at, id);
+
 -- Enable Row Level Security
 ALTER TABLE daycamp_packages ENABLE ROW LEVEL SECURITY;
 
@@ -17,6 +17,13 @@ CREATE TABLE kennel_suites (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
 );
 
+-- Indexes (see sql/migrations/2025_06_15_add_pricing_indexes.sql)
+CREATE INDEX kennel_suites_center_created_idx ON kennel_suites (center_name, created_at);
+CREATE INDEX kennel_suites_district_manager_idx ON kennel_suites (district_manager);
+CREATE INDEX kennel_suites_updated_idx ON kennel_suites (updated_at, id);
+CREATE INDEX kennel_suites_dog_sizes_idx ON kennel_suites USING GIN (dog_sizes jsonb_path_ops);
+CREATE INDEX kennel_suites_features_idx ON kennel_suites USING GIN (features jsonb_path_ops);
+
 -- Enable Row Level Security
 ALTER TABLE kennel_suites ENABLE ROW LEVEL SECURITY;
 
@@ -0,0 +1,230 @@
+-- Precomputed pricing summaries per district manager, state and Nielsen DMA.
+-- Each view holds one row per (group, metric): a few hundred rows in total,
+-- so dashboards read these instead of scanning every pricing row.
+-- Refresh with refresh_pricing_rollups() (see pricing_rollups.py); it only
+-- does work when a source table changed since the last refresh.
+
+-- --- Change tracking ---
+
+-- Last time each source table was written, maintained by statement triggers
+CREATE TABLE IF NOT EXISTS pricing_rollup_changes (
+    table_name TEXT PRIMARY KEY,
+    changed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+);
+
+-- When the rollups were last rebuilt
+CREATE TABLE IF NOT EXISTS pricing_rollup_refreshes (
+    id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id),
+    refreshed_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    duration_ms NUMERIC
+);
+
+ALTER TABLE pricing_rollup_changes ENABLE ROW LEVEL SECURITY;
+ALTER TABLE pricing_rollup_refreshes ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION note_pricing_rollup_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    INSERT INTO pricing_rollup_changes (table_name, changed_at)
+    VALUES (TG_TABLE_NAME, now())
+    ON CONFLICT (table_name) DO UPDATE SET changed_at = EXCLUDED.changed_at;
+    RETURN NULL;
+END;
+$$;
+
+-- Statement-level, so a bulk write costs one bookkeeping row update, not one per row
+DROP TRIGGER IF EXISTS kennel_suites_rollup_change ON kennel_suites;
+CREATE TRIGGER kennel_suites_rollup_change
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON kennel_suites
+FOR EACH STATEMENT EXECUTE FUNCTION note_pricing_rollup_change();
+
+DROP TRIGGER IF EXISTS daycamp_daily_rollup_change ON daycamp_daily;
+CREATE TRIGGER daycamp_daily_rollup_change
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON daycamp_daily
+FOR EACH STATEMENT EXECUTE FUNCTION note_pricing_rollup_change();
+
+DROP TRIGGER IF EXISTS daycamp_packages_rollup_change ON daycamp_packages;
+CREATE TRIGGER daycamp_packages_rollup_change
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON daycamp_packages
+FOR EACH STATEMENT EXECUTE FUNCTION note_pricing_rollup_change();
+
+DROP TRIGGER IF EXISTS centers_rollup_change ON centers;
+CREATE TRIGGER centers_rollup_change
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON centers
+FOR EACH STATEMENT EXECUTE FUNCTION note_pricing_rollup_change();
+
+-- --- Rollups ---
+
+-- One row per price point, tagged with the center's grouping columns.
+-- Metric names match METRICS in pricing_analytics.py.
+-- security_invoker keeps row level security on the source tables in force for direct reads
+CREATE OR REPLACE VIEW pricing_facts WITH (security_invoker = true) AS
+WITH prices AS (
+    SELECT center_name, 'Suite price / night' AS metric, price_per_night AS value FROM kennel_suites
+    UNION ALL
+    SELECT center_name, 'Additional dog / night', price_additional_dog FROM kennel_suites
+    UNION ALL
+    SELECT center_name, 'Day camp drop-in', dropin FROM daycamp_daily
+    UNION ALL
+    SELECT center_name, 'Day camp half-day', halfday FROM daycamp_daily
+    UNION ALL
+    SELECT center_name, 'Day camp weekend', weekend FROM daycamp_daily
+    UNION ALL
+    SELECT center_name, 'Package price', price FROM daycamp_packages
+    UNION ALL
+    SELECT center_name, 'Package price / day', price / NULLIF(days, 0) FROM daycamp_packages
+)
+SELECT
+    p.center_name,
+    p.metric,
+    p.value,
+    COALESCE(c.district_manager, 'Unknown') AS district_manager,
+    COALESCE(c.state, 'Unknown') AS state,
+    COALESCE(c.nelson_dma, 'Unknown') AS nelson_dma
+FROM prices p
+LEFT JOIN LATERAL (
+    -- Center names are not unique in centers; prefer the active row
+    SELECT district_manager, state, nelson_dma
+    FROM centers
+    WHERE ctr_name = p.center_name
+    ORDER BY active DESC NULLS LAST, updated_at DESC
+    LIMIT 1
+) c ON true
+WHERE p.value IS NOT NULL;
+
+DROP MATERIALIZED VIEW IF EXISTS pricing_rollup_by_district;
+CREATE MATERIALIZED VIEW pricing_rollup_by_district AS
+SELECT
+    district_manager,
+    metric,
+    COUNT(DISTINCT center_name) AS center_count,
+    COUNT(*) AS price_count,
+    MIN(value) AS min_price,
+    percentile_cont(0.25) WITHIN GROUP (ORDER BY value) AS p25_price,
+    percentile_cont(0.5) WITHIN GROUP (ORDER BY value) AS median_price,
+    percentile_cont(0.75) WITHIN GROUP (ORDER BY value) AS p75_price,
+    percentile_cont(0.9) WITHIN GROUP (ORDER BY value) AS p90_price,
+    MAX(value) AS max_price,
+    AVG(value) AS mean_price
+FROM pricing_facts
+GROUP BY district_manager, metric;
+
+DROP MATERIALIZED VIEW IF EXISTS pricing_rollup_by_state;
+CREATE MATERIALIZED VIEW pricing_rollup_by_state AS
+SELECT
+    state,
+    metric,
+    COUNT(DISTINCT center_name) AS center_count,
+    COUNT(*) AS price_count,
+    MIN(value) AS min_price,
+    percentile_cont(0.25) WITHIN GROUP (ORDER BY value) AS p25_price,
+    percentile_cont(0.5) WITHIN GROUP (ORDER BY value) AS median_price,
+    percentile_cont(0.75) WITHIN GROUP (ORDER BY value) AS p75_price,
+    percentile_cont(0.9) WITHIN GROUP (ORDER BY value) AS p90_price,
+    MAX(value) AS max_price,
+    AVG(value) AS mean_price
+FROM pricing_facts
+GROUP BY state, metric;
+
+DROP MATERIALIZED VIEW IF EXISTS pricing_rollup_by_dma;
+CREATE MATERIALIZED VIEW pricing_rollup_by_dma AS
+SELECT
+    nelson_dma,
+    metric,
+    COUNT(DISTINCT center_name) AS center_count,
+    COUNT(*) AS price_count,
+    MIN(value) AS min_price,
+    percentile_cont(0.25) WITHIN GROUP (ORDER BY value) AS p25_price,
+    percentile_cont(0.5) WITHIN GROUP (ORDER BY value) AS median_price,
+    percentile_cont(0.75) WITHIN GROUP (ORDER BY value) AS p75_price,
+    percentile_cont(0.9) WITHIN GROUP (ORDER BY value) AS p90_price,
+    MAX(value) AS max_price,
+    AVG(value) AS mean_price
+FROM pricing_facts
+GROUP BY nelson_dma, metric;
+
+-- Unique indexes let REFRESH ... CONCURRENTLY keep the views readable while
+-- they rebuild; the metric index serves "this price across all groups" reads
+CREATE UNIQUE INDEX pricing_rollup_by_district_key ON pricing_rollup_by_district (district_manager, metric);
+CREATE INDEX pricing_rollup_by_district_metric ON pricing_rollup_by_district (metric);
+CREATE UNIQUE INDEX pricing_rollup_by_state_key ON pricing_rollup_by_state (state, metric);
+CREATE INDEX pricing_rollup_by_state_metric ON pricing_rollup_by_state (metric);
+CREATE UNIQUE INDEX pricing_rollup_by_dma_key ON pricing_rollup_by_dma (nelson_dma, metric);
+CREATE INDEX pricing_rollup_by_dma_metric ON pricing_rollup_by_dma (metric);
+
+-- --- Refresh ---
+
+-- Rebuild the rollups if any source table changed since the last rebuild.
+-- Returns {"refreshed": bool, "refreshed_at": ..., "changed_at": ..., "duration_ms": ...}.
+-- The triggers stamp a write with its transaction's start time (now()), so a
+-- write whose transaction began before a rebuild but committed after it
+-- carries an older stamp than the rebuild. Changes are therefore compared
+-- against the last rebuild minus an overlap, like the watermark of the
+-- analytics cube (WATERMARK_OVERLAP_SECONDS in pricing_analytics.py).
+CREATE OR REPLACE FUNCTION refresh_pricing_rollups(p_force BOOLEAN DEFAULT false)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_changed_at TIMESTAMP WITH TIME ZONE;
+    v_refreshed_at TIMESTAMP WITH TIME ZONE;
+    v_started TIMESTAMP WITH TIME ZONE := clock_timestamp();
+    v_duration NUMERIC;
+    v_overlap CONSTANT INTERVAL := interval '5 seconds';
+BEGIN
+    -- One refresh at a time; concurrent callers simply report the current state
+    IF NOT pg_try_advisory_xact_lock(hashtext('refresh_pricing_rollups')) THEN
+        SELECT refreshed_at INTO v_refreshed_at FROM pricing_rollup_refreshes;
+        RETURN jsonb_build_object('refreshed', false, 'refreshed_at', v_refreshed_at, 'busy', true);
+    END IF;
+
+    SELECT max(changed_at) INTO v_changed_at FROM pricing_rollup_changes;
+    SELECT refreshed_at INTO v_refreshed_at FROM pricing_rollup_refreshes;
+
+    IF NOT p_force AND v_refreshed_at IS NOT NULL
+       AND (v_changed_at IS NULL OR v_changed_at < v_refreshed_at - v_overlap) THEN
+        RETURN jsonb_build_object('refreshed', false, 'refreshed_at', v_refreshed_at, 'changed_at', v_changed_at);
+    END IF;
+
+    REFRESH MATERIALIZED VIEW CONCURRENTLY pricing_rollup_by_district;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY pricing_rollup_by_state;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY pricing_rollup_by_dma;
+
+    -- Stamp with the start time: writes that land during the rebuild trigger another one,
+    -- and so do writes stamped up to v_overlap earlier
+    v_duration := round(extract(epoch FROM clock_timestamp() - v_started) * 1000, 1);
+    INSERT INTO pricing_rollup_refreshes (id, refreshed_at, duration_ms)
+    VALUES (true, v_started, v_duration)
+    ON CONFLICT (id) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at, duration_ms = EXCLUDED.duration_ms;
+
+    RETURN jsonb_build_object('refreshed', true, 'refreshed_at', v_started, 'changed_at', v_changed_at,
+                              'duration_ms', v_duration);
+END;
+$$;
+
+-- Change-only refresh for the app's key: it cannot force a rebuild, so calling
+-- it when nothing changed costs two small reads
+CREATE OR REPLACE FUNCTION refresh_pricing_rollups_if_changed()
+RETURNS JSONB
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT refresh_pricing_rollups(false);
+$$;
+
+GRANT SELECT ON pricing_rollup_by_district, pricing_rollup_by_state, pricing_rollup_by_dma TO anon, authenticated;
+-- A forced rebuild is expensive: only the service role may ask for one
+REVOKE ALL ON FUNCTION refresh_pricing_rollups(BOOLEAN) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION refresh_pricing_rollups(BOOLEAN) TO service_role;
+REVOKE ALL ON FUNCTION refresh_pricing_rollups_if_changed() FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION refresh_pricing_rollups_if_changed() TO anon, authenticated, service_role;
+
+-- Optional: refresh every five minutes with pg_cron instead of pricing_rollups.py
+-- SELECT cron.schedule('refresh-pricing-rollups', '*/5 * * * *', 'SELECT refresh_pricing_rollups_if_changed()');
@@ -1,19 +1,485 @@
 import streamlit as st
+import contextvars
+import copy
 import json
-from datetime import datetime
-from supabase import create_client, Client
-from typing import Dict, Any, Tuple, List, Optional, Union
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from collections import deque
+from datetime import datetime, timedelta
+import httpx
+import pandas as pd
+from postgrest.exceptions import APIError
+from supabase import create_client, Client, ClientOptions
+from typing import Dict, Any, Tuple, List, Optional, Union, Callable, Iterator, TypeVar, Deque, ContextManager
+from table_query import TableQuery, DEFAULT_COLUMNS, CENTER_COLUMNS
+from outbox import Outbox, OutboxEntry, DEFAULT_OUTBOX_PATH, PENDING as OUTBOX_PENDING
+from replica import ReadReplica, DEFAULT_REPLICA_PATH, REPLICA_TABLES
+from read_cache import ReadCache, CacheKey, DEFAULT_MAX_BYTES as DEFAULT_READ_CACHE_MAX_BYTES
+import instrumentation
 
-def get_supabase_client() -> Client:
-    """Create and return a Supabase client using credentials from Streamlit secrets."""
-    url = st.secrets["supabase_url"]
-    key = st.secrets["supabase_key"]
-    return create_client(url, key)
+T = TypeVar("T")
 
+# Defaults for the shared client pool; override with supabase_pool_size /
+# supabase_timeout in .streamlit/secrets.toml
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT_SECONDS = 10.0
+KEEPALIVE_EXPIRY_SECONDS = 60.0
 
+# Errors that mean the client's HTTP connection is unusable and should be rebuilt
+CONNECTION_ERRORS = (httpx.TransportError,)
+
+
+class _CountingTransport(httpx.HTTPTransport):
+    """HTTP transport that reports whether each request opened a new TCP connection."""
+
+    def __init__(self, on_request: Callable[[bool], None], **kwargs):
+        super().__init__(**kwargs)
+        self._on_request = on_request
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        opened = False
+
+        def trace(event_name, info):
+            nonlocal opened
+            if event_name == "connection.connect_tcp.complete":
+                opened = True
+
+        request.extensions = {**request.extensions, "trace": trace}
+        response = super().handle_request(request)
+        self._on_request(opened)
+        return response
+
+
+class SupabaseClientPool:
+    """Thread-safe pool of Supabase clients shared by every session in the process.
+
+    Each pooled client owns a keep-alive HTTP connection pool with a per-request
+    timeout, so repeated calls reuse warm connections instead of paying a new
+    TLS handshake. A client that raises a connection error is closed and
+    replaced the next time it is checked out.
+    """
+
+    def __init__(self, url: str, key: str, size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT_SECONDS):
+        self.url = url
+        self.key = key
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle: List[Client] = []
+        self._http_clients: Dict[int, httpx.Client] = {}
+        self._created = 0
+        self._broken = 0
+        self._stats = {
+            "clients_opened": 0,
+            "clients_reused": 0,
+            "clients_rebuilt": 0,
+            "connections_opened": 0,
+            "connections_reused": 0,
+        }
+
+    def _record_request(self, opened_connection: bool) -> None:
+        with self._lock:
+            if opened_connection:
+                self._stats["connections_opened"] += 1
+            else:
+                self._stats["connections_reused"] += 1
+
+    def _new_client(self) -> Client:
+        http_client = httpx.Client(
+            transport=_CountingTransport(
+                self._record_request,
+                http2=True,
+                limits=httpx.Limits(keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS),
+            ),
+            timeout=httpx.Timeout(self.timeout),
+            follow_redirects=True,
+        )
+        client = create_client(self.url, self.key, ClientOptions(httpx_client=http_client))
+        self._http_clients[id(client)] = http_client
+        return client
+
+    def _discard(self, client: Client) -> None:
+        http_client = self._http_clients.pop(id(client), None)
+        if http_client is not None:
+            try:
+                http_client.close()
+            except Exception:
+                pass
+
+    def acquire(self) -> Client:
+        """Check a client out of the pool, creating or rebuilding one if needed."""
+        with self._available:
+            while True:
+                if self._idle:
+                    self._stats["clients_reused"] += 1
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    if self._broken:
+                        self._broken -= 1
+                        self._stats["clients_rebuilt"] += 1
+                    else:
+                        self._stats["clients_opened"] += 1
+                    break
+                self._available.wait()
+        try:
+            return self._new_client()
+        except Exception:
+            with self._available:
+                self._created -= 1
+                self._available.notify()
+            raise
+
+    def release(self, client: Client, broken: bool = False) -> None:
+        """Return a client to the pool, dropping it if its connection went bad."""
+        with self._available:
+            if broken:
+                self._discard(client)
+                self._created -= 1
+                self._broken += 1
+            else:
+                self._idle.append(client)
+            self._available.notify()
+
+    @contextmanager
+    def client(self) -> Iterator[Client]:
+        """Context manager that checks out a client and returns it afterwards."""
+        client = self.acquire()
+        broken = False
+        try:
+            yield client
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            self.release(client, broken=broken)
+
+    def run(self, operation: Callable[[Client], T], retry: bool = False) -> T:
+        """Run ``operation`` with a pooled client.
+
+        Args:
+            operation: Callable that receives a client and performs the request
+            retry: Retry once on a rebuilt client after a connection error.
+                Only safe for idempotent requests.
+
+        Returns:
+            Whatever ``operation`` returns
+        """
+        try:
+            with self.client() as client:
+                return operation(client)
+        except CONNECTION_ERRORS:
+            if not retry:
+                raise
+        with self.client() as client:
+            return operation(client)
+
+    def stats(self) -> Dict[str, int]:
+        """Return a snapshot of the pool counters."""
+        with self._lock:
+            return {**self._stats, "pool_size": self.size, "idle": len(self._idle)}
+
+    def close(self) -> None:
+        """Close every idle client. Checked-out clients are closed when released broken."""
+        with self._lock:
+            for client in self._idle:
+                self._discard(client)
+            self._created -= len(self._idle)
+            self._idle.clear()
+
+
+_pool: Optional[SupabaseClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> SupabaseClientPool:
+    """Return the process-wide client pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SupabaseClientPool(
+                    st.secrets["supabase_url"],
+                    st.secrets["supabase_key"],
+                    size=int(st.secrets.get("supabase_pool_size", DEFAULT_POOL_SIZE)),
+                    timeout=float(st.secrets.get("supabase_timeout", DEFAULT_TIMEOUT_SECONDS)),
+                )
+    return _pool
+
+
+def get_pool_stats() -> Dict[str, int]:
+    """Return connection counters for the shared pool (opened, reused, rebuilt)."""
+    return get_client_pool().stats()
+
+
+def get_supabase_client() -> ContextManager[Client]:
+    """Check a client out of the process-wide pool for the duration of a ``with`` block.
+
+    The client goes back to the pool when the block ends, and is rebuilt if
+    it raised a connection error. Prefer ``get_client_pool().run(...)``,
+    which can also retry idempotent requests. Example::
+
+        with get_supabase_client() as client:
+            client.table("centers").select("ctr_name").execute()
+    """
+    return get_client_pool().client()
+
+
+# --- Durable outbox for writes (see outbox.py) ---
+
+QUEUED_MESSAGE = "Saved locally; it will be sent to the database once it is reachable."
+OUTBOX_BATCH_SIZE = 100
+# Longest wait between replay attempts while the database is unreachable
+MAX_REPLAY_BACKOFF_SECONDS = 60.0
+# Writes the database rejected are kept this long for inspection on the
+# Diagnostics page, then deleted; override with outbox_failed_retention_days
+DEFAULT_FAILED_RETENTION_DAYS = 30.0
+
+_outbox: Optional[Outbox] = None
+_outbox_lock = threading.Lock()
+_replayer: Optional[threading.Thread] = None
+_replayer_wakeup = threading.Event()
+
+
+def get_outbox() -> Outbox:
+    """Return the process-wide outbox, resuming the replay of any leftover writes."""
+    global _outbox
+    if _outbox is None:
+        resume = False
+        with _outbox_lock:
+            if _outbox is None:
+                _outbox = Outbox(st.secrets.get("outbox_path", DEFAULT_OUTBOX_PATH))
+                _outbox.discard_failed(older_than=_failed_retention_cutoff())
+                resume = _outbox.counts()[OUTBOX_PENDING] > 0
+        # Outside _outbox_lock, which _kick_replayer() takes itself
+        if resume:
+            _kick_replayer()
+    return _outbox
+
+
+def _failed_retention_cutoff() -> float:
+    days = float(st.secrets.get("outbox_failed_retention_days", DEFAULT_FAILED_RETENTION_DAYS))
+    return time.time() - days * 86400
+
+
+def purge_failed_writes() -> int:
+    """Delete rejected writes older than outbox_failed_retention_days; returns how many."""
+    return get_outbox().discard_failed(older_than=_failed_retention_cutoff())
+
+
+def _kick_replayer() -> None:
+    global _replayer
+    with _outbox_lock:
+        if _replayer is None or not _replayer.is_alive():
+            _replayer = threading.Thread(target=_replay_loop, name="supabase-outbox-replayer", daemon=True)
+            _replayer.start()
+    _replayer_wakeup.set()
+
+
+# Payload key carrying the updated_at value a conditional update expects
+VERSION_KEY = "__expected_updated_at"
+
+
+class WriteConflict(Exception):
+    """A conditional update found the record changed (or deleted) since it was read.
+    
+    Attributes:
+        record_ids: Ids of the records that failed the version check, when known
+    """
+    
+    def __init__(self, message: str, record_ids: Optional[List[str]] = None):
+        super().__init__(message)
+        self.record_ids = record_ids or []
+
+
+def _update_request(client: Client, table_name: str, record_id: str, payload: Dict[str, Any]):
+    """Build an update by id, matching ``updated_at`` too when the payload carries a version."""
+    changes = {key: value for key, value in payload.items() if key != VERSION_KEY}
+    request = client.table(table_name).update(changes).eq("id", record_id)
+    if VERSION_KEY in payload:
+        request = request.eq("updated_at", payload[VERSION_KEY])
+    return request
+
+
+def _bulk_update_request(client: Client, table_name: str, payloads: List[Dict[str, Any]]):
+    """Send per-record changes through the bulk_update_records RPC (sql/functions/bulk_update.sql).
+    
+    Args:
+        client: Supabase client
+        table_name: Table to update
+        payloads: One ``{"id", "updated_at", "changes"}`` dict per record
+        
+    Raises:
+        WriteConflict: A record changed since it was read; nothing was written
+    """
+    try:
+        return client.rpc("bulk_update_records", {"p_table": table_name, "p_rows": payloads}).execute()
+    except APIError as e:
+        # PT409: raised by the function when a version check fails
+        if e.code == "PT409":
+            raise WriteConflict(f"{table_name} records changed before these edits were sent",
+                                [str(record_id) for record_id in json.loads(e.details or "[]")]) from e
+        # PGRST202: function not found in the schema cache
+        if e.code == "PGRST202":
+            raise RuntimeError("bulk_update_records() is not installed; run sql/functions/bulk_update.sql "
+                               "in the SQL editor first") from e
+        raise
+
+
+def _send_entries(client: Client, op: str, table_name: str, entries: List[OutboxEntry]):
+    """Send a run of same-kind outbox entries; inserts, bulk updates and deletes go as one request."""
+    table = client.table(table_name)
+    if op == "insert":
+        # Upsert that ignores existing ids makes a replayed insert a no-op
+        return table.upsert([entry.payload for entry in entries], on_conflict="id",
+                            ignore_duplicates=True).execute()
+    if op == "bulk_update":
+        return _bulk_update_request(client, table_name, [entry.payload for entry in entries])
+    if op == "delete":
+        return table.delete().in_("id", [entry.record_id for entry in entries]).execute()
+    if op == "update" and len(entries) == 1:
+        response = _update_request(client, table_name, entries[0].record_id, entries[0].payload).execute()
+        if VERSION_KEY in entries[0].payload and not response.data:
+            raise WriteConflict(f"{table_name} record {entries[0].record_id} changed before this edit was sent")
+        return response
+    raise ValueError(f"Cannot send {len(entries)} {op} entries together")
+
+
+@instrumentation.traced("replay")
+def replay_outbox(batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Send one batch of queued writes in order.
+    
+    Consecutive inserts, bulk updates or deletes for the same table are sent as
+    a single request; updates are sent one by one. A write the database
+    rejects is parked as failed so it does not block the writes behind it.
+    
+    Returns:
+        Number of entries delivered or parked; 0 when the outbox is empty
+        
+    Raises:
+        httpx.TransportError: The database is unreachable; unsent entries stay queued
+    """
+    outbox = get_outbox()
+    entries = outbox.claim_batch(batch_size)
+    groups: List[List[OutboxEntry]] = []
+    for entry in entries:
+        previous = groups[-1][-1] if groups else None
+        if (previous is not None and entry.op != "update" and previous.op == entry.op
+                and previous.table_name == entry.table_name):
+            groups[-1].append(entry)
+        else:
+            groups.append([entry])
+
+    for index, group in enumerate(groups):
+        try:
+            response = get_client_pool().run(lambda client: _send_entries(client, group[0].op, group[0].table_name, group))
+            outbox.mark_done([entry.seq for entry in group])
+            _write_applied(group[0].op, group[0].table_name, [entry.record_id for entry in group], response)
+        except CONNECTION_ERRORS as e:
+            outbox.release([entry.seq for later in groups[index:] for entry in later], str(e))
+            raise
+        except Exception as e:
+            if len(group) == 1:
+                outbox.mark_failed([group[0].seq], str(e))
+                continue
+            # Send the group's entries one at a time so only the bad one is parked. They
+            # stay claimed meanwhile, so no other replayer can send them too; later groups
+            # go back to the queue for the next batch.
+            outbox.release([entry.seq for later in groups[index + 1:] for entry in later], str(e))
+            for position, entry in enumerate(group):
+                try:
+                    response = get_client_pool().run(lambda client: _send_entries(client, entry.op, entry.table_name, [entry]))
+                    outbox.mark_done([entry.seq])
+                    _write_applied(entry.op, entry.table_name, [entry.record_id], response)
+                except CONNECTION_ERRORS as entry_error:
+                    outbox.release([unsent.seq for unsent in group[position:]], str(entry_error))
+                    raise
+                except Exception as entry_error:
+                    outbox.mark_failed([entry.seq], str(entry_error))
+            return len(group)
+    return len(entries)
+
+
+def _replay_loop() -> None:
+    backoff = 0.0
+    while True:
+        _replayer_wakeup.wait(timeout=backoff or None)
+        _replayer_wakeup.clear()
+        try:
+            while replay_outbox():
+                pass
+            purge_failed_writes()
+            backoff = 0.0
+        except CONNECTION_ERRORS:
+            backoff = min(max(1.0, backoff * 2), MAX_REPLAY_BACKOFF_SECONDS)
+        except Exception:
+            backoff = MAX_REPLAY_BACKOFF_SECONDS
+
+
+def _write_applied(op: str, table_name: str, record_ids: List[str], response: Any) -> None:
+    """Bring this process's read paths up to date with a write the database accepted."""
+    _bump_write_generation(table_name)
+    _invalidate_read_cache(table_name, record_ids, response)
+    _replica_write_through(op, table_name, record_ids, response)
+
+
+def _write_via_outbox(op: str, table_name: str, records: List[Tuple[str, Optional[Dict[str, Any]]]],
+                      send: Callable[[Client], Any]) -> Any:
+    """Record writes in the outbox, then try to send them straight away.
+    
+    Returns:
+        The API response, or None if the writes were left queued because
+        the database is unreachable or older writes to the same records are
+        still waiting
+        
+    Raises:
+        Exception: The database rejected the writes; they are parked as failed
+    """
+    outbox = get_outbox()
+    entries = outbox.append_many(op, table_name, records, claim=True)
+    seqs = [seq for seq, _ in entries]
+    if not all(claimed for _, claimed in entries):
+        # Keep per-record order: let the replayer send these after the older writes
+        outbox.release([seq for seq, claimed in entries if claimed], "Queued behind earlier writes")
+        _kick_replayer()
+        return None
+    try:
+        response = get_client_pool().run(send)
+    except CONNECTION_ERRORS as e:
+        outbox.release(seqs, str(e))
+        _kick_replayer()
+        return None
+    except WriteConflict:
+        # Nothing was written and the caller hears why, so there is nothing left to send
+        outbox.mark_done(seqs)
+        _write_applied(op, table_name, [record_id for record_id, _ in records], None)
+        raise
+    except Exception as e:
+        outbox.mark_failed(seqs, str(e))
+        raise
+    outbox.mark_done(seqs)
+    _write_applied(op, table_name, [record_id for record_id, _ in records], response)
+    if instrumentation.active():
+        instrumentation.add_rows(len(records))
+        instrumentation.add_bytes(len(json.dumps([data for _, data in records if data is not None], default=str))
+                                  + len(json.dumps(getattr(response, "data", None) or [], default=str)))
+    return response
+
+
+@instrumentation.traced("write")
 def save_to_supabase(table_name: str, data: Dict[str, Any]) -> Tuple[bool, str]:
     """Save data to Supabase table and return success status and message.
     
+    The row is recorded in the local outbox first. If the database cannot
+    be reached the save still succeeds with QUEUED_MESSAGE and is replayed
+    later; a row without an ``id`` is given one so the replay is idempotent.
+    
     Args:
         table_name: Name of the table to insert data into
         data: Dictionary of data to insert
@@ -21,43 +487,812 @@ def save_to_supabase(table_name: str, data: Dict[str, Any]) -> Tuple[bool, str]:
     Returns:
         Tuple of (success, message)
     """
+    record = data if data.get("id") else {**data, "id": str(uuid.uuid4())}
     try:
-        client = get_supabase_client()
-        response = client.table(table_name).insert(data).execute()
+        response = _write_via_outbox(
+            "insert", table_name, [(record["id"], record)],
+            lambda client: client.table(table_name).upsert(record, on_conflict="id", ignore_duplicates=True).execute()
+        )
         
-        # Check if response contains data (success)
-        if response.data:
-            return True, "Data saved successfully!"
-        else:
-            return False, f"Error: {response.error.message if hasattr(response, 'error') else 'Unknown error'}"
+        if response is None:
+            return True, QUEUED_MESSAGE
+        return True, "Data saved successfully!"
     except Exception as e:
         return False, f"Error: {str(e)}"
 
 
-def fetch_from_supabase(table_name: str, center_name: Optional[str] = None) -> List[Dict[str, Any]]:
+@instrumentation.traced("write")
+def save_many_to_supabase(table_name: str, rows: List[Dict[str, Any]]) -> Tuple[bool, str]:
+    """Insert several rows into a Supabase table in a single request.
+    
+    Args:
+        table_name: Name of the table to insert data into
+        rows: Dictionaries to insert; they should share the same keys
+        
+    Returns:
+        Tuple of (success, message)
+    """
+    records = [row if row.get("id") else {**row, "id": str(uuid.uuid4())} for row in rows]
+    try:
+        response = _write_via_outbox(
+            "insert", table_name, [(record["id"], record) for record in records],
+            lambda client: client.table(table_name).upsert(records, on_conflict="id", ignore_duplicates=True).execute()
+        )
+        
+        if response is None:
+            return True, QUEUED_MESSAGE
+        return True, f"{len(records)} records saved successfully!"
+    except Exception as e:
+        return False, f"Error: {str(e)}"
+
+
+# Recent read sizes, newest last, so the bytes saved by projections can be inspected
+PAYLOAD_HISTORY_SIZE = 200
+_payload_history: Deque[Dict[str, Any]] = deque(maxlen=PAYLOAD_HISTORY_SIZE)
+_payload_totals: Dict[str, Dict[str, int]] = {}
+_payload_lock = threading.Lock()
+
+
+def _record_payload(query: TableQuery, rows: List[Dict[str, Any]]) -> None:
+    # Size of the rows as JSON, which tracks the response body PostgREST sent
+    size = len(json.dumps(rows, default=str))
+    instrumentation.add_bytes(size)
+    with _payload_lock:
+        _payload_history.append({
+            "table": query.table,
+            "columns": query.projection,
+            "rows": len(rows),
+            "bytes": size,
+        })
+        totals = _payload_totals.setdefault(query.table, {"calls": 0, "rows": 0, "bytes": 0})
+        totals["calls"] += 1
+        totals["rows"] += len(rows)
+        totals["bytes"] += size
+
+
+def get_payload_stats() -> Dict[str, Any]:
+    """Return per-table read totals and the most recent reads with their payload sizes."""
+    with _payload_lock:
+        return {
+            "totals": {table: dict(totals) for table, totals in _payload_totals.items()},
+            "recent": list(_payload_history),
+        }
+
+
+# --- Single-flight reads ---
+
+@dataclass
+class _Flight:
+    """A database read in progress that identical reads wait on instead of repeating."""
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: Optional[BaseException] = None
+
+
+_flights: Dict[Any, _Flight] = {}
+_flights_lock = threading.Lock()
+# Writes applied per table; part of the flight key so a read issued after a
+# write never joins a request that was sent before it
+_write_generations: Dict[str, int] = {}
+
+
+def _bump_write_generation(table_name: str) -> None:
+    with _flights_lock:
+        _write_generations[table_name] = _write_generations.get(table_name, 0) + 1
+
+
+def _single_flight(tables: Tuple[str, ...], key: Any, fetch: Callable[[], T]) -> T:
+    """Run ``fetch`` once for concurrent callers with the same ``key``.
+    
+    The first caller sends the request; callers arriving while it is in
+    flight wait for it and get a deep copy of its result (or its exception),
+    so sessions never share mutable rows.
+    
+    Args:
+        tables: Tables the read depends on, for ordering against writes
+        key: Hashable description of the read (table, filters, projection, ...)
+        fetch: Performs the read
+    """
+    with _flights_lock:
+        key = (key, tuple(_write_generations.get(table, 0) for table in tables))
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+    instrumentation.count_cache("single_flight", hit=not leader)
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return copy.deepcopy(flight.result)
+    try:
+        flight.result = fetch()
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+
+
+# --- Shared read cache (see read_cache.py) ---
+
+# How long a cached read is served without asking the database. Writes made by
+# this process drop the affected entries at once, so this only bounds how long
+# changes made elsewhere (another server, the SQL editor) go unseen. Override
+# with read_cache_ttl_seconds in .streamlit/secrets.toml (0 disables the cache)
+# and cap its size with read_cache_max_bytes.
+DEFAULT_READ_CACHE_TTL_SECONDS = 300.0
+
+_read_cache: Optional[ReadCache] = None
+_read_cache_lock = threading.Lock()
+
+
+def read_cache_ttl() -> float:
+    """Configured lifetime of read cache entries, in seconds."""
+    return float(st.secrets.get("read_cache_ttl_seconds", DEFAULT_READ_CACHE_TTL_SECONDS))
+
+
+def get_read_cache() -> Optional[ReadCache]:
+    """Return the process-wide read cache, or None when it is disabled."""
+    global _read_cache
+    if read_cache_ttl() <= 0:
+        return None
+    if _read_cache is None:
+        with _read_cache_lock:
+            if _read_cache is None:
+                _read_cache = ReadCache(int(st.secrets.get("read_cache_max_bytes", DEFAULT_READ_CACHE_MAX_BYTES)))
+    return _read_cache
+
+
+def get_read_cache_stats() -> Dict[str, int]:
+    """Return the read cache's entries, bytes, evictions and invalidations ({} before first use)."""
+    return _read_cache.stats() if _read_cache is not None else {}
+
+
+def _cache_key(query: TableQuery) -> Optional[CacheKey]:
+    """Key for a plain per-center or whole-table read; None for queries with other filters, order or limit."""
+    if query.order or query.limit is not None:
+        return None
+    if not query.filters:
+        return query.table, None, query.projection
+    if len(query.filters) == 1:
+        column, operator, value = query.filters[0]
+        if operator == "eq" and column == CENTER_COLUMNS.get(query.table, "center_name"):
+            return query.table, value, query.projection
+    return None
+
+
+def _cache_read(query: TableQuery, max_staleness: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+    key = _cache_key(query)
+    cache = get_read_cache() if key is not None else None
+    max_age = read_cache_ttl() if max_staleness is None else max_staleness
+    if cache is None or max_age <= 0:
+        return None
+    rows = cache.get(key, max_age)
+    instrumentation.count_cache("read_cache", rows is not None)
+    return rows
+
+
+def _write_generation(table_name: str) -> int:
+    with _flights_lock:
+        return _write_generations.get(table_name, 0)
+
+
+def _cache_store(query: TableQuery, rows: List[Dict[str, Any]], generation: int, loaded_at: float) -> None:
+    """Cache rows read from the database, unless a write to the table was applied while they were read.
+    
+    The check and the insert happen under the lock _write_applied() bumps the
+    generation with, so rows read before a write are either refused here or
+    dropped by that write's invalidation.
+    """
+    key = _cache_key(query)
+    cache = get_read_cache() if key is not None else None
+    if cache is None:
+        return
+    with _flights_lock:
+        if _write_generations.get(query.table, 0) == generation:
+            cache.put(key, rows, loaded_at)
+
+
+def _invalidate_read_cache(table_name: str, record_ids: List[str], response: Any) -> None:
+    """Drop cached reads of the centers a write touched (read from the rows the database returned)."""
+    if _read_cache is None:
+        return
+    center_column = CENTER_COLUMNS.get(table_name, "center_name")
+    rows = getattr(response, "data", None) or []
+    centers = {row.get(center_column) for row in rows if isinstance(row, dict)}
+    _read_cache.invalidate(table_name, centers, record_ids)
+
+
+def _fetch_query(query: TableQuery) -> List[Dict[str, Any]]:
+    rows = get_client_pool().run(lambda client: query.build(client).execute(), retry=True).data
+    _record_payload(query, rows)
+    return rows
+
+
+@instrumentation.traced("read")
+def execute_query(query: TableQuery) -> List[Dict[str, Any]]:
+    """Run a TableQuery and return its rows, raising on failure.
+    
+    Identical queries already in flight (same table, columns, filters,
+    ordering and limit) are joined rather than sent again.
+    """
+    return _single_flight((query.table,), query, lambda: _fetch_query(query))
+
+
+def _read_database(query: TableQuery) -> List[Dict[str, Any]]:
+    """Run a TableQuery against the database and keep the result in the read cache."""
+    generation, loaded_at = _write_generation(query.table), time.monotonic()
+    rows = execute_query(query)
+    _cache_store(query, rows, generation, loaded_at)
+    return rows
+
+
+@instrumentation.traced("read")
+def read_query(query: TableQuery, max_staleness: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Run a TableQuery against the shared read cache or the local read replica
+    if they are fresh enough, else the database.
+    
+    Args:
+        query: Table, columns, filters, ordering and limit to fetch
+        max_staleness: Oldest cached or replica data acceptable, in seconds;
+            None uses the configured bounds (read_cache_ttl_seconds,
+            replica_max_staleness_seconds) and 0 always reads the database
+    """
+    rows = _cache_read(query, max_staleness)
+    if rows is None:
+        rows = _replica_read(query, max_staleness)
+    return rows if rows is not None else _read_database(query)
+
+
+@instrumentation.traced("read")
+def fetch_rows(query: TableQuery, max_staleness: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Fetch the rows matching a TableQuery, showing an error and returning [] on failure.
+    
+    Args:
+        query: Table, columns, filters, ordering and limit to fetch
+        max_staleness: See read_query()
+        
+    Returns:
+        List of records as dictionaries
+    """
+    try:
+        return read_query(query, max_staleness)
+    except Exception as e:
+        st.error(f"Error fetching data: {str(e)}")
+        return []
+
+
+@instrumentation.traced("read")
+def fetch_from_supabase(table_name: str, center_name: Optional[str] = None,
+                        columns: Optional[List[str]] = None,
+                        max_staleness: Optional[float] = None) -> List[Dict[str, Any]]:
     """Fetch data from Supabase with optional filtering by center name.
     
+    Results are kept in the shared read cache per (table, center, columns)
+    until a write to that center drops them, and pricing tables are served
+    from the local read replica when it was synced within ``max_staleness``
+    seconds (see read_query()).
+    
     Args:
         table_name: Name of the table to fetch data from
         center_name: Optional filter by center name
+        columns: Columns to fetch; defaults to the table's DEFAULT_COLUMNS projection
+        max_staleness: Oldest cached or replica data acceptable, in seconds; 0 reads the database
         
     Returns:
         List of records as dictionaries
     """
+    query = TableQuery(table_name, columns=tuple(columns) if columns else None).for_center(center_name)
+    return fetch_rows(query, max_staleness)
+
+
+@dataclass
+class FetchResult:
+    """Outcome of one query in a fetch_many() call."""
+    data: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# Worker threads for fetch_many; sized to the client pool so queries never wait on each other
+_fetch_executor: Optional[ThreadPoolExecutor] = None
+_fetch_executor_lock = threading.Lock()
+
+
+def _get_fetch_executor() -> ThreadPoolExecutor:
+    global _fetch_executor
+    if _fetch_executor is None:
+        with _fetch_executor_lock:
+            if _fetch_executor is None:
+                _fetch_executor = ThreadPoolExecutor(
+                    max_workers=get_client_pool().size, thread_name_prefix="supabase-fetch"
+                )
+    return _fetch_executor
+
+
+@instrumentation.traced("read")
+def fetch_many(queries: List[Union[TableQuery, Tuple[str, Optional[str]]]],
+               max_staleness: Optional[float] = None) -> Dict[Any, FetchResult]:
+    """Run several table reads concurrently.
+    
+    Wall time is that of the slowest query rather than the sum of all of
+    them. A failing query does not affect the others; its error is reported
+    on its own FetchResult instead of being shown with st.error, so callers
+    decide how to surface it.
+    
+    Args:
+        queries: TableQuery objects or (table_name, center_name) pairs;
+            center_name may be None
+        max_staleness: See read_query(); pass 0 for reads that must be
+            current, such as version checks
+        
+    Returns:
+        Dictionary mapping each query, as passed in, to a FetchResult
+    """
+    executor = _get_fetch_executor()
+    futures = {}
+    results = {}
+    for query in dict.fromkeys(queries):
+        table_query = query if isinstance(query, TableQuery) else TableQuery(query[0]).for_center(query[1])
+        # Cache and replica hits are answered inline; only misses use a worker and a connection
+        rows = _cache_read(table_query, max_staleness)
+        if rows is None:
+            rows = _replica_read(table_query, max_staleness)
+        if rows is not None:
+            results[query] = FetchResult(data=rows)
+        else:
+            futures[query] = executor.submit(contextvars.copy_context().run, _read_database, table_query)
+    for query, future in futures.items():
+        try:
+            results[query] = FetchResult(data=future.result())
+        except Exception as e:
+            results[query] = FetchResult(error=str(e))
+    return results
+
+
+DEFAULT_PAGE_SIZE = 1000
+# Smallest uuid: the tie-breaker for a keyset cursor that only carries a timestamp
+MIN_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+def _keyset_literal(value: Any) -> str:
+    # Quote cursor values so ':', '.' and ',' in timestamps survive PostgREST's or=() syntax
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def iter_table(query: Union[TableQuery, str], page_size: int = DEFAULT_PAGE_SIZE,
+               as_dataframe: bool = False, keyset: Tuple[str, str] = ("created_at", "id"),
+               after: Optional[Tuple[Any, Any]] = None) -> Iterator[Any]:
+    """Stream a table in keyset-ordered pages so memory stays bounded.
+    
+    Rows are read in (created_at, id) order, and each page asks for rows
+    strictly after the last one seen, so pages stay cheap however deep the
+    scan goes and no row is skipped or repeated. Paging continues until an
+    empty page comes back, so a server-side row cap smaller than page_size
+    only means more pages, never silently truncated results.
+    
+    Args:
+        query: TableQuery (or table name) giving the table, columns and filters;
+            its order and limit are replaced by the keyset ordering
+        page_size: Rows requested per round trip
+        as_dataframe: Yield one pandas DataFrame per page instead of single rows
+        keyset: Pair of (sort column, unique tie-breaker column); both are
+            added to the projection if missing. Rows with a NULL sort column
+            are not returned.
+        after: Optional (sort value, tie-breaker) cursor to resume after
+        
+    Yields:
+        Row dictionaries, or DataFrame chunks when as_dataframe is True
+    """
+    if isinstance(query, str):
+        query = TableQuery(query)
+    sort_col, tie_col = keyset
+    columns = query.projection.split(",")
+    if "*" not in columns:
+        columns += [col for col in keyset if col not in columns]
+    page_query = TableQuery(query.table, columns=tuple(columns), filters=query.filters)
+
+    cursor = after
+    while True:
+        def run_page(client: Client):
+            request = page_query.build(client).not_.is_(sort_col, "null")
+            if cursor is not None:
+                value, tie = (_keyset_literal(v) for v in cursor)
+                request = request.or_(f"{sort_col}.gt.{value},and({sort_col}.eq.{value},{tie_col}.gt.{tie})")
+            return request.order(sort_col).order(tie_col).limit(page_size).execute()
+
+        with instrumentation.span("iter_table", "read", page_query.table) as page_span:
+            rows = get_client_pool().run(run_page, retry=True).data
+            if rows:
+                _record_payload(page_query, rows)
+            page_span.rows = len(rows)
+        if not rows:
+            return
+        cursor = (rows[-1][sort_col], rows[-1][tie_col])
+        if as_dataframe:
+            yield pd.DataFrame(rows)
+        else:
+            yield from rows
+
+
+# --- Local read replica (see replica.py) ---
+
+# Default staleness bound for replica reads; override with
+# replica_max_staleness_seconds in .streamlit/secrets.toml (0 disables the replica)
+DEFAULT_REPLICA_STALENESS_SECONDS = 30.0
+# Syncs re-read this much before the watermark so rows committed late by
+# long transactions (whose updated_at is their start time) are not missed
+REPLICA_WATERMARK_OVERLAP_SECONDS = 5
+# Deletes by other processes leave no updated_at behind, so ids are re-listed on this interval
+REPLICA_DELETE_SCAN_SECONDS = 300
+
+_replica: Optional[ReadReplica] = None
+_replica_lock = threading.Lock()
+# One sync per table at a time; other readers wait for it rather than start their own
+_replica_sync_locks = {table: threading.Lock() for table in REPLICA_TABLES}
+_replica_threads: Dict[str, threading.Thread] = {}
+# Longest a read waits for another session's sync of the same table before reading the database
+REPLICA_SYNC_WAIT_SECONDS = 2.0
+
+
+def replica_staleness_bound() -> float:
+    """Configured staleness bound for replica reads, in seconds."""
+    return float(st.secrets.get("replica_max_staleness_seconds", DEFAULT_REPLICA_STALENESS_SECONDS))
+
+
+def get_read_replica() -> Optional[ReadReplica]:
+    """Return the process-wide read replica, or None when it is disabled."""
+    global _replica
+    if replica_staleness_bound() <= 0:
+        return None
+    if _replica is None:
+        with _replica_lock:
+            if _replica is None:
+                _replica = ReadReplica(st.secrets.get("replica_path", DEFAULT_REPLICA_PATH))
+    return _replica
+
+
+@instrumentation.traced("sync")
+def sync_replica_table(table_name: str, max_age: float = 0.0, detect_deletes: Optional[bool] = None,
+                       wait: Optional[float] = None) -> Optional[int]:
+    """Bring one replicated table up to date.
+    
+    The first sync copies the whole table in id order. Later syncs read only
+    rows whose ``updated_at`` is past the stored watermark, so an idle table
+    costs one small request. Deletes made elsewhere are found by re-listing
+    ids every REPLICA_DELETE_SCAN_SECONDS.
+    
+    Args:
+        table_name: One of REPLICA_TABLES
+        max_age: Skip the sync if the table was synced within this many
+            seconds, e.g. by another session while this one waited
+        detect_deletes: Force (True) or skip (False) the id re-listing;
+            None re-lists when it is due
+        wait: Give up after this many seconds if another sync of the table
+            is running; None waits for it
+        
+    Returns:
+        Number of rows copied or removed, or None if it gave up waiting
+    """
+    replica = get_read_replica()
+    lock = _replica_sync_locks[table_name]
+    if not lock.acquire(timeout=-1 if wait is None else wait):
+        return None
+    try:
+        if replica.age(table_name) <= max_age:
+            return 0
+        watermark, _, deletes_scanned_at = replica.sync_state(table_name)
+        started = time.time()
+        full = not deletes_scanned_at
+        if detect_deletes is None:
+            detect_deletes = started - deletes_scanned_at >= REPLICA_DELETE_SCAN_SECONDS
+        
+        changed = 0
+        if full:
+            # id order also copies rows whose updated_at is NULL
+            rows = iter_table(TableQuery(table_name, columns=("*",)), keyset=("id", "id"))
+        else:
+            # Listed before the incremental read, so a row written meanwhile is still picked up by it
+            if detect_deletes:
+                live_ids = {row["id"] for row in iter_table(TableQuery(table_name, columns=("id",)),
+                                                            keyset=("id", "id"))}
+                changed += replica.retain_ids(table_name, live_ids)
+            moved = datetime.fromisoformat(watermark[0]) - timedelta(seconds=REPLICA_WATERMARK_OVERLAP_SECONDS)
+            rows = iter_table(TableQuery(table_name, columns=("*",)), keyset=("updated_at", "id"),
+                              after=(moved.isoformat(), MIN_UUID))
+        batch: List[Dict[str, Any]] = []
+        seen = set()
+        newest = watermark
+        for row in rows:
+            batch.append(row)
+            seen.add(row["id"])
+            if row.get("updated_at") and (newest is None or (row["updated_at"], row["id"]) > newest):
+                newest = (row["updated_at"], row["id"])
+            if len(batch) >= DEFAULT_PAGE_SIZE:
+                changed += replica.apply_rows(table_name, batch)
+                batch = []
+        changed += replica.apply_rows(table_name, batch)
+        if full:
+            # Rows left over from an earlier copy that no longer exist
+            changed += replica.retain_ids(table_name, seen)
+        if newest is None:
+            # An empty table has no watermark; start from now next time
+            newest = (datetime.fromtimestamp(started).astimezone().isoformat(), MIN_UUID)
+        replica.mark_synced(table_name, newest, started, deletes_scanned=full or detect_deletes)
+        return changed
+    finally:
+        lock.release()
+
+
+def _sync_in_background(table_name: str) -> None:
+    """Start a full copy or id re-listing of a table without making a page wait for it."""
+    with _replica_lock:
+        thread = _replica_threads.get(table_name)
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=_background_sync, args=(table_name,),
+                                      name=f"replica-sync-{table_name}", daemon=True)
+            _replica_threads[table_name] = thread
+            thread.start()
+
+
+def _background_sync(table_name: str) -> None:
     try:
-        client = get_supabase_client()
-        query = client.table(table_name).select("*")
+        sync_replica_table(table_name)
+    except Exception:
+        # Reads keep going to the database; the next stale read tries again
+        pass
+
+
+def sync_read_replica(detect_deletes: Optional[bool] = None) -> Dict[str, int]:
+    """Sync every replicated table; returns rows changed per table."""
+    return {table: sync_replica_table(table, detect_deletes=detect_deletes) for table in REPLICA_TABLES}
+
+
+def _replica_read(query: TableQuery, max_staleness: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+    """Answer ``query`` from the replica, catching its table up first if it is too stale.
+    
+    Only the cheap incremental sync runs inline; the first full copy and the
+    periodic id re-listing run in the background. Returns None when the
+    replica is disabled, the table is not replicated or not copied yet, the
+    query cannot be evaluated locally or the sync failed; the caller then
+    reads the database as usual.
+    """
+    if query.table not in REPLICA_TABLES:
+        return None
+    bound = replica_staleness_bound() if max_staleness is None else max_staleness
+    if bound <= 0:
+        return None
+    rows = _replica_lookup(query, bound)
+    instrumentation.count_cache("replica", rows is not None)
+    return rows
+
+
+def _replica_lookup(query: TableQuery, bound: float) -> Optional[List[Dict[str, Any]]]:
+    try:
+        replica = get_read_replica()
+        if replica is None:
+            return None
+        _, synced_at, deletes_scanned_at = replica.sync_state(query.table)
+        if not deletes_scanned_at:
+            _sync_in_background(query.table)
+            return None
+        if time.time() - synced_at > bound:
+            if sync_replica_table(query.table, max_age=bound, detect_deletes=False,
+                                  wait=REPLICA_SYNC_WAIT_SECONDS) is None:
+                return None
+        if time.time() - deletes_scanned_at >= REPLICA_DELETE_SCAN_SECONDS:
+            _sync_in_background(query.table)
+        return replica.query(query)
+    except Exception:
+        return None
+
+
+def _replica_write_through(op: str, table_name: str, record_ids: List[str], response: Any) -> None:
+    """Apply a write the database accepted to the replica, so this process reads its own writes."""
+    if table_name not in REPLICA_TABLES or _replica is None:
+        return
+    try:
+        if op == "delete":
+            _replica.remove_ids(table_name, record_ids)
+            return
+        rows = getattr(response, "data", None) or []
+        _replica.apply_rows(table_name, rows)
+        # An update that matched fewer rows lost a version check: someone else changed them
+        if op in ("update", "bulk_update") and len(rows) < len(record_ids):
+            _replica.invalidate(table_name)
+    except Exception:
+        _replica.invalidate(table_name)
+
+
+# Tables returned together by the get_center_bundle RPC (sql/functions/get_center_bundle.sql)
+CENTER_BUNDLE_TABLES = ["kennel_suites", "daycamp_daily", "daycamp_packages"]
+
+# Set once PostgREST reports the RPC is missing, so callers stop paying for a failed call
+_center_bundle_missing = False
+
+
+def _fetch_center_bundle(center_name: str) -> Dict[str, Any]:
+    response = get_client_pool().run(
+        lambda client: client.rpc("get_center_bundle", {"p_center_name": center_name}).execute(),
+        retry=True,
+    )
+    bundle = response.data or {}
+    instrumentation.add_bytes(len(json.dumps(bundle, default=str)))
+    return bundle
+
+
+@instrumentation.traced("read", table="get_center_bundle")
+def fetch_center_bundle(center_name: str, max_staleness: Optional[float] = None) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """Fetch every pricing table for a center in a single round trip.
+    
+    Served from the shared read cache or the local read replica instead
+    when they are fresh enough (see read_query()). A bundle read from the
+    database fills the cache for the per-table reads of the other pages.
+    
+    Args:
+        center_name: Center to fetch pricing data for
+        max_staleness: Oldest cached or replica data acceptable, in seconds; 0 reads the database
         
-        if center_name:
-            query = query.eq("center_name", center_name)
+    Returns:
+        Dictionary mapping each table in CENTER_BUNDLE_TABLES to its records,
+        or None if the RPC failed (e.g. the function is not deployed yet)
+    """
+    global _center_bundle_missing
+    queries = {table: TableQuery(table).for_center(center_name) for table in CENTER_BUNDLE_TABLES}
+    local = {}
+    for table, query in queries.items():
+        rows = _cache_read(query, max_staleness)
+        local[table] = rows if rows is not None else _replica_read(query, max_staleness)
+    if all(rows is not None for rows in local.values()):
+        return local
+    if _center_bundle_missing:
+        return None
+    try:
+        generations, loaded_at = {table: _write_generation(table) for table in queries}, time.monotonic()
+        bundle = _single_flight(tuple(CENTER_BUNDLE_TABLES), ("get_center_bundle", center_name),
+                                lambda: _fetch_center_bundle(center_name))
+        result = {table: bundle.get(table) or [] for table in CENTER_BUNDLE_TABLES}
+        # The bundle has every default column, so it also answers the pages' per-table reads
+        for table, query in queries.items():
+            columns = DEFAULT_COLUMNS.get(table)
+            if columns:
+                _cache_store(query, [{column: row.get(column) for column in columns} for row in result[table]],
+                             generations[table], loaded_at)
+        return result
+    except APIError as e:
+        # PGRST202: function not found in the schema cache
+        if e.code == "PGRST202":
+            _center_bundle_missing = True
+        return None
+    except Exception:
+        return None
+
+
+@dataclass
+class UpdateResult:
+    """Outcome of a version-checked update.
+    
+    Attributes:
+        row: The record as stored after the update, or None
+        message: Human-readable outcome
+        conflict: The record changed or disappeared since it was read
+        queued: The update is waiting in the outbox; ``row`` is not set
+    """
+    row: Optional[Dict[str, Any]] = None
+    message: str = ""
+    conflict: bool = False
+    queued: bool = False
+    
+    @property
+    def ok(self) -> bool:
+        return self.row is not None or self.queued
+
+
+@instrumentation.traced("write")
+def update_record_if_unchanged(table_name: str, record_id: str, updated_data: Dict[str, Any],
+                               expected_updated_at: Optional[str]) -> UpdateResult:
+    """Update a record only if its ``updated_at`` still matches what the caller read.
+    
+    The check rides on the update itself (``... WHERE id = ? AND updated_at = ?``),
+    so it costs no extra round trip. The updated row comes back in the
+    response, letting callers patch their local copy instead of refetching.
+    
+    Args:
+        table_name: Name of the table to update
+        record_id: UUID of the record to update
+        updated_data: Dictionary of column values to change
+        expected_updated_at: ``updated_at`` value from when the record was
+            read; None skips the check
             
-        response = query.execute()
-        return response.data
+    Returns:
+        UpdateResult describing the outcome
+    """
+    payload = dict(updated_data)
+    if expected_updated_at is not None:
+        payload[VERSION_KEY] = expected_updated_at
+    try:
+        response = _write_via_outbox(
+            "update", table_name, [(record_id, payload)],
+            lambda client: _update_request(client, table_name, record_id, payload).execute()
+        )
     except Exception as e:
-        st.error(f"Error fetching data: {str(e)}")
-        return []
+        return UpdateResult(message=f"Error: {str(e)}")
+    
+    if response is None:
+        return UpdateResult(message=QUEUED_MESSAGE, queued=True)
+    if not response.data:
+        return UpdateResult(message="This record was changed or deleted by someone else.", conflict=True)
+    return UpdateResult(row=response.data[0], message="Record updated successfully!")
+
+
+@dataclass
+class BulkWriteResult:
+    """Outcome of a multi-row write.
+    
+    Attributes:
+        success: Every row was written (or queued); the write is a single
+            statement, so otherwise no row was written
+        message: Human-readable outcome
+        rows: The records as stored after the write; empty when queued or failed
+        queued: The rows are waiting in the outbox
+        conflicts: Ids that failed the version check because they changed or
+            disappeared since they were read; nothing was written
+    """
+    success: bool
+    message: str
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    queued: bool = False
+    conflicts: List[str] = field(default_factory=list)
+
+
+@instrumentation.traced("write")
+def update_many_records(table_name: str, changes_by_id: Dict[str, Dict[str, Any]],
+                        versions: Optional[Dict[str, Optional[str]]] = None) -> BulkWriteResult:
+    """Write per-record column changes in one request and one statement.
+    
+    The bulk_update_records RPC applies every record's changes in a single
+    version-checked ``UPDATE``, so either all records are saved or, if any
+    of them changed since it was read, none are. Only the changed columns
+    travel over the wire.
+    
+    Args:
+        table_name: Name of the table to update
+        changes_by_id: Mapping of record id to the columns to change
+        versions: Optional mapping of record id to the ``updated_at`` value it
+            was read with; a record without one is not version-checked
+            
+    Returns:
+        BulkWriteResult describing the outcome
+    """
+    if not changes_by_id:
+        return BulkWriteResult(True, "Nothing to save.")
+    versions = versions or {}
+    payloads = [{"id": record_id, "updated_at": versions.get(record_id), "changes": changes}
+                for record_id, changes in changes_by_id.items()]
+    try:
+        response = _write_via_outbox(
+            "bulk_update", table_name, [(payload["id"], payload) for payload in payloads],
+            lambda client: _bulk_update_request(client, table_name, payloads)
+        )
+    except WriteConflict as e:
+        return BulkWriteResult(False, f"{len(e.record_ids)} records changed elsewhere, so nothing was saved.",
+                               conflicts=e.record_ids)
+    except Exception as e:
+        return BulkWriteResult(False, f"Error: {str(e)}")
+    
+    if response is None:
+        return BulkWriteResult(True, QUEUED_MESSAGE, queued=True)
+    return BulkWriteResult(True, f"{len(response.data)} records updated successfully!", rows=response.data)
 
 
+@instrumentation.traced("delete")
 def delete_from_supabase(table_name: str, id_value: str) -> Tuple[bool, str]:
     """Delete a record from Supabase table by ID.
     
@@ -69,9 +1304,13 @@ def delete_from_supabase(table_name: str, id_value: str) -> Tuple[bool, str]:
         Tuple of (success, message)
     """
     try:
-        client = get_supabase_client()
-        response = client.table(table_name).delete().eq("id", id_value).execute()
+        response = _write_via_outbox(
+            "delete", table_name, [(id_value, None)],
+            lambda client: client.table(table_name).delete().eq("id", id_value).execute()
+        )
         
+        if response is None:
+            return True, QUEUED_MESSAGE
         if response.data:
             return True, "Record deleted successfully!"
         else:
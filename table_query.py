@@ -0,0 +1,91 @@
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional, Tuple
+
+# Columns each page actually renders, plus updated_at, which edits use as a
+# version check. Queries without an explicit column list fetch these instead
+# of select("*"); tables not listed here fall back to "*".
+DEFAULT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "centers": ("ctr_name", "district_manager", "full_address", "active"),
+    "kennel_suites": ("id", "suite_name", "dog_sizes", "price_per_night",
+                      "price_additional_dog", "num_kennels", "features", "updated_at"),
+    "daycamp_daily": ("id", "dropin", "halfday", "weekend", "updated_at"),
+    "daycamp_packages": ("id", "days", "price", "expiration", "updated_at"),
+}
+
+# Column that scopes each table to a single center
+CENTER_COLUMNS: Dict[str, str] = {"centers": "ctr_name"}
+
+# Filter operators supported by PostgREST and the postgrest-py request builder
+OPERATORS = ("eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "is", "in")
+
+
+@dataclass(frozen=True)
+class TableQuery:
+    """Immutable description of a read against one table.
+
+    Builder methods return a new query, so a query can be shared and used as
+    a dictionary key. Example::
+
+        TableQuery("kennel_suites").for_center("Austin").order_by("price_per_night").limit_to(20)
+
+    Attributes:
+        table: Table to read from
+        columns: Columns to select; None uses DEFAULT_COLUMNS for the table
+        filters: Tuple of (column, operator, value) conditions, all of which must match
+        order: Tuple of (column, descending) sort keys
+        limit: Maximum number of rows to return
+    """
+    table: str
+    columns: Optional[Tuple[str, ...]] = None
+    filters: Tuple[Tuple[str, str, Any], ...] = ()
+    order: Tuple[Tuple[str, bool], ...] = ()
+    limit: Optional[int] = None
+
+    def select(self, *columns: str) -> "TableQuery":
+        """Return a query that selects only ``columns`` ("*" selects everything)."""
+        return replace(self, columns=tuple(columns))
+
+    def where(self, column: str, operator: str, value: Any) -> "TableQuery":
+        """Return a query with an additional ``column <operator> value`` filter."""
+        if operator not in OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {operator}")
+        if operator == "in":
+            value = tuple(value)
+        return replace(self, filters=self.filters + ((column, operator, value),))
+
+    def eq(self, column: str, value: Any) -> "TableQuery":
+        return self.where(column, "eq", value)
+
+    def for_center(self, center_name: Optional[str]) -> "TableQuery":
+        """Return a query scoped to one center; a falsy name leaves it unscoped."""
+        if not center_name:
+            return self
+        return self.eq(CENTER_COLUMNS.get(self.table, "center_name"), center_name)
+
+    def order_by(self, column: str, desc: bool = False) -> "TableQuery":
+        return replace(self, order=self.order + ((column, desc),))
+
+    def limit_to(self, limit: int) -> "TableQuery":
+        return replace(self, limit=limit)
+
+    @property
+    def projection(self) -> str:
+        """Comma-separated select list sent to PostgREST."""
+        columns = self.columns if self.columns is not None else DEFAULT_COLUMNS.get(self.table, ("*",))
+        return ",".join(columns) or "*"
+
+    def build(self, client):
+        """Translate the query into a postgrest-py request builder on ``client``."""
+        request = client.table(self.table).select(self.projection)
+        for column, operator, value in self.filters:
+            if operator == "in":
+                request = request.in_(column, list(value))
+            elif operator == "is":
+                request = request.is_(column, value)
+            else:
+                request = getattr(request, operator)(column, value)
+        for column, desc in self.order:
+            request = request.order(column, desc=desc)
+        if self.limit is not None:
+            request = request.limit(self.limit)
+        return request
@@ -0,0 +1,73 @@
+import pytest
+import streamlit as st
+
+import supabase_config
+from benchmarks.fake_postgrest import FakePostgrest
+from outbox import PENDING, SENDING, FAILED
+from supabase_config import SupabaseClientPool, update_many_records
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    """Fake PostgREST server with the app's pool and outbox pointed at it."""
+    server = FakePostgrest().seed(centers=2, suites_per_center=4)
+    url = server.start()
+    monkeypatch.setattr(st, "secrets", {"outbox_path": str(tmp_path / "outbox.sqlite3")})
+    monkeypatch.setattr(supabase_config, "_outbox", None)
+    monkeypatch.setattr(supabase_config, "_replayer", None)
+    monkeypatch.setattr(supabase_config, "_kick_replayer", lambda: None)
+    monkeypatch.setattr(supabase_config, "_pool", SupabaseClientPool(url, "x" * 40, size=2))
+    yield server
+    server.stop()
+
+
+def _suites(server, center="Center 001"):
+    return {row["id"]: row for row in server.tables["kennel_suites"] if row["center_name"] == center}
+
+
+def test_distinct_changes_are_saved_in_one_request(backend):
+    suites = _suites(backend)
+    changes = {record_id: {"price_per_night": 100.0 + i} for i, record_id in enumerate(suites)}
+    versions = {record_id: row["updated_at"] for record_id, row in suites.items()}
+    since = backend.request_count()
+
+    result = update_many_records("kennel_suites", changes, versions)
+
+    assert result.success and not result.conflicts
+    assert backend.stats(since)["by_route"] == {"POST rpc/bulk_update_records": 1}
+    assert {row["id"]: row["price_per_night"] for row in result.rows} == \
+        {record_id: change["price_per_night"] for record_id, change in changes.items()}
+    # Only the changed column moves; center fields stay with each record
+    assert all(row["center_name"] == "Center 001" for row in result.rows)
+
+
+def test_one_stale_record_saves_nothing(backend):
+    suites = _suites(backend)
+    stale, *fresh = suites
+    changes = {record_id: {"num_kennels": 99} for record_id in suites}
+    versions = {record_id: row["updated_at"] for record_id, row in suites.items()}
+    versions[stale] = "2000-01-01T00:00:00+00:00"
+
+    result = update_many_records("kennel_suites", changes, versions)
+
+    assert not result.success
+    assert result.conflicts == [stale]
+    assert result.rows == []
+    assert all(row["num_kennels"] != 99 for row in _suites(backend).values())
+    # The conflict was reported to the caller; nothing is parked for replay
+    assert supabase_config.get_outbox().counts() == {PENDING: 0, SENDING: 0, FAILED: 0}
+
+
+def test_queued_bulk_updates_replay_in_one_request(backend):
+    suites = _suites(backend)
+    outbox = supabase_config.get_outbox()
+    for record_id, row in suites.items():
+        outbox.append("bulk_update", "kennel_suites", record_id,
+                      {"id": record_id, "updated_at": row["updated_at"], "changes": {"features": ["Webcam"]}})
+    since = backend.request_count()
+
+    assert supabase_config.replay_outbox() == len(suites)
+
+    assert backend.stats(since)["by_route"] == {"POST rpc/bulk_update_records": 1}
+    assert all(row["features"] == ["Webcam"] for row in _suites(backend).values())
+    assert outbox.counts() == {PENDING: 0, SENDING: 0, FAILED: 0}
@@ -0,0 +1,24 @@
+import threading
+
+import supabase_config
+from supabase_config import SupabaseClientPool, get_supabase_client
+
+
+def test_get_supabase_client_keeps_the_client_checked_out(monkeypatch):
+    pool = SupabaseClientPool("http://127.0.0.1:9", "x" * 40, size=1)
+    monkeypatch.setattr(supabase_config, "_pool", pool)
+    acquired = threading.Event()
+
+    def other_caller():
+        pool.release(pool.acquire())
+        acquired.set()
+
+    with get_supabase_client() as client:
+        assert pool.stats()["idle"] == 0
+        waiter = threading.Thread(target=other_caller, daemon=True)
+        waiter.start()
+        # The only client is in use, so the pool's size bound makes the other caller wait
+        assert not acquired.wait(0.2)
+    assert acquired.wait(2)
+    assert pool.stats()["idle"] == 1
+    assert pool.acquire() is client
@@ -0,0 +1,64 @@
+import pandas as pd
+
+import import_centers
+from import_centers import prepare_center_records, _row_hash
+
+
+def _sheet(**columns):
+    return pd.DataFrame(columns)
+
+
+def test_columns_are_mapped_and_blanks_become_empty_strings():
+    sheet = _sheet(**{"ctr_cd": ["A1"], "ctr name": ["Austin"], "district manager": ["Dana"],
+                      "state": [None], "not mapped": ["x"]})
+    records, skipped = prepare_center_records(sheet)
+    assert skipped == 0
+    assert records == [{"ctr_cd": "A1", "ctr_name": "Austin", "district_manager": "Dana",
+                        "state": "", "active": True}]
+
+
+def test_boolean_columns_follow_the_row_by_row_rules():
+    sheet = _sheet(**{"ctr name": ["A", "B", "C", "D", "E"], "district manager": ["Dana"] * 5,
+                      "is_open": ["Yes", " t ", "no", "2", None],
+                      "is_acquisition": [1, 0, None, 3, 0]})
+    records, _ = prepare_center_records(sheet)
+    assert [record["is_open"] for record in records] == [True, True, False, True, False]
+    assert [record["is_acquisition"] for record in records] == [True, False, False, True, False]
+    assert all(type(record["is_open"]) is bool for record in records)
+
+
+def test_rows_without_a_name_or_manager_are_skipped():
+    sheet = _sheet(**{"ctr name": ["Austin", " ", "Dallas", None],
+                      "district manager": ["Dana", "Dana", None, "Dana"]})
+    records, skipped = prepare_center_records(sheet)
+    assert skipped == 3
+    assert [record["ctr_name"] for record in records] == ["Austin"]
+
+
+def test_row_hash_ignores_representation_differences():
+    columns = ["ctr_cd", "ctr_name", "is_open", "state", "zipcode"]
+    from_excel = {"ctr_cd": "A1", "ctr_name": "Austin ", "is_open": True, "state": "", "zipcode": 78701}
+    from_database = {"ctr_cd": "A1", "ctr_name": "Austin", "is_open": True, "state": None,
+                     "zipcode": "78701", "active": True}
+    assert _row_hash(from_excel, columns) == _row_hash(from_database, columns)
+    assert _row_hash(from_excel, columns) != _row_hash({**from_database, "is_open": False}, columns)
+    assert _row_hash(from_excel, columns) != _row_hash({**from_database, "state": "TX"}, columns)
+
+
+def test_sync_dry_run_plans_only_what_changed(monkeypatch):
+    stored = [
+        {"ctr_cd": "A1", "ctr_name": "Austin", "district_manager": "Dana", "active": True},
+        {"ctr_cd": "B2", "ctr_name": "Boston", "district_manager": "Dana", "active": True},
+        {"ctr_cd": "C3", "ctr_name": "Chicago", "district_manager": "Lee", "active": True},
+        {"ctr_cd": "D4", "ctr_name": "Denver", "district_manager": "Lee", "active": False},
+    ]
+    monkeypatch.setattr(import_centers, "_fetch_existing_centers", lambda columns: stored)
+    records = [
+        {"ctr_cd": "A1", "ctr_name": "Austin", "district_manager": "Dana", "active": True},
+        {"ctr_cd": " B2 ", "ctr_name": "Boston", "district_manager": "Sam", "active": True},
+        {"ctr_cd": "E5", "ctr_name": "El Paso", "district_manager": "Sam", "active": True},
+        {"ctr_cd": "", "ctr_name": "Nowhere", "district_manager": "Sam", "active": True},
+    ]
+    summary = import_centers.sync_centers(records, dry_run=True)
+    assert summary == {"inserts": 1, "updates": 1, "deactivations": 1, "unchanged": 1,
+                       "skipped": 1, "errors": 0}
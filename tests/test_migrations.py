@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from migrations import (Migration, MigrationError, DEFAULT_MIGRATIONS_DIR, discover_migrations,
+                        migration_checksum, split_sql_statements)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_split_on_top_level_semicolons():
+    assert split_sql_statements("SELECT 1; SELECT 2;\n\nSELECT 3") == ["SELECT 1", "SELECT 2", "SELECT 3"]
+
+
+@pytest.mark.parametrize("statement", [
+    "SELECT 'a;b', 'it''s;'",
+    "SELECT E'back\\\\slash\\'; still'",
+    'SELECT 1 AS "odd;""name"',
+    "CREATE FUNCTION f() RETURNS void AS $$ BEGIN PERFORM 1; END; $$ LANGUAGE plpgsql",
+    "CREATE FUNCTION g() RETURNS text AS $fn$ SELECT '$$;' $fn$ LANGUAGE sql",
+    "SELECT 1 /* outer ; /* nested ; */ still comment ; */",
+    "PREPARE q AS SELECT $1::int",
+])
+def test_semicolons_inside_literals_and_comments_do_not_split(statement):
+    assert split_sql_statements(statement + ";\nSELECT 2;") == [statement, "SELECT 2"]
+
+
+def test_comment_only_fragments_are_dropped():
+    sql = "-- header; with a semicolon\nSELECT 1;\n/* trailing; */\n-- done;\n"
+    assert split_sql_statements(sql) == ["-- header; with a semicolon\nSELECT 1"]
+
+
+@pytest.mark.parametrize("sql", ["SELECT 'open", 'SELECT "open', "SELECT $$ open", "SELECT 1 /* open"])
+def test_unterminated_input_is_an_error(sql):
+    with pytest.raises(MigrationError):
+        split_sql_statements(sql)
+
+
+def test_checksum_ignores_line_endings_only():
+    assert migration_checksum("SELECT 1;\r\nSELECT 2;\r\n") == migration_checksum("SELECT 1;\nSELECT 2;\n")
+    assert migration_checksum("SELECT 1;") != migration_checksum("SELECT 2;")
+
+
+def test_non_transactional_statements_are_refused(tmp_path):
+    path = tmp_path / "2025_01_01_concurrent.sql"
+    path.write_text("CREATE INDEX CONCURRENTLY x_idx ON x (a);")
+    with pytest.raises(MigrationError, match="cannot run inside a transaction"):
+        Migration.from_file(str(path))
+
+
+def test_discover_runs_files_in_date_order(tmp_path):
+    for name in ("2025_06_15_b.sql", "2025_05_01_a.sql", "notes.txt"):
+        (tmp_path / name).write_text("SELECT 1;")
+    assert [m.name for m in discover_migrations(str(tmp_path))] == ["2025_05_01_a.sql", "2025_06_15_b.sql"]
+
+
+def test_discover_refuses_files_without_a_date_prefix(tmp_path):
+    (tmp_path / "add_things.sql").write_text("SELECT 1;")
+    with pytest.raises(MigrationError, match="add_things.sql"):
+        discover_migrations(str(tmp_path))
+
+
+def test_repository_migrations_create_columns_before_indexing_them():
+    names = [m.name for m in discover_migrations(os.path.join(ROOT, DEFAULT_MIGRATIONS_DIR))]
+    adds_dog_sizes = next(i for i, name in enumerate(names) if name.endswith("update_kennel_suites_table.sql"))
+    indexes_dog_sizes = next(i for i, name in enumerate(names) if name.endswith("add_pricing_indexes.sql"))
+    assert adds_dog_sizes < indexes_dog_sizes
@@ -0,0 +1,129 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+import streamlit as st
+
+import supabase_config
+from outbox import Outbox, PENDING, SENDING, FAILED
+
+
+class _FakePool:
+    """Stands in for SupabaseClientPool; operations receive no client."""
+
+    def run(self, operation, retry=False):
+        return operation(None)
+
+
+@pytest.fixture
+def app_outbox(tmp_path, monkeypatch):
+    """Point supabase_config at a scratch outbox and record what it sends."""
+    path = str(tmp_path / "outbox.sqlite3")
+    sent = []
+
+    def send_entries(client, op, table_name, entries):
+        sent.append((op, table_name, [entry.record_id for entry in entries]))
+        return SimpleNamespace(data=[])
+
+    monkeypatch.setattr(st, "secrets", {"outbox_path": path})
+    monkeypatch.setattr(supabase_config, "_outbox", None)
+    monkeypatch.setattr(supabase_config, "_replayer", None)
+    monkeypatch.setattr(supabase_config, "_pool", _FakePool())
+    monkeypatch.setattr(supabase_config, "_send_entries", send_entries)
+    monkeypatch.setattr(supabase_config, "_write_applied", lambda *args: None)
+    return SimpleNamespace(path=path, sent=sent)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_replay_resumes_after_restart(app_outbox):
+    # Writes left behind by a previous process, one of them mid-send
+    previous = Outbox(app_outbox.path)
+    previous.append("insert", "kennel_suites", "a", {"id": "a"})
+    previous.append("insert", "kennel_suites", "b", {"id": "b"}, claim=True)
+    previous.append("delete", "kennel_suites", "c")
+    assert previous.counts()[SENDING] == 1
+
+    opened = threading.Thread(target=supabase_config.get_outbox, daemon=True)
+    opened.start()
+    opened.join(timeout=3)
+    assert not opened.is_alive(), "get_outbox() deadlocked while resuming the replay"
+
+    outbox = supabase_config.get_outbox()
+    assert _wait_for(lambda: outbox.counts() == {PENDING: 0, SENDING: 0, FAILED: 0})
+    assert app_outbox.sent == [("insert", "kennel_suites", ["a", "b"]), ("delete", "kennel_suites", ["c"])]
+
+
+def test_failed_group_is_resent_entry_by_entry_without_releasing_it(app_outbox, monkeypatch):
+    outbox = supabase_config.get_outbox()
+    for record_id in ("a", "b", "c"):
+        outbox.append("insert", "kennel_suites", record_id, {"id": record_id})
+    outbox.append("delete", "daycamp_daily", "d")
+    stolen = []
+
+    def send_entries(client, op, table_name, entries):
+        if len(entries) > 1 and op == "insert":
+            raise ValueError("bad row in batch")
+        # A concurrent replayer must not be able to claim what is being resent
+        stolen.extend(outbox.claim_batch(10))
+        if entries[0].record_id == "b":
+            raise ValueError("bad row")
+        app_outbox.sent.append((op, table_name, [entry.record_id for entry in entries]))
+        return SimpleNamespace(data=[])
+
+    monkeypatch.setattr(supabase_config, "_send_entries", send_entries)
+    assert supabase_config.replay_outbox() == 3
+    # The later delete went back to the queue; everything else was either sent or parked
+    assert [entry.record_id for entry in stolen] == ["d"]
+    assert app_outbox.sent == [("insert", "kennel_suites", ["a"]), ("insert", "kennel_suites", ["c"])]
+    assert [(entry.record_id, entry.last_error) for entry in outbox.failed_entries()] == [("b", "bad row")]
+
+
+def test_claim_waits_for_older_writes_to_the_same_record(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.sqlite3"))
+    first, _ = outbox.append("update", "kennel_suites", "a", {"price": 1})
+    second, claimed = outbox.append("update", "kennel_suites", "a", {"price": 2}, claim=True)
+    other, other_claimed = outbox.append("update", "kennel_suites", "b", {"price": 3}, claim=True)
+    assert not claimed and other_claimed
+
+    # Only the oldest write per record is sendable, in sequence order
+    assert [entry.seq for entry in outbox.claim_batch(10)] == [first]
+    outbox.mark_done([first])
+    assert [entry.seq for entry in outbox.claim_batch(10)] == [second]
+
+
+def test_release_requeues_and_reopening_resets_interrupted_sends(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    outbox = Outbox(path)
+    seq, _ = outbox.append("insert", "kennel_suites", "a", {"id": "a"}, claim=True)
+    assert outbox.claim_batch(10) == []
+    outbox.release([seq], "timed out")
+    entry, = outbox.claim_batch(10)
+    assert (entry.seq, entry.attempts, entry.last_error) == (seq, 1, "timed out")
+
+    # A process that stops mid-send leaves the entry "sending"; the next one retries it
+    assert Outbox(path).counts() == {PENDING: 1, SENDING: 0, FAILED: 0}
+
+
+def test_failed_entries_do_not_block_later_writes_and_can_be_discarded(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.sqlite3"))
+    old, _ = outbox.append("insert", "kennel_suites", "a", {"id": "a"}, claim=True)
+    outbox.mark_failed([old], "rejected")
+    later, claimed = outbox.append("update", "kennel_suites", "a", {"price": 2}, claim=True)
+    assert claimed
+    recent, _ = outbox.append("insert", "kennel_suites", "b", {"id": "b"}, claim=True)
+    outbox.mark_failed([later, recent], "rejected")
+
+    assert outbox.discard_failed(older_than=outbox.failed_entries()[0].created_at) == 0
+    assert outbox.discard_failed([old]) == 1
+    assert [entry.seq for entry in outbox.failed_entries()] == [later, recent]
+    assert outbox.discard_failed(older_than=time.time() + 1) == 2
+    assert outbox.counts()[FAILED] == 0
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import pricing_analytics
+from pricing_analytics import PricingCube, SortedValues, PERCENTILES
+
+
+def test_values_stay_sorted_as_they_change():
+    values = SortedValues([50.0, 20.0, 80.0])
+    values.add(35.0)
+    values.add(90.0)
+    values.remove(20.0)
+    assert values.values.tolist() == [35.0, 50.0, 80.0, 90.0]
+    assert values.total == 255.0
+    assert len(values) == 4
+
+
+def test_removing_a_missing_value_changes_nothing():
+    values = SortedValues([10.0, 30.0])
+    values.remove(20.0)
+    values.remove(99.0)
+    assert values.values.tolist() == [10.0, 30.0]
+    assert values.total == 40.0
+
+
+def test_duplicates_are_removed_one_at_a_time():
+    values = SortedValues([40.0, 40.0, 60.0])
+    values.remove(40.0)
+    assert values.values.tolist() == [40.0, 60.0]
+
+
+@pytest.mark.parametrize("q", [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0])
+def test_quantile_matches_numpy(q):
+    data = [42.0, 15.5, 99.0, 63.25, 15.5, 71.0, 8.0]
+    assert SortedValues(data).quantile(q) == pytest.approx(np.percentile(data, q * 100))
+
+
+def test_describe_summarizes_the_group():
+    data = [30.0, 10.0, 20.0, 40.0]
+    summary = SortedValues(data).describe()
+    assert summary["count"] == 4
+    assert (summary["min"], summary["max"], summary["mean"]) == (10.0, 40.0, 25.0)
+    assert summary["median"] == pytest.approx(np.median(data))
+    assert len(summary) == 4 + len(PERCENTILES)
+
+
+def test_single_value_group():
+    values = SortedValues()
+    values.add(55.0)
+    assert values.describe()["median"] == 55.0
+    assert values.quantile(0.9) == 55.0
+
+
+def test_load_builds_groups_across_pages(monkeypatch):
+    stamp = "2025-01-01T00:00:00+00:00"
+    tables = {
+        "centers": [{"id": "c1", "ctr_name": "A", "district_manager": "DM1", "state": "TX",
+                     "nelson_dma": None, "updated_at": stamp}],
+        "kennel_suites": [{"id": f"k{i}", "center_name": "A", "price_per_night": float(i),
+                           "price_additional_dog": None, "updated_at": stamp} for i in range(7)],
+    }
+
+    def fake_iter_table(query, as_dataframe, keyset, after):
+        rows = tables.get(query.table, [])
+        for start in range(0, len(rows), 3):
+            yield pd.DataFrame(rows[start:start + 3], columns=list(query.columns))
+
+    monkeypatch.setattr(pricing_analytics, "iter_table", fake_iter_table)
+    cube = PricingCube().load()
+    assert cube.row_count() == 7
+    assert cube.groups[("Suite price / night", "state", "TX")].values.tolist() == [0, 1, 2, 3, 4, 5, 6]
+    assert cube.watermarks["kennel_suites"] == (stamp, "k6")
@@ -0,0 +1,66 @@
+import numpy as np
+
+from pricing_grid import records_to_frame, grid_changes, invalid_changes
+
+SUITES = [
+    {"id": "a1", "suite_name": "Deluxe", "dog_sizes": ["small", "medium"], "price_per_night": 80.0,
+     "price_additional_dog": 20.0, "num_kennels": 4, "features": ["TV", "Webcam"]},
+    {"id": "b2", "suite_name": "Standard", "dog_sizes": [], "price_per_night": 50.0,
+     "price_additional_dog": None, "num_kennels": None, "features": None},
+]
+
+
+def _frames():
+    snapshot = records_to_frame("kennel_suites", SUITES)
+    return snapshot, snapshot.copy()
+
+
+def test_untouched_grid_has_no_changes():
+    snapshot, edited = _frames()
+    assert grid_changes("kennel_suites", snapshot, edited) == {}
+
+
+def test_only_changed_cells_are_reported():
+    snapshot, edited = _frames()
+    edited.at["a1", "price_per_night"] = 85.0
+    edited.at["b2", "price_additional_dog"] = 10.0
+    changes = grid_changes("kennel_suites", snapshot, edited)
+    assert changes == {"a1": {"price_per_night": 85.0}, "b2": {"price_additional_dog": 10.0}}
+    assert not isinstance(changes["a1"]["price_per_night"], np.generic)
+
+
+def test_list_columns_are_split_and_reformatting_is_not_a_change():
+    snapshot, edited = _frames()
+    edited.at["a1", "dog_sizes"] = "small,medium"
+    edited.at["a1", "features"] = "TV; Webcam; Pool"
+    edited.at["b2", "dog_sizes"] = "large"
+    assert grid_changes("kennel_suites", snapshot, edited) == {
+        "a1": {"features": ["TV", "Webcam", "Pool"]},
+        "b2": {"dog_sizes": ["large"]},
+    }
+
+
+def test_clearing_a_cell_stores_null_or_an_empty_list():
+    snapshot, edited = _frames()
+    edited.at["a1", "num_kennels"] = None
+    edited.at["a1", "features"] = None
+    assert grid_changes("kennel_suites", snapshot, edited) == {"a1": {"num_kennels": None, "features": []}}
+
+
+def test_empty_snapshot_has_no_changes():
+    snapshot = records_to_frame("daycamp_packages", [])
+    assert grid_changes("daycamp_packages", snapshot, snapshot.copy()) == {}
+
+
+def test_dog_sizes_must_be_ones_the_forms_offer():
+    snapshot, edited = _frames()
+    edited.at["a1", "dog_sizes"] = "small, huge"
+    edited.at["b2", "dog_sizes"] = "Medium,extra big"
+    edited.at["b2", "features"] = "Anything; goes"
+    problems = invalid_changes(grid_changes("kennel_suites", snapshot, edited))
+    assert len(problems) == 2
+    assert "'huge'" in problems[0] and "'Medium'" in problems[1]
+
+    edited.at["a1", "dog_sizes"] = "small, big"
+    edited.at["b2", "dog_sizes"] = "extra big"
+    assert invalid_changes(grid_changes("kennel_suites", snapshot, edited)) == []
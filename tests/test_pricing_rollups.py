@@ -0,0 +1,30 @@
+import pricing_rollups
+from pricing_rollups import rollup_summary
+
+
+def test_rollup_summary_matches_the_cube_summary_columns(monkeypatch):
+    reads = []
+
+    def read_query(query, max_staleness=None):
+        reads.append((query, max_staleness))
+        return [{"state": "TX", "metric": "Package price", "center_count": 3, "price_count": 7,
+                 "min_price": 90.0, "p25_price": 100.0, "median_price": 120.0, "p75_price": 140.0,
+                 "p90_price": 150.0, "max_price": 160.0, "mean_price": 121.5}]
+
+    monkeypatch.setattr(pricing_rollups, "read_query", read_query)
+    summary = rollup_summary("Package price", "state", max_staleness=0)
+
+    assert list(summary.columns) == ["State", "count", "min", "p25", "median", "p75", "p90", "max", "mean"]
+    assert summary.iloc[0].to_dict() == {"State": "TX", "count": 7, "min": 90.0, "p25": 100.0, "median": 120.0,
+                                         "p75": 140.0, "p90": 150.0, "max": 160.0, "mean": 121.5}
+    query, max_staleness = reads[0]
+    assert query.table == "pricing_rollup_by_state"
+    assert ("metric", "eq", "Package price") in query.filters
+    assert max_staleness == 0
+
+
+def test_empty_rollup_is_an_empty_summary(monkeypatch):
+    monkeypatch.setattr(pricing_rollups, "read_query", lambda query, max_staleness=None: [])
+    summary = rollup_summary("Package price", "nelson_dma")
+    assert summary.empty
+    assert list(summary.columns)[0] == "Nielsen DMA"
@@ -0,0 +1,65 @@
+import json
+
+from read_cache import ReadCache
+
+
+def _rows(center, *ids):
+    return [{"id": record_id, "center_name": center, "suite_name": f"Suite {record_id}"} for record_id in ids]
+
+
+def test_least_recently_used_entry_is_evicted():
+    rows = _rows("Austin", 1)
+    # Room for two entries of this size, not three
+    cache = ReadCache(max_bytes=len(json.dumps(rows)) * 2 + 10)
+    cache.put(("kennel_suites", "Austin", "*"), rows)
+    cache.put(("kennel_suites", "Boston", "*"), _rows("Boston", 2))
+    # Touching Austin makes Boston the least recently used entry
+    assert cache.get(("kennel_suites", "Austin", "*"), max_age=60) is not None
+    cache.put(("kennel_suites", "Dallas", "*"), _rows("Dallas", 3))
+
+    assert cache.get(("kennel_suites", "Boston", "*"), max_age=60) is None
+    assert cache.get(("kennel_suites", "Austin", "*"), max_age=60) == rows
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_oversized_result_is_not_cached():
+    cache = ReadCache(max_bytes=10)
+    assert cache.put(("kennel_suites", "Austin", "*"), _rows("Austin", 1)) is False
+    assert cache.stats()["entries"] == 0
+
+
+def test_expired_entry_is_a_miss():
+    cache = ReadCache()
+    cache.put(("kennel_suites", "Austin", "*"), _rows("Austin", 1), loaded_at=0.0)
+    assert cache.get(("kennel_suites", "Austin", "*"), max_age=60) is None
+
+
+def test_rows_are_copied_in_and_out():
+    cache = ReadCache()
+    rows = _rows("Austin", 1)
+    cache.put(("kennel_suites", "Austin", "*"), rows)
+    rows[0]["suite_name"] = "Changed"
+    cached = cache.get(("kennel_suites", "Austin", "*"), max_age=60)
+    cached[0]["suite_name"] = "Also changed"
+    assert cache.get(("kennel_suites", "Austin", "*"), max_age=60)[0]["suite_name"] == "Suite 1"
+
+
+def test_invalidate_drops_written_centers_moved_rows_and_whole_table_reads():
+    cache = ReadCache()
+    cache.put(("kennel_suites", "Austin", "*"), _rows("Austin", 1))
+    cache.put(("kennel_suites", "Boston", "*"), _rows("Boston", 2))
+    cache.put(("kennel_suites", "Dallas", "*"), _rows("Dallas", 3))
+    cache.put(("kennel_suites", None, "*"), _rows("Austin", 1) + _rows("Boston", 2))
+    cache.put(("packages", "Austin", "*"), _rows("Austin", 4))
+
+    # Row 2 moved from Boston to Austin
+    dropped = cache.invalidate("kennel_suites", centers=["Austin"], ids=[2])
+
+    assert dropped == 3
+    assert cache.get(("kennel_suites", "Austin", "*"), max_age=60) is None
+    assert cache.get(("kennel_suites", "Boston", "*"), max_age=60) is None
+    assert cache.get(("kennel_suites", None, "*"), max_age=60) is None
+    assert cache.get(("kennel_suites", "Dallas", "*"), max_age=60) is not None
+    assert cache.get(("packages", "Austin", "*"), max_age=60) is not None
+    assert cache.stats()["invalidations"] == 3
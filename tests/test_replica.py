@@ -0,0 +1,64 @@
+import pytest
+
+from replica import ReadReplica
+from table_query import TableQuery
+
+SUITES = [
+    {"id": 1, "center_name": "Austin", "suite_name": "Deluxe", "price_per_night": 80,
+     "num_kennels": 4, "created_at": "2025-01-02", "active": True},
+    {"id": 2, "center_name": "Austin", "suite_name": "Standard", "price_per_night": 50,
+     "num_kennels": None, "created_at": "2025-01-01", "active": False},
+    {"id": 3, "center_name": "Austin", "suite_name": "Luxury", "price_per_night": None,
+     "num_kennels": 2, "created_at": "2025-01-03", "active": True},
+    {"id": 4, "center_name": "Boston", "suite_name": "Standard", "price_per_night": 45,
+     "num_kennels": 6, "created_at": "2025-01-01", "active": True},
+]
+
+
+@pytest.fixture
+def replica(tmp_path):
+    replica = ReadReplica(str(tmp_path / "replica.sqlite3"))
+    replica.apply_rows("kennel_suites", SUITES)
+    return replica
+
+
+def _ids(rows):
+    return [row["id"] for row in rows]
+
+
+def test_center_rows_default_to_created_at_order(replica):
+    rows = replica.query(TableQuery("kennel_suites").for_center("Austin").select("*"))
+    assert _ids(rows) == [2, 1, 3]
+
+
+def test_filters_on_row_data(replica):
+    query = TableQuery("kennel_suites").select("*")
+    assert _ids(replica.query(query.where("price_per_night", "gte", 50))) == [2, 1]
+    assert _ids(replica.query(query.where("id", "in", [1, 4]))) == [4, 1]
+    assert _ids(replica.query(query.where("num_kennels", "is", "null"))) == [2]
+    assert _ids(replica.query(query.where("active", "is", "false"))) == [2]
+    assert _ids(replica.query(query.eq("suite_name", "Standard").where("center_name", "neq", "Boston"))) == [2]
+
+
+def test_ascending_sorts_put_nulls_last_and_limit_applies(replica):
+    query = TableQuery("kennel_suites").for_center("Austin").select("*").order_by("price_per_night")
+    assert _ids(replica.query(query)) == [2, 1, 3]
+    assert _ids(replica.query(query.limit_to(2))) == [2, 1]
+    descending = TableQuery("kennel_suites").for_center("Austin").select("*").order_by("price_per_night", desc=True)
+    assert _ids(replica.query(descending)) == [3, 1, 2]
+
+
+def test_projection_matches_the_database(replica):
+    rows = replica.query(TableQuery("kennel_suites").for_center("Boston").select("id", "suite_name", "missing"))
+    assert rows == [{"id": 4, "suite_name": "Standard", "missing": None}]
+
+
+def test_unsupported_queries_fall_through_to_the_database(replica):
+    assert replica.query(TableQuery("kennel_suites").where("suite_name", "like", "Lux%")) is None
+    assert replica.query(TableQuery("pricing_rollups")) is None
+
+
+def test_removed_rows_are_not_returned(replica):
+    replica.remove_ids("kennel_suites", ["1"])
+    replica.retain_ids("kennel_suites", {"1", "2", "4"})
+    assert _ids(replica.query(TableQuery("kennel_suites").select("*"))) == [2, 4]
@@ -0,0 +1,91 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import supabase_config
+
+
+class _SlowFetch:
+    """Read that blocks until released and counts how often it was sent."""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if isinstance(self.result, BaseException):
+            raise self.result
+        return self.result
+
+
+@pytest.fixture
+def joined(monkeypatch):
+    """Semaphore released each time a read joins a request already in flight."""
+    joins = threading.Semaphore(0)
+
+    def count_cache(cache, hit):
+        if cache == "single_flight" and hit:
+            joins.release()
+
+    monkeypatch.setattr(supabase_config.instrumentation, "count_cache", count_cache)
+    return joins
+
+
+def _wait_for_followers(joined, count):
+    for _ in range(count):
+        assert joined.acquire(timeout=5)
+
+
+def test_concurrent_identical_reads_share_one_request(joined):
+    fetch = _SlowFetch([{"id": 1, "features": ["TV"]}])
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(supabase_config._single_flight, ("kennel_suites",), "suites", fetch)
+        assert fetch.started.wait(5)
+        followers = [pool.submit(supabase_config._single_flight, ("kennel_suites",), "suites", fetch)
+                     for _ in range(3)]
+        _wait_for_followers(joined, 3)
+        fetch.release.set()
+        results = [leader.result(5)] + [follower.result(5) for follower in followers]
+
+    assert fetch.calls == 1
+    assert all(result == [{"id": 1, "features": ["TV"]}] for result in results)
+    # Followers get their own copies, so one session's edits never reach another
+    results[1][0]["features"].append("Webcam")
+    assert results[0][0]["features"] == ["TV"] and results[2][0]["features"] == ["TV"]
+    assert supabase_config._flights == {}
+
+
+def test_followers_see_the_leaders_error(joined):
+    fetch = _SlowFetch(RuntimeError("connection reset"))
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(supabase_config._single_flight, ("kennel_suites",), "failing", fetch)
+        assert fetch.started.wait(5)
+        follower = pool.submit(supabase_config._single_flight, ("kennel_suites",), "failing", fetch)
+        _wait_for_followers(joined, 1)
+        fetch.release.set()
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match="connection reset"):
+                future.result(5)
+    assert fetch.calls == 1
+    assert supabase_config._flights == {}
+
+
+def test_reads_after_a_write_do_not_join_an_earlier_request():
+    before = _SlowFetch(["before write"])
+    after = _SlowFetch(["after write"])
+    after.release.set()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(supabase_config._single_flight, ("kennel_suites",), "ordered", before)
+        assert before.started.wait(5)
+        supabase_config._bump_write_generation("kennel_suites")
+        later = supabase_config._single_flight(("kennel_suites",), "ordered", after)
+        before.release.set()
+        assert leader.result(5) == ["before write"]
+    assert later == ["after write"]
+    assert before.calls == after.calls == 1
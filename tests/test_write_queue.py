@@ -0,0 +1,34 @@
+import threading
+import time
+
+import write_queue
+from write_queue import WriteQueue, PENDING, SAVED, UNKNOWN
+
+
+def test_only_finished_statuses_are_evicted(monkeypatch):
+    release = threading.Event()
+    sent = []
+
+    def save_many(table_name, rows):
+        release.wait(5)
+        sent.extend(rows)
+        return True, f"{len(rows)} records saved successfully!"
+
+    monkeypatch.setattr(write_queue, "save_many_to_supabase", save_many)
+    monkeypatch.setattr(write_queue, "MAX_TRACKED_STATUSES", 2)
+    queue = WriteQueue(linger_seconds=0)
+    tickets = [queue.submit("kennel_suites", {"suite_name": f"Suite {i}"}) for i in range(5)]
+
+    # More writes in flight than MAX_TRACKED_STATUSES: none of them may look finished
+    assert [queue.status(ticket).state for ticket in tickets] == [PENDING] * 5
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while queue.status(tickets[-1]).state == PENDING and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(sent) == 5
+    assert [queue.status(ticket).state for ticket in tickets] == [UNKNOWN] * 3 + [SAVED] * 2
+
+
+def test_unknown_tickets_are_not_reported_as_saved():
+    assert WriteQueue().status("never-issued").state == UNKNOWN
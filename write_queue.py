@@ -0,0 +1,202 @@
+import streamlit as st
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple, Callable
+from supabase_config import save_to_supabase, save_many_to_supabase, QUEUED_MESSAGE
+
+# Item states shown on the pricing cards
+PENDING = "saving…"
+SAVED = "saved"
+# Accepted into the local outbox while the database is unreachable
+QUEUED = "queued"
+FAILED = "failed"
+# Finished long enough ago that its status was evicted
+UNKNOWN = "unknown"
+
+DEFAULT_BATCH_SIZE = 100
+# How long the worker waits after the first queued item so a burst of
+# submissions from many sessions is sent as one bulk insert
+DEFAULT_LINGER_SECONDS = 0.05
+# Finished statuses kept for sessions that have not rerun yet; statuses of
+# writes still in flight are always kept
+MAX_TRACKED_STATUSES = 10000
+
+
+@dataclass
+class WriteStatus:
+    """Latest known state of a queued insert."""
+    state: str = PENDING
+    message: str = ""
+
+
+class WriteQueue:
+    """In-process queue that accepts inserts immediately and writes them in the background.
+
+    A single daemon worker drains the queue, groups items by table (and by
+    column set, which PostgREST requires for bulk inserts) and sends each
+    group as one insert. If a bulk insert fails, its items are retried one at
+    a time so a single bad row does not fail the rest of the batch.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE,
+                 linger_seconds: float = DEFAULT_LINGER_SECONDS):
+        self.batch_size = batch_size
+        self.linger_seconds = linger_seconds
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending: List[Tuple[str, str, Dict[str, Any]]] = []
+        # Tickets still being written, and finished ones, oldest first
+        self._in_flight: Dict[str, WriteStatus] = {}
+        self._finished: "OrderedDict[str, WriteStatus]" = OrderedDict()
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, table_name: str, data: Dict[str, Any]) -> str:
+        """Queue a row for insertion and return a ticket for checking its status."""
+        ticket = str(uuid.uuid4())
+        with self._wakeup:
+            self._in_flight[ticket] = WriteStatus()
+            self._pending.append((ticket, table_name, data))
+            self._ensure_worker()
+            self._wakeup.notify()
+        return ticket
+
+    def status(self, ticket: str) -> WriteStatus:
+        """Return the current status for a ticket; UNKNOWN once a finished status was evicted."""
+        with self._lock:
+            status = self._in_flight.get(ticket) or self._finished.get(ticket)
+        if status is None:
+            return WriteStatus(UNKNOWN, "No longer tracked; refresh the records to check it was saved.")
+        return status
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="supabase-write-queue", daemon=True)
+            self._worker.start()
+
+    def _set_status(self, tickets: List[str], state: str, message: str) -> None:
+        """Record the outcome of in-flight tickets, evicting the oldest finished statuses."""
+        with self._lock:
+            for ticket in tickets:
+                if self._in_flight.pop(ticket, None) is not None:
+                    self._finished[ticket] = WriteStatus(state, message)
+            while len(self._finished) > MAX_TRACKED_STATUSES:
+                self._finished.popitem(last=False)
+
+    def _take_batch(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        with self._wakeup:
+            while not self._pending:
+                self._wakeup.wait()
+        # Let a burst accumulate before sending
+        time.sleep(self.linger_seconds)
+        with self._lock:
+            batch = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+        return batch
+
+    def _flush(self, batch: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+        groups: Dict[Tuple[str, frozenset], List[Tuple[str, Dict[str, Any]]]] = {}
+        for ticket, table_name, data in batch:
+            groups.setdefault((table_name, frozenset(data)), []).append((ticket, data))
+
+        for (table_name, _), items in groups.items():
+            tickets = [ticket for ticket, _ in items]
+            success, message = save_many_to_supabase(table_name, [data for _, data in items])
+            if success:
+                self._set_status(tickets, QUEUED if message == QUEUED_MESSAGE else SAVED, message)
+                continue
+            if len(items) == 1:
+                self._set_status(tickets, FAILED, message)
+                continue
+            # Isolate the row(s) that made the bulk insert fail
+            for ticket, data in items:
+                success, message = save_to_supabase(table_name, data)
+                state = (QUEUED if message == QUEUED_MESSAGE else SAVED) if success else FAILED
+                self._set_status([ticket], state, message)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            try:
+                self._flush(batch)
+            except Exception as e:
+                self._set_status([ticket for ticket, _, _ in batch], FAILED, f"Error: {str(e)}")
+
+
+_queue: Optional[WriteQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_write_queue() -> WriteQueue:
+    """Return the process-wide write queue shared by all sessions."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = WriteQueue()
+    return _queue
+
+
+def submit_write(table_name: str, data: Dict[str, Any]) -> str:
+    """Queue an insert without waiting for the network; returns a status ticket."""
+    return get_write_queue().submit(table_name, data)
+
+
+def refresh_write_statuses(items: List[Dict[str, Any]]) -> bool:
+    """Copy queue statuses onto session-state items that carry a ``write_ticket``.
+
+    Each item gets ``save_status`` and ``save_message`` keys. Tickets that
+    have finished are dropped so later reruns skip the lookup.
+
+    Returns:
+        True if any item is still waiting to be saved
+    """
+    queue = get_write_queue()
+    waiting = False
+    for item in items:
+        ticket = item.get("write_ticket")
+        if not ticket:
+            continue
+        status = queue.status(ticket)
+        item["save_status"] = status.state
+        item["save_message"] = status.message
+        if status.state == PENDING:
+            waiting = True
+        else:
+            item.pop("write_ticket")
+    return waiting
+
+
+def status_badge(item: Dict[str, Any]) -> str:
+    """Small HTML badge describing an item's save status, or "" if it has none."""
+    state = item.get("save_status")
+    if not state:
+        return ""
+    color = {PENDING: "#6c757d", SAVED: "#2e7d32", QUEUED: "#ef6c00", FAILED: "#c62828", UNKNOWN: "#6c757d"}[state]
+    title = item.get("save_message", "").replace("'", "&#39;")
+    return f"<span title='{title}' style='float:right; font-size:0.9em; color:{color};'>{state}</span>"
+
+
+def render_with_save_status(items: List[Dict[str, Any]], render: Callable[[], None],
+                            poll_seconds: float = 1.0) -> None:
+    """Render cards for ``items`` and keep their save status current.
+
+    While any item is still saving, ``render`` runs inside a fragment that
+    refreshes every ``poll_seconds`` without rerunning the whole page. Once
+    everything has landed, one full rerun stops the polling.
+    """
+    waiting = refresh_write_statuses(items)
+
+    def cards():
+        still_waiting = refresh_write_statuses(items)
+        render()
+        if waiting and not still_waiting:
+            st.rerun()
+
+    st.fragment(cards, run_every=poll_seconds if waiting else None)()